@@ -0,0 +1,34 @@
+#!/usr/bin/env python
+##---------------------------------------------------------------------------##
+##
+## PySol -- a Python Solitaire game
+##
+## This program is free software; you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation; either version 2 of the License, or
+## (at your option) any later version.
+##
+## This program is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with this program; see the file COPYING.
+## If not, write to the Free Software Foundation, Inc.,
+## 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+##
+##---------------------------------------------------------------------------##
+
+# Play many deals with the autopilot, without windows; see
+# pysollib/autoplay.py and --help.
+
+import sys
+import pysollib.settings
+pysollib.settings.TOOLKIT = 'none'
+
+from pysollib.init import init
+init()
+
+from pysollib.autoplay import main
+sys.exit(main(sys.argv))
@@ -401,12 +401,9 @@ class PysolMenubar(PysolMenubarTk):
         if self._cancelDrag(): return
         if self.menustate.redo:
             self.app.top.busyUpdate()
-            self.game.playSample("redo", loop=1)
-            while self.game.moves.index < len(self.game.moves.history):
-                self.game.redo()
-                if self.game.checkForWin():
-                    break
-            self.game.stopSamples()
+            self.game.playSample("redo")
+            self.game.gotoMove(len(self.game.moves.history))
+            self.game.checkForWin()
 
     def mSetBookmark(self, n, confirm=1):
         if self._cancelDrag(): return
@@ -24,7 +24,9 @@
 
 # imports
 import os, re
+import time
 import traceback
+import threading
 
 # PySol imports
 from pysollib.mfxutil import destruct, Struct
@@ -38,8 +40,15 @@ from pysollib.resource import CSI, CardsetConfig, Cardset, CardsetManager
 from pysollib.resource import Tile, TileManager
 from pysollib.resource import Sample, SampleManager
 from pysollib.resource import Music, MusicManager
+from pysollib.resource import ResourceCache
 from pysollib.images import Images, SubsampledImages
 from pysollib.pysolrandom import PysolRandom
+from pysollib.journal import GameJournal
+from pysollib.savelibrary import SavedGamesLibrary
+from pysollib.statslog import StatisticsLog
+from pysollib.stats import normLog
+from pysollib.startupprofile import STARTUP_PROFILE
+from pysollib.solvercache import SolverCache
 from pysollib.gamedb import GI, GAME_DB, loadGame
 from pysollib.options import Options
 from pysollib.settings import TOP_SIZE, TOOLKIT
@@ -48,7 +57,7 @@ from pysollib.winsystems import TkSettings
 
 # Toolkit imports
 from pysollib.mygettext import _, n_
-from pysollib.pysoltk import wm_withdraw, loadImage
+from pysollib.pysoltk import wm_withdraw, loadImage, after, after_idle
 from pysollib.pysoltk import MfxDialog, MfxMessageDialog, MfxExceptionDialog
 from pysollib.pysoltk import TclError, MfxScrolledCanvas
 from pysollib.pysoltk import PysolProgressBar
@@ -172,6 +181,26 @@ class GameStat:
 
         return time_p, moves_p, total_moves_p, score_p, score_casino_p
 
+    def updateLog(self, log):
+        # a game merged from another installation (see
+        # Statistics.mergeGames()); the log has no moves
+        gameid, game_number, status, start_time, elapsed_time = log[:5]
+        score, score_casino = log[6:8]
+        self.num_total += 1
+        if status == 0:
+            self.num_lost += 1
+            return
+        elif status == 1:
+            self.num_won += 1
+        else:
+            self.num_perfect += 1
+        if score is not None:
+            self.score_result.update(gameid, score, game_number, start_time)
+        if score_casino is not None:
+            self.score_casino_result.update(
+                gameid, score_casino, game_number, start_time)
+        self.time_result.update(gameid, elapsed_time, game_number, start_time)
+
 
 class Statistics:
     def __init__(self):
@@ -183,21 +212,105 @@ class Statistics:
         self.prev_games = {}
         self.all_prev_games = {}
         self.session_games = {}
+        # [won, lost] of session_games (keys: player and gameid)
+        self.session_counts = {}
         # some simple balance scores (key: gameid)
         self.total_balance = {}     # a dictionary of integers
         self.session_balance = {}   # reset per session
         self.gameid_balance = 0     # reset when changing the gameid
+        # prev_games and all_prev_games are kept in this log, see openLog()
+        self.log = None
+        # (won, lost, time, moves) of the played games (keys: player and
+        # gameid), see getAggregates()
+        self.aggregates = {}
+        # [number of games, daily (played, won)] of prev_games (key:
+        # player), see getDailyResults()
+        self.daily_results = {}
 
     def new(self):
         return Statistics()
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop('log', None)
+        state.pop('aggregates', None)
+        state.pop('session_counts', None)
+        if self.log:
+            state['prev_games'] = {}
+            state['all_prev_games'] = {}
+        return state
+
+    def __getattr__(self, name):
+        # prev_games and all_prev_games are read from the log when they
+        # are first used, see openLog()
+        if name in ('prev_games', 'all_prev_games') and \
+               self.__dict__.get('log'):
+            self.__readLog()
+            return self.__dict__[name]
+        raise AttributeError(name)
+
+    def openLog(self, filename):
+        log = StatisticsLog(filename)
+        if log.exists():
+            # the log is read on first use
+            del self.prev_games, self.all_prev_games
+        else:
+            # statistics of older versions keep the games in the pickle
+            try:
+                log.write(self.prev_games, self.all_prev_games)
+            except EnvironmentError:
+                # keep pickling them
+                if DEBUG:
+                    traceback.print_exc()
+                return
+        self.log = log
+
+    def __readLog(self):
+        log = self.log
+        try:
+            prev_games, all_prev_games = log.read()
+        except (EnvironmentError, ValueError), ex:
+            print_err('cannot read %s: %s' % (log.filename, ex))
+            # the games of this session are pickled
+            prev_games, all_prev_games = {}, {}
+            self.log = None
+        self.prev_games, self.all_prev_games = prev_games, all_prev_games
+        if self.log and log.compact:
+            try:
+                log.write(prev_games, all_prev_games)
+            except EnvironmentError:
+                if DEBUG:
+                    traceback.print_exc()
+
+    def __hasPrevGames(self):
+        # False until the log is read
+        return 'prev_games' in self.__dict__
+
+    def __appendLog(self, kind, player, value):
+        if not self.log:
+            return
+        try:
+            self.log.append(kind, player, value)
+        except EnvironmentError:
+            # the games are still in prev_games for this session
+            if DEBUG:
+                traceback.print_exc()
+
     #
     # player & demo statistics
     #
 
     def resetStats(self, player, gameid):
-        self.__resetPrevGames(player, self.prev_games, gameid)
+        if self.__hasPrevGames():
+            self.__resetPrevGames(player, self.prev_games, gameid)
         self.__resetPrevGames(player, self.session_games, gameid)
+        if gameid == 0:
+            self.session_counts.pop(player, None)
+        else:
+            self.session_counts.get(player, {}).pop(gameid, None)
+        self.__appendLog('r', player, gameid)
+        self.aggregates.pop(player, None)
+        self.__resetDailyResults(player, gameid)
         if player not in self.games_stats:
             return
         if gameid == 0:
@@ -231,11 +344,56 @@ class Statistics:
                     s.moves_result.average,)
         return (0, 0, 0, 0)
 
+    def getAggregates(self, player):
+        # a dictionary of getFullStats() of all played games; built on
+        # first use and then updated by updateGameStat()
+        table = self.aggregates.get(player)
+        if table is None:
+            table = {}
+            for gameid in self.games_stats.get(player, {}):
+                if gameid != 'all':
+                    table[gameid] = self.getFullStats(player, gameid)
+            self.aggregates[player] = table
+        return table
+
+    def getDailyResults(self, player):
+        # a dictionary (key: gameid) of dictionaries (key: (year, month,
+        # day)) of [played, won]; kept up to date by updateStats() and
+        # pickled with the statistics, so the log is only read to build
+        # it the first time
+        daily = self.daily_results.get(player)
+        if daily is None:
+            games = self.prev_games.get(player, [])
+            daily = self.daily_results[player] = [0, {}]
+            for log in games:
+                self.__addDailyResult(player, log)
+        return daily[1]
+
+    def __addDailyResult(self, player, log):
+        daily = self.daily_results.get(player)
+        if daily is None:
+            # not built yet
+            return
+        gameid, status, start_time = log[0], log[2], log[3]
+        day = time.localtime(start_time)[:3]
+        r = daily[1].setdefault(gameid, {}).setdefault(day, [0, 0])
+        r[0] += 1
+        if status > 0:
+            r[1] += 1
+        daily[0] += 1
+
+    def __resetDailyResults(self, player, gameid):
+        if gameid == 0:
+            self.daily_results[player] = [0, {}]
+            return
+        daily = self.daily_results.get(player)
+        if daily is None:
+            return
+        results = daily[1].pop(gameid, {})
+        daily[0] -= sum([r[0] for r in results.values()])
+
     def getSessionStats(self, player, gameid):
-        games = self.session_games.get(player, [])
-        games = [g for g in games if g[0] == gameid]
-        won = len([g for g in games if g[2] > 0])
-        lost = len([g for g in games if g[2] == 0])
+        won, lost = self.session_counts.get(player, {}).get(gameid, (0, 0))
         return won, lost
 
     def updateStats(self, player, game, status):
@@ -251,17 +409,27 @@ class Statistics:
                 ret = self.updateGameStat(player, game, status)
             else:
                 # player
-                if player not in self.prev_games:
-                    self.prev_games[player] = []
-                self.prev_games[player].append(log)
-                if player not in self.all_prev_games:
-                    self.all_prev_games[player] = []
-                self.all_prev_games[player].append(log)
+                if self.__hasPrevGames():
+                    if player not in self.prev_games:
+                        self.prev_games[player] = []
+                    self.prev_games[player].append(log)
+                    if player not in self.all_prev_games:
+                        self.all_prev_games[player] = []
+                    self.all_prev_games[player].append(log)
+                self.__addDailyResult(player, log)
+                self.__appendLog('g', player, log)
                 ret = self.updateGameStat(player, game, status)
         # session log
         if player not in self.session_games:
             self.session_games[player] = []
         self.session_games[player].append(log)
+        if status >= 0:
+            counts = self.session_counts.setdefault(player, {})
+            counts = counts.setdefault(game.id, [0, 0])
+            if status > 0:
+                counts[0] += 1
+            else:
+                counts[1] += 1
         return ret
 
     def updateGameStat(self, player, game, status):
@@ -279,7 +447,42 @@ class Statistics:
         else:
             all_games_stat = self.games_stats[player]['all']
         all_games_stat.update(game, status)
-        return game_stat.update(game, status)
+        ret = game_stat.update(game, status)
+        if player in self.aggregates:
+            self.aggregates[player][game.id] = self.getFullStats(player,
+                                                                game.id)
+        return ret
+
+    def mergeGames(self, player, logs):
+        # add the logs of games played on other installations (see
+        # stats.readLogs()); games already known are skipped. Returns
+        # the number of games added.
+        known = set([(g[0], g[1], g[3])
+                     for g in self.all_prev_games.get(player, [])])
+        n = 0
+        for log in logs:
+            log = normLog(log)
+            if log is None or log[2] not in (0, 1, 2):
+                continue
+            key = (log[0], log[1], log[3])
+            if key in known:
+                continue
+            known.add(key)
+            self.prev_games.setdefault(player, []).append(log)
+            self.all_prev_games.setdefault(player, []).append(log)
+            self.__addDailyResult(player, log)
+            self.__appendLog('g', player, log)
+            games_stats = self.games_stats.setdefault(player, {})
+            if log[0] not in games_stats:
+                games_stats[log[0]] = GameStat(log[0])
+            if 'all' not in games_stats:
+                games_stats['all'] = GameStat('all')
+            games_stats[log[0]].updateLog(log)
+            games_stats['all'].updateLog(log)
+            n += 1
+        if n:
+            self.aggregates.pop(player, None)
+        return n
 
 ##     def __setstate__(self, state):      # for backward compatible
 ##         if 'gameid' not in state:
@@ -357,6 +560,8 @@ class Application:
         self.sample_manager = SampleManager()
         self.music_manager = MusicManager()
         self.music_playlist = []
+        self.resource_cache = None      # see getResourceCache()
+        self.resource_dirs = {}         # the dirs to rescan
         self.intro = Struct(
             progress = None,            # progress bar
         )
@@ -367,6 +572,8 @@ class Application:
             plugins = os.path.join(config, "plugins"),
             savegames = os.path.join(config, "savegames"),
             maint = os.path.join(config, "maint"),          # debug
+            solver_cache = os.path.join(config, "solver-cache"),
+            scaled_cardsets = os.path.join(config, "scaled-cards"),
         )
         for k, v in self.dn.__dict__.items():
 ##            if os.name == "nt":
@@ -378,14 +585,24 @@ class Application:
             opt      = os.path.join(self.dn.config, "options.dat"),
             opt_cfg  = os.path.join(self.dn.config, "options.cfg"),
             stats    = os.path.join(self.dn.config, "statistics.dat"),
+            stats_log = os.path.join(self.dn.config, "statistics.log"),
             holdgame = os.path.join(self.dn.config, "holdgame.dat"),
+            autosave = os.path.join(self.dn.config, "autosave.dat"),
             comments = os.path.join(self.dn.config, "comments.dat"),
+            savegames_index = os.path.join(self.dn.config, "savegames.idx"),
+            games_manifest = os.path.join(self.dn.config, "games.idx"),
+            resources_cache = os.path.join(self.dn.config, "resources.idx"),
         )
         for k, v in self.dn.__dict__.items():
             if os.name == "nt":
                 v = os.path.normcase(v)
             v = os.path.normpath(v)
             self.fn.__dict__[k] = v
+        # results of the solvers (see hint.py)
+        self.solver_cache = SolverCache(self.dn.solver_cache)
+        # the saved games directory (see savelibrary.py)
+        self.savegames = SavedGamesLibrary(self.dn.savegames,
+                                           self.fn.savegames_index, self.gdb)
         # random generators
         self.gamerandom = PysolRandom()
         self.miscrandom = PysolRandom()
@@ -411,6 +628,7 @@ class Application:
             gameid = None,
         )
         self.demo_counter = 0
+        self.journal = None             # autosave journal, see game.py
 
 
     # the PySol mainloop
@@ -418,6 +636,7 @@ class Application:
         # copy startup options
         self.startup_opt = self.opt.copy()
         # try to load statistics
+        STARTUP_PROFILE.phase('statistics')
         try:
             self.loadStatistics()
         except:
@@ -433,8 +652,21 @@ class Application:
         if self.getGameClass(self.opt.last_gameid):
             self.nextgame.id = self.opt.last_gameid
         # load a holded or saved game
+        STARTUP_PROFILE.phase('saved game')
         id = self.gdb.getGamesIdSortedByName()[0]
         tmpgame = self.constructGame(id)
+        if self.opt.autosave_journal:
+            # the journal is removed on exit; if it is still there
+            # the last session crashed
+            if os.path.exists(self.fn.autosave) and \
+                   not self.nextgame.loadedgame:
+                try:
+                    self.nextgame.loadedgame = tmpgame._loadJournal(
+                        self.fn.autosave, self)
+                except:
+                    traceback.print_exc()
+                    self.nextgame.loadedgame = None
+            self.journal = GameJournal(self.fn.autosave)
         if self.opt.game_holded > 0 and not self.nextgame.loadedgame:
             game = None
             try:
@@ -476,6 +708,7 @@ class Application:
         # widgets
         #
         # create the menubar
+        STARTUP_PROFILE.phase('widgets')
         if self.intro.progress: self.intro.progress.update(step=1)
         self.menubar = PysolMenubar(self, self.top,
                                     progress=self.intro.progress)
@@ -550,6 +783,9 @@ class Application:
                     self.loadCardset(self.nextgame.cardset, id=self.nextgame.id, update=7+256)
                 else:
                     self.requestCompatibleCardsetType(self.nextgame.id)
+            # a clean exit, nothing to resume
+            if self.journal:
+                self.journal.remove()
         finally:
             # hide main window
             self.wm_withdraw()
@@ -582,6 +818,7 @@ class Application:
 
 
     def runGame(self, id, random=None):
+        STARTUP_PROFILE.phase('first game')
         self.top.connectApp(self)
         # create game instance
         g = self.getGameClass(id)
@@ -652,6 +889,11 @@ class Application:
             self.game.stats.player_moves = 0
         # enter the Tk mainloop
         self.game.busy = 0
+        if STARTUP_PROFILE.running:
+            # the canvas is drawn when Tk is idle
+            STARTUP_PROFILE.phase('first draw')
+            after_idle(self.top, STARTUP_PROFILE.finish)
+        self.game.prefetchCardFaces()
         self.top.mainloop()
 
 
@@ -870,6 +1112,8 @@ class Application:
                                         color=color,
                                         images=self.progress_images)
         images = Images(self.dataloader, cs)
+        if self.opt.cache_scaled_cardsets:
+            images.cache_dir = self.dn.scaled_cardsets
         try:
             if not images.load(app=self, progress=progress):
                 raise Exception("Invalid or damaged "+CARDSET)
@@ -1066,14 +1310,16 @@ Please select a %s type %s.
         self.opt.setConstants()
 
     def loadStatistics(self):
-        if not os.path.exists(self.fn.stats):
-            return
-        stats = unpickle(self.fn.stats)
-        if stats:
-            ##print "loaded:", stats.__dict__
-            self.stats.__dict__.update(stats.__dict__)
+        if os.path.exists(self.fn.stats):
+            stats = unpickle(self.fn.stats)
+            if stats:
+                ##print "loaded:", stats.__dict__
+                self.stats.__dict__.update(stats.__dict__)
+        # the finished games are appended to a log
+        self.stats.openLog(self.fn.stats_log)
         # start a new session
         self.stats.session_games = {}
+        self.stats.session_counts = {}
         self.stats.session_balance = {}
         self.stats.gameid_balance = 0
 
@@ -1117,68 +1363,38 @@ Please select a %s type %s.
         return self.gdb.getGamesIdSortedByName()
 
     ##
-    def getGamesIdSortedByPlayed(self, player=''):
+    def _getGamesIdSortedByStats(self, player, key):
+        # sort by key(won, lost, time, moves), largest first
         if player == '': player = self.opt.player
-        def _cmp(a, b):
-            wa, la, ta, ma = self.stats.getFullStats(player, a)
-            wb, lb, tb, mb = self.stats.getFullStats(player, b)
-            return cmp(wb+lb, wa+la)  # reverse
+        table = self.stats.getAggregates(player)
+        no_stats = (0, 0, 0, 0)
         games = list(self.gdb.getGamesIdSortedByName())
-        games.sort(_cmp)
+        games.sort(key=lambda id: key(*table.get(id, no_stats)),
+                   reverse=True)
         return games
 
+    def getGamesIdSortedByPlayed(self, player=''):
+        return self._getGamesIdSortedByStats(player, lambda w, l, t, m: w+l)
+
     def getGamesIdSortedByWon(self, player=''):
-        if player == '': player = self.opt.player
-        def _cmp(a, b):
-            wa, la, ta, ma = self.stats.getFullStats(player, a)
-            wb, lb, tb, mb = self.stats.getFullStats(player, b)
-            return cmp(wb, wa)  # reverse
-        games = list(self.gdb.getGamesIdSortedByName())
-        games.sort(_cmp)
-        return games
+        return self._getGamesIdSortedByStats(player, lambda w, l, t, m: w)
 
     def getGamesIdSortedByLost(self, player=''):
-        if player == '': player = self.opt.player
-        def _cmp(a, b):
-            wa, la, ta, ma = self.stats.getFullStats(player, a)
-            wb, lb, tb, mb = self.stats.getFullStats(player, b)
-            return cmp(lb, la)  # reverse
-        games = list(self.gdb.getGamesIdSortedByName())
-        games.sort(_cmp)
-        return games
+        return self._getGamesIdSortedByStats(player, lambda w, l, t, m: l)
 
     def getGamesIdSortedByPercent(self, player=''):
-        if player == '': player = self.opt.player
-        def _cmp(a, b):
-            wa, la, ta, ma = self.stats.getFullStats(player, a)
-            wb, lb, tb, mb = self.stats.getFullStats(player, b)
-            if wa+la == 0 or wb+lb == 0:
-                return cmp(wb+lb, wa+la)  # reverse
-            return cmp(float(wb)/(wb+lb),
-                       float(wa)/(wa+la))  # reverse
-        games = list(self.gdb.getGamesIdSortedByName())
-        games.sort(_cmp)
-        return games
+        def _key(w, l, t, m):
+            # played games first
+            if w+l == 0:
+                return (0, 0)
+            return (1, float(w)/(w+l))
+        return self._getGamesIdSortedByStats(player, _key)
 
     def getGamesIdSortedByPlayingTime(self, player=''):
-        if player == '': player = self.opt.player
-        def _cmp(a, b):
-            wa, la, ta, ma = self.stats.getFullStats(player, a)
-            wb, lb, tb, mb = self.stats.getFullStats(player, b)
-            return cmp(tb, ta)  # reverse
-        games = list(self.gdb.getGamesIdSortedByName())
-        games.sort(_cmp)
-        return games
+        return self._getGamesIdSortedByStats(player, lambda w, l, t, m: t)
 
     def getGamesIdSortedByMoves(self, player=''):
-        if player == '': player = self.opt.player
-        def _cmp(a, b):
-            wa, la, ta, ma = self.stats.getFullStats(player, a)
-            wb, lb, tb, mb = self.stats.getFullStats(player, b)
-            return cmp(mb, ma)  # reverse
-        games = list(self.gdb.getGamesIdSortedByName())
-        games.sort(_cmp)
-        return games
+        return self._getGamesIdSortedByStats(player, lambda w, l, t, m: m)
 
 
     def getGameInfo(self, id):
@@ -1278,6 +1494,7 @@ Please select a %s type %s.
 
     # read & parse a cardset config.txt file - see class Cardset in resource.py
     def _readCardsetConfig(self, dir, filename):
+        # return the fields of the config or None
         f = None
         try:
             f = open(filename, "r")
@@ -1291,11 +1508,43 @@ Please select a %s type %s.
         if not self._parseCardsetConfig(config, lines):
             ##print filename, 'invalid config'
             return None
-        if config.CARDD > self.top.winfo_screendepth():
+        return config.__dict__
+
+    def _checkCardsetConfig(self, d, f1):
+        # return the config of the cardset in d, False if it is not a
+        # valid cardset or None on errors
+        if not os.path.isdir(d):
+            return False
+        f2 = os.path.join(d, "COPYRIGHT")
+        if not (os.path.isfile(f1) and os.path.isfile(f2)):
+            return False
+        try:
+            config = self._readCardsetConfig(d, f1)
+        except Exception, err:
+            ##traceback.print_exc()
+            return None
+        if not config:
+            print_err('fail _readCardsetConfig: %s %s' % (d, f1))
+            return False
+        ##from pprint import pprint
+        ##pprint(config)
+        back = config['backnames'][config['backindex']]
+        f1 = os.path.join(d, back)
+        f2 = os.path.join(d, "shade" + config['ext'])
+        if (config['ext'] in IMAGE_EXTENSIONS and
+            os.path.isfile(f1) and os.path.isfile(f2)):
+            return config
+        return False
+
+    def _createCardset(self, dir, config):
+        if config['CARDD'] > self.top.winfo_screendepth():
             return None
         cs = Cardset()
         cs.dir = dir
-        cs.update(config.__dict__)
+        cs.update(config)
+        # set offsets from options.cfg
+        if cs.ident in self.opt.offsets:
+            cs.CARD_XOFFSET, cs.CARD_YOFFSET = self.opt.offsets[cs.ident]
         return cs
 
     def _parseCardsetConfig(self, cs, line):
@@ -1393,9 +1642,6 @@ Please select a %s type %s.
         else:
             cs.backnames.insert(0, back)
             cs.backindex = 0
-        # set offsets from options.cfg
-        if cs.ident in self.opt.offsets:
-            cs.CARD_XOFFSET, cs.CARD_YOFFSET = self.opt.offsets[cs.ident]
         ##if cs.type != 1: print cs.type, cs.name
         return 1
 
@@ -1406,44 +1652,38 @@ Please select a %s type %s.
         if DEBUG:
             dirs = dirs + manager.getSearchDirs(self, "cardsets-*")
         ##print dirs
+        # the cache has the config of each cardset (False if it is not
+        # a valid cardset), stamped with the mtimes of the cardset dir
+        # and its config.txt
+        cache = self.getResourceCache()
+        name_re = re.compile(r"^cardset-")
         found, t = [], {}
         for dir in dirs:
             dir = dir.strip()
             try:
                 names = []
-                if dir and os.path.isdir(dir) and dir not in t:
+                if dir and dir not in t:
                     t[dir] = 1
-                    names = os.listdir(dir)
-                    names.sort()
+                    names = self._listResourceDir('cardset-dirs', dir,
+                                                  name_re, isfile=False)
                 for name in names:
-                    if not name.startswith('cardset-'): continue
                     d = os.path.join(dir, name)
-                    if not os.path.isdir(d): continue
                     f1 = os.path.join(d, "config.txt")
-                    f2 = os.path.join(d, "COPYRIGHT")
-                    if os.path.isfile(f1) and os.path.isfile(f2):
-                        try:
-                            cs = self._readCardsetConfig(d, f1)
-                            if cs:
-                                ##from pprint import pprint
-                                ##print cs.name
-                                ##pprint(cs.__dict__)
-                                back = cs.backnames[cs.backindex]
-                                f1 = os.path.join(d, back)
-                                f2 = os.path.join(d, "shade" + cs.ext)
-                                if (cs.ext in IMAGE_EXTENSIONS and
-                                    os.path.isfile(f1) and os.path.isfile(f2)):
-                                    found.append(cs)
-                                    #print '+', cs.name
-                            else:
-                                print_err('fail _readCardsetConfig: %s %s'
-                                          % (d, f1))
-                                pass
-                        except Exception, err:
-                            ##traceback.print_exc()
-                            pass
+                    stamp = cache.getStamp(d, f1)
+                    config = cache.get('cardsets', d, stamp)
+                    if config is None:
+                        config = self._checkCardsetConfig(d, f1)
+                        if config is None:
+                            continue
+                        cache.set('cardsets', d, stamp, config)
+                    if config:
+                        cs = self._createCardset(d, config)
+                        if cs:
+                            found.append(cs)
+                            #print '+', cs.name
             except EnvironmentError, ex:
                 pass
+        cache.save()
         # register cardsets
         for obj in found:
             if not manager.getByName(obj.name):
@@ -1451,6 +1691,86 @@ Please select a %s type %s.
                 ##print obj.index, obj.name
 
 
+    #
+    # resource dirs - the listings are kept in a ResourceCache (see
+    # resource.py), stamped with the mtime of the dir
+    #
+
+    RESOURCE_SECTIONS = {
+        'cardset-dirs': 'initCardsets',
+        'tiles': 'initTiles',
+        'samples': 'initSamples',
+        'music': 'initMusic',
+        }
+
+    def getResourceCache(self):
+        if self.resource_cache is None:
+            self.resource_cache = ResourceCache(self.fn.resources_cache)
+        return self.resource_cache
+
+    def _listResourceDir(self, section, dir, name_re, isfile=True):
+        # return the sorted names in dir matching name_re
+        cache = self.getResourceCache()
+        key = (dir, name_re.pattern)
+        stamp = cache.getStamp(dir)
+        names = cache.get(section, key, stamp)
+        if names is None:
+            names = self._scanResourceDir(dir, name_re, isfile)
+            cache.set(section, key, stamp, names)
+        self.resource_dirs[(section, key)] = (dir, name_re, isfile)
+        return names
+
+    def _scanResourceDir(self, dir, name_re, isfile):
+        names = []
+        if dir and os.path.isdir(dir):
+            for name in os.listdir(dir):
+                if not name or not name_re.search(name):
+                    continue
+                if isfile and not os.path.isfile(os.path.join(dir, name)):
+                    continue
+                names.append(name)
+            names.sort()
+        return names
+
+    def rescanResources(self):
+        # list the resource dirs again in a thread, for file systems with
+        # unreliable mtimes (e.g. network mounts); resources found then
+        # are registered when the rescan is done
+        dirs = self.resource_dirs.items()
+        result = []
+        def rescan():
+            for k, (dir, name_re, isfile) in dirs:
+                try:
+                    names = self._scanResourceDir(dir, name_re, isfile)
+                except EnvironmentError:
+                    continue
+                result.append((k, ResourceCache.getStamp(dir), names))
+            result.append(None)
+        def check():
+            if not result or result[-1] is not None:
+                after(self.top, 1000, check)
+            else:
+                self._updateResources(result[:-1])
+        thread = threading.Thread(target=rescan)
+        thread.setDaemon(True)
+        thread.start()
+        after(self.top, 1000, check)
+
+    def _updateResources(self, result):
+        cache = self.getResourceCache()
+        sections = {}
+        for (section, key), stamp, names in result:
+            if cache.get(section, key, stamp) != names:
+                cache.set(section, key, stamp, names)
+                sections[section] = True
+        # register the new resources; the dialogs and menus read the
+        # managers when they are opened
+        for section in sections:
+            getattr(self, self.RESOURCE_SECTIONS[section])()
+        if sections:
+            cache.save()
+
+
     #
     # init tiles
     #
@@ -1469,15 +1789,9 @@ Please select a %s type %s.
         found, t = [], {}
         for dir in dirs:
             try:
-                names = []
-                if dir and os.path.isdir(dir):
-                    names = os.listdir(dir)
+                names = self._listResourceDir('tiles', dir, ext_re)
                 for name in names:
-                    if not name or not ext_re.search(name):
-                        continue
                     f = os.path.join(dir, name)
-                    if not os.path.isfile(f):
-                        continue
                     tile = Tile()
                     tile.filename = f
                     n = ext_re.sub("", name)
@@ -1495,6 +1809,7 @@ Please select a %s type %s.
                         found.append((n, tile))
             except EnvironmentError, ex:
                 pass
+        self.getResourceCache().save()
         # register tiles
         found.sort()
         for f in found:
@@ -1507,7 +1822,8 @@ Please select a %s type %s.
     # init samples / music
     #
 
-    def initResource(self, manager, dirs, ext_re, Resource_Class):
+    def initResource(self, manager, dirs, ext_re, Resource_Class,
+                     section=None):
         found, t = [], {}
         for dir in dirs:
             dir = dir.strip()
@@ -1515,17 +1831,13 @@ Please select a %s type %s.
                 dir = os.path.normpath(dir)
             try:
                 names = []
-                if dir and os.path.isdir(dir):
-                    names = os.listdir(dir)
+                if dir:
+                    names = self._listResourceDir(section, dir, ext_re)
                     names = map(os.path.normcase, names)
                     names.sort()
                 for name in names:
-                    if not name or not ext_re.search(name):
-                        continue
                     f = os.path.join(dir, name)
                     f = os.path.normpath(f)
-                    if not os.path.isfile(f):
-                        continue
                     obj = Resource_Class()
                     obj.filename = f
                     n = ext_re.sub("", name.strip())
@@ -1536,6 +1848,7 @@ Please select a %s type %s.
                         found.append((n, obj))
             except EnvironmentError, ex:
                 pass
+        self.getResourceCache().save()
         # register songs
         found.sort()
         if manager:
@@ -1552,7 +1865,7 @@ Please select a %s type %s.
         dirs = manager.getSearchDirs(self, ("sound", os.path.join("sound", "extra")))
         ##print dirs
         ext_re = re.compile(r"\.((wav))$", re.I)
-        self.initResource(manager, dirs, ext_re, Sample)
+        self.initResource(manager, dirs, ext_re, Sample, 'samples')
 
 
     def initMusic(self):
@@ -1561,6 +1874,6 @@ Please select a %s type %s.
         dirs = manager.getSearchDirs(self, "music-*", "PYSOL_MUSIC")
         ##print dirs
         ext_re = re.compile(self.audio.EXTENSIONS)
-        self.initResource(manager, dirs, ext_re, Music)
+        self.initResource(manager, dirs, ext_re, Music, 'music')
 
 
@@ -0,0 +1,447 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+##---------------------------------------------------------------------------##
+##
+## Copyright (C) 1998-2003 Markus Franz Xaver Johannes Oberhumer
+## Copyright (C) 2003 Mt. Hood Playing Card Co.
+## Copyright (C) 2005-2009 Skomoroh
+##
+## This program is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## This program is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with this program.  If not, see <http://www.gnu.org/licenses/>.
+##
+##---------------------------------------------------------------------------##
+
+# ************************************************************************
+# * Batch autoplay.
+# *
+# * Plays many deals of one game with the autopilot (the same code as
+# * the Demo) using the null toolkit and a pool of worker processes.
+# * One JSON record is written per deal:
+# *
+# *   {"gameid": 2, "seed": 17, "won": false, "moves": 61,
+# *    "elapsed": 0.21, "hint_time": 0.18, "stuck": "no hints"}
+# *
+# * See pysol_autoplay.py and scripts/autopilot_benchmark.py.
+# ************************************************************************
+
+__all__ = ['parseSeeds',
+           'findGame',
+           'playDemo',
+           'startSolver',
+           'playDeal',
+           'playDeals',
+           'benchmarkGame',
+           'benchmarkGames',
+           'compareReports',
+           'main']
+
+# imports
+import sys
+import time
+import getopt
+import multiprocessing
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
+# PySol imports
+from pysollib.headless import HeadlessApplication
+from pysollib.mfxutil import Struct, print_err
+from pysollib.mygettext import _
+from pysollib.pysolrandom import constructRandom
+
+
+# ************************************************************************
+# * seeds & games
+# ************************************************************************
+
+def parseSeeds(s):
+    # "1-1000", "7", "1,5,10-20" -> list of ints (ranges are inclusive)
+    seeds = []
+    for part in s.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part[1:]:
+            i = part.index('-', 1)
+            first, last = int(part[:i]), int(part[i+1:])
+            if first > last:
+                raise ValueError('invalid seed range: ' + part)
+            seeds.extend(xrange(first, last+1))
+        else:
+            seeds.append(int(part))
+    if not seeds:
+        raise ValueError('no seeds: ' + s)
+    return seeds
+
+
+def findGame(gdb, game):
+    # game id, name or alternate name (case insensitive)
+    try:
+        gameid = int(game)
+    except ValueError:
+        gameid = gdb.getGameByName(game)
+        if gameid is None:
+            name = game.lower()
+            for id in gdb.getGamesIdSortedById():
+                gi = gdb.get(id)
+                if name in [n.lower() for n in (gi.name,)+gi.altnames]:
+                    gameid = id
+                    break
+    if gameid is None or gdb.get(gameid) is None:
+        return None
+    return gameid
+
+
+# ************************************************************************
+# * play
+# ************************************************************************
+
+def playDemo(game, level=2):
+    # see Game.startDemo() and Game.demoEvent();
+    # returns (won, stuck, seconds spent in computing hints)
+    demo = Struct(
+        level = level,
+        mixed = 0,
+        sleep = 0,
+        last_deal = [],
+        snapshots = set(),
+        hint = None,
+        keypress = None,
+        start_demo_moves = game.stats.demo_moves,
+        info_text = None,
+        stuck = None,
+    )
+    hint_time = [0.0]
+    getHints = game.getHints
+    def timedGetHints(level, taken_hint=None):
+        t0 = time.time()
+        try:
+            return getHints(level, taken_hint)
+        finally:
+            hint_time[0] += time.time() - t0
+    game.getHints = timedGetHints
+    game.demo = demo
+    game.hints.list = None
+    try:
+        while True:
+            finished = game.playOneDemoMove(demo)
+            game.finishMove()
+            game.hints.list = None
+            if game.isGameWon():
+                return True, None, hint_time[0]
+            if finished:
+                return False, demo.stuck, hint_time[0]
+    finally:
+        game.demo = None
+        del game.getHints
+
+
+class _NullDialog:
+    def setText(self, **kw):
+        pass
+
+
+def startSolver(game):
+    # level 3 hints come from game.solver (see the solver dialog)
+    if game.Solver_Class is None:
+        raise ValueError('no solver for this game')
+    solver = game.Solver_Class(game, _NullDialog())
+    solver.computeHints()
+    game.solver = solver
+
+
+def playDeal(app, gameid, seed, level=2):
+    t0 = time.time()
+    try:
+        random = constructRandom(str(seed))
+        game = app.game
+        if game is None or game.id != gameid:
+            game = app.runGame(gameid, random=random, autoplay=0)
+        else:
+            game.newGame(random=random, autoplay=0)
+        solve_time = 0.0
+        if level == 3:
+            t1 = time.time()
+            startSolver(game)
+            solve_time = time.time() - t1
+        won, stuck, hint_time = playDemo(game, level)
+        hint_time += solve_time
+        moves = game.moves.index
+    except Exception, err:
+        # the game is in an unknown state now
+        app.game = None
+        won, stuck, moves = False, 'error: %s: %s' % (err.__class__.__name__,
+                                                      err), 0
+        hint_time = 0.0
+    return {
+        'gameid': gameid,
+        'seed': seed,
+        'won': won,
+        'moves': moves,
+        'elapsed': round(time.time() - t0, 4),
+        'hint_time': round(hint_time, 4),
+        'stuck': stuck,
+        }
+
+
+def benchmarkGame(app, gameid, seeds, level=2):
+    # play all seeds of one game and sum up the results
+    t0 = time.time()
+    won = moves = errors = 0
+    hint_time = 0.0
+    stuck = {}
+    for seed in seeds:
+        r = playDeal(app, gameid, seed, level)
+        won += r['won']
+        moves += r['moves']
+        hint_time += r['hint_time']
+        if r['stuck']:
+            if r['stuck'].startswith('error: '):
+                errors += 1
+                key = 'error'
+            else:
+                key = r['stuck']
+            stuck[key] = stuck.get(key, 0) + 1
+    ndeals = len(seeds)
+    return {
+        'gameid': gameid,
+        'name': app.getGameTitleName(gameid),
+        'deals': ndeals,
+        'won': won,
+        'win_rate': round(float(won) / ndeals, 4),
+        'avg_moves': round(float(moves) / ndeals, 2),
+        'hint_time_per_move': round(hint_time / max(1, moves), 6),
+        'wall_time': round(time.time() - t0, 3),
+        'errors': errors,
+        'stuck': stuck,
+        }
+
+
+# ************************************************************************
+# * worker pool
+# ************************************************************************
+
+# one application per worker process
+_app = None
+
+def _initWorker(french_only, solver_cache=None):
+    global _app
+    _app = HeadlessApplication(french_only=french_only,
+                               solver_cache=solver_cache)
+
+
+def _playDealTask(args):
+    gameid, seed, level = args
+    return playDeal(_app, gameid, seed, level)
+
+
+def _benchmarkGameTask(args):
+    gameid, seeds, level = args
+    return benchmarkGame(_app, gameid, seeds, level)
+
+
+def playDeals(gameid, seeds, jobs=1, level=2, french_only=False,
+              solver_cache=None):
+    # generator: yields the records in the order of seeds
+    tasks = ((gameid, seed, level) for seed in seeds)
+    if jobs <= 1:
+        app = HeadlessApplication(french_only=french_only,
+                                  solver_cache=solver_cache)
+        for seed in seeds:
+            yield playDeal(app, gameid, seed, level)
+        return
+    # many small chunks keep the workers busy until the end of the run
+    chunksize = max(1, min(64, len(seeds) // (jobs * 8)))
+    pool = multiprocessing.Pool(jobs, _initWorker,
+                                (french_only, solver_cache))
+    try:
+        for r in pool.imap(_playDealTask, tasks, chunksize):
+            yield r
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def benchmarkGames(gameids, seeds, jobs=1, level=2, french_only=False,
+                   solver_cache=None):
+    # generator: yields one summary per game in the order of gameids
+    tasks = [(gameid, seeds, level) for gameid in gameids]
+    if jobs <= 1:
+        app = HeadlessApplication(french_only=french_only,
+                                  solver_cache=solver_cache)
+        for gameid in gameids:
+            yield benchmarkGame(app, gameid, seeds, level)
+        return
+    pool = multiprocessing.Pool(jobs, _initWorker,
+                                (french_only, solver_cache))
+    try:
+        for r in pool.imap(_benchmarkGameTask, tasks):
+            yield r
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def compareReports(old, new, time_factor=1.5, min_time=0.0005):
+    # compare two reports of benchmarkGames(); returns a list of lines
+    # (win rate changes, hint-engine slowdowns, new errors)
+    res = []
+    old_games = dict([(g['gameid'], g) for g in old['games']])
+    new_games = dict([(g['gameid'], g) for g in new['games']])
+    for gameid in sorted(new_games):
+        n = new_games[gameid]
+        o = old_games.get(gameid)
+        name = '%d %s' % (gameid, n['name'])
+        if o is None:
+            res.append('%s: new game' % name)
+            continue
+        if n['won'] != o['won']:
+            res.append('%s: won %d -> %d of %d' %
+                       (name, o['won'], n['won'], n['deals']))
+        if n['errors'] > o['errors']:
+            res.append('%s: errors %d -> %d' %
+                       (name, o['errors'], n['errors']))
+        t1, t2 = o['hint_time_per_move'], n['hint_time_per_move']
+        if t2 > min_time and t2 > t1 * time_factor:
+            res.append('%s: hint time per move %.2f -> %.2f ms' %
+                       (name, t1 * 1000, t2 * 1000))
+    for gameid in sorted(old_games):
+        if gameid not in new_games:
+            res.append('%d %s: game removed' %
+                       (gameid, old_games[gameid]['name']))
+    return res
+
+
+# ************************************************************************
+# * command line
+# ************************************************************************
+
+def parse_option(argv):
+    prog_name = argv[0]
+    try:
+        optlist, args = getopt.getopt(argv[1:], "g:i:s:j:l:o:h",
+                                      ["game=", "gameid=",
+                                       "seeds=",
+                                       "jobs=",
+                                       "level=",
+                                       "output=",
+                                       "solver-cache=",
+                                       "french-only",
+                                       "help"])
+    except getopt.GetoptError, err:
+        print_err(_("%s\ntry %s --help for more information") %
+                  (err, prog_name), 0)
+        return None
+    opts = {"help"        : False,
+            "game"        : None,
+            "seeds"       : "1-100",
+            "jobs"        : multiprocessing.cpu_count(),
+            "level"       : 2,
+            "output"      : None,
+            "solver-cache": None,
+            "french-only" : False,
+            }
+    try:
+        for i in optlist:
+            if i[0] in ("-h", "--help"):
+                opts["help"] = True
+            elif i[0] in ("-g", "--game", "-i", "--gameid"):
+                opts["game"] = i[1]
+            elif i[0] in ("-s", "--seeds"):
+                opts["seeds"] = i[1]
+            elif i[0] in ("-j", "--jobs"):
+                opts["jobs"] = int(i[1])
+            elif i[0] in ("-l", "--level"):
+                opts["level"] = int(i[1])
+            elif i[0] in ("-o", "--output"):
+                opts["output"] = i[1]
+            elif i[0] == "--solver-cache":
+                opts["solver-cache"] = i[1]
+            elif i[0] == "--french-only":
+                opts["french-only"] = True
+    except ValueError, err:
+        print_err(_("%s\ntry %s --help for more information") %
+                  (err, prog_name), 0)
+        return None
+
+    if opts["help"]:
+        print _("""Usage: %s [OPTIONS]
+  -g    --game=GAMENAME        play game GAMENAME
+  -i    --gameid=GAMEID        play game GAMEID
+  -s    --seeds=SEEDS          game numbers to play (default: 1-100)
+  -j    --jobs=N               number of worker processes
+  -l    --level=LEVEL          hint level: 2 (default) or 3 (use solver)
+  -o    --output=FILE          write the results to FILE (default: stdout)
+        --solver-cache=DIR     keep the solver results in DIR (level 3)
+        --french-only
+  -h    --help                 display this help and exit
+
+  SEEDS - e.g. 1-1000 or 1,5,10-20
+""") % prog_name
+        return None
+
+    if opts["game"] is None:
+        print_err(_("no game given\ntry %s --help for more information") %
+                  prog_name, 0)
+        return None
+    if args:
+        print_err(_("too many arguments\ntry %s --help for more information") %
+                  prog_name, 0)
+        return None
+    return opts
+
+
+def main(argv):
+    opts = parse_option(argv)
+    if opts is None:
+        return 1
+    try:
+        seeds = parseSeeds(opts["seeds"])
+    except ValueError, err:
+        print_err(str(err), 0)
+        return 1
+    if opts["level"] not in (2, 3):
+        print_err(_("invalid hint level: %d") % opts["level"], 0)
+        return 1
+    # register the games
+    app = HeadlessApplication(french_only=opts["french-only"])
+    gameid = findGame(app.gdb, opts["game"])
+    if gameid is None:
+        print_err(_("can't find game: ") + opts["game"], 0)
+        return 1
+    app = None
+    #
+    if opts["output"]:
+        out = open(opts["output"], 'w')
+    else:
+        out = sys.stdout
+    t0 = time.time()
+    ndeals = nwon = 0
+    try:
+        for r in playDeals(gameid, seeds, opts["jobs"], opts["level"],
+                           french_only=opts["french-only"],
+                           solver_cache=opts["solver-cache"]):
+            out.write(json.dumps(r, sort_keys=True) + '\n')
+            ndeals += 1
+            nwon += r['won']
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    t = time.time() - t0
+    print >> sys.stderr, '%d deals, %d won (%.1f%%), %.1f sec' % (
+        ndeals, nwon, 100.0 * nwon / max(1, ndeals), t)
+    return 0
@@ -56,6 +56,10 @@ from pysollib.move import ASingleFlipMove, ATurnStackMove
 from pysollib.move import ANextRoundMove, ASaveSeedMove, AShuffleStackMove
 from pysollib.move import AUpdateStackMove, AFlipAllMove, ASaveStateMove
 from pysollib.move import ASingleCardMove
+from pysollib.zobrist import ZobristHash
+from pysollib.journal import readJournal
+from pysollib.savefile import isSaveFile, packSaveFile, unpackSaveFile
+from pysollib.savefile import packMoves, unpackMoves, HookWriter, HookReader
 from pysollib.hint import DefaultHint
 from pysollib.help import help_about
 
@@ -90,6 +94,10 @@ class Game:
     # the format for a saved game changed (see also canLoadGame())
     GAME_VERSION = 1
 
+    # keep a checkpoint of the position every CHECKPOINT_INTERVAL moves,
+    # see gotoMove()
+    CHECKPOINT_INTERVAL = 100
+
 
     #
     # game construction
@@ -111,11 +119,15 @@ class Game:
         self.stackmap = {}              # dict with (x,y) tuples as key
         self.allstacks = []
         self.sn_groups = []  # snapshot groups; list of list of similar stacks
-        self.snapshots = []
-        self.failed_snapshots = []
+        self.zobrist = None  # position hash, see getSnapshot()
+        self.snapshots = set()
+        self.failed_snapshots = set()
+        self.checkpoints = {}  # moves.index -> position, see gotoMove()
+        self.journal = None    # autosave journal, see _startJournal()
         self.stackdesc_list = []
         self.demo_logo = None
         self.pause_logo = None
+        self.prefetch_timer = None  # see prefetchCardFaces()
         self.s = Struct(                # stacks
             talon = None,
             waste = None,
@@ -162,6 +174,7 @@ class Game:
         self.sg.hp_stacks = [s for s in self.sg.dropstacks
                              if s.cap.max_move >= 2]
         self.createSnGroups()
+        self.zobrist = ZobristHash(len(self.allstacks))
         # convert stackgroups to tuples (speed)
         self.allstacks = tuple(self.allstacks)
         self.s.foundations = tuple(self.s.foundations)
@@ -368,6 +381,9 @@ class Game:
         self.busy = old_busy
 
     def destruct(self):
+        if self.prefetch_timer:
+            after_cancel(self.prefetch_timer)
+            self.prefetch_timer = None
         # help breaking circular references
         for obj in self.cards:
             destruct(obj)
@@ -392,9 +408,10 @@ class Game:
             stacks = None,
             talon_round = 1,
             ncards = 0,
+            journal = None,             # records to replay
         )
-        self.snapshots = []
-        self.failed_snapshots = []
+        self.snapshots = set()
+        self.failed_snapshots = set()
         # local statistics are reset on each game restart
         self.stats = Struct(
             hints = 0,                  # number of hints consumed
@@ -415,6 +432,9 @@ class Game:
             elapsed_time = 0.0,
             pause_start_time = 0.0,
         )
+        if restart:
+            # the bookmarks survive a restart, the move history does not
+            self._detachBookmarks(0)
         self.startMoves()
         if restart:
             return
@@ -514,7 +534,9 @@ class Game:
         self.startMoves()
         for stack in self.allstacks:
             stack.updateText()
+        self.zobrist.reset(self.allstacks)
         self.updateSnapshots()
+        self.checkpoints[0] = self._getCheckpoint()
         self.updateText()
         self.updateStatus(moves=(0, 0))
         self.updateMenus()
@@ -527,10 +549,12 @@ class Game:
         if not self.preview:
             self.startPlayTimer()
         self.busy = old_busy
+        self._startJournal()
 
     # restore a loaded game (see load/save below)
     def restoreGame(self, game, reset=1):
         old_busy, self.busy = self.busy, 1
+        self.journal = None
         if reset:
             self.reset()
         self.resetGame()
@@ -568,6 +592,8 @@ class Game:
             self.allstacks[stack_id].cap.update(cap.__dict__)
         # 5) subclass settings
         self._restoreGameHook(game)
+        self.zobrist.reset(self.allstacks)
+        self.checkpoints = {self.moves.index: self._getCheckpoint()}
         # 6) update view
         for stack in self.allstacks:
             stack.updateText()
@@ -592,14 +618,15 @@ class Game:
                 self.top.update_idletasks()
                 self.top.show_now()
         #
+        if game.loadinfo.journal:
+            self._replayJournal(game.loadinfo.journal)
+        self._startJournal()
         self.startPlayTimer()
 
     # restore a bookmarked game (e.g. after changing the cardset)
     def restoreGameFromBookmark(self, bookmark):
         old_busy, self.busy = self.busy, 1
-        file = StringIO(bookmark)
-        p = Unpickler(file)
-        game = self._undumpGame(p, self.app)
+        game = self._undumpGameString(bookmark, self.app)
         assert game.id == self.id
         self.restoreGame(game, reset=0)
         destruct(game)
@@ -640,10 +667,7 @@ class Game:
         self.updateTime()
         if bookmark:
             id, random = self.id, self.random
-            file = StringIO()
-            p = Pickler(file, 1)
-            self._dumpGame(p, bookmark=1)
-            self.app.nextgame.bookmark = file.getvalue()
+            self.app.nextgame.bookmark = self._dumpGameString(bookmark=1)
         if id > 0:
             self.setCursor(cursor=CURSOR_WATCH)
         self.app.nextgame.id = id
@@ -706,11 +730,12 @@ class Game:
                 xf = yf = min(xf, yf)
         else:
             xf, yf = self.app.opt.scale_x, self.app.opt.scale_y
-        # images
-        self.app.images.resize(xf, yf)
-        # cards
-        for card in self.cards:
-            card.update(card.id, card.deck, card.suit, card.rank, self)
+        # images; the images are scaled in steps, see Images.quantizeScale
+        xf, yf = self.app.images.quantizeScale(xf, yf)
+        if self.app.images.resize(xf, yf):
+            # cards
+            for card in self.cards:
+                card.update(card.id, card.deck, card.suit, card.rank, self)
         return xf, yf
 
     def resizeGame(self):
@@ -778,17 +803,9 @@ class Game:
         self.moves.state = old_state
 
     def getSnapshot(self):
-        # generate hash (unique string) of current move
-        sn = []
-        for stack in self.allstacks:
-            s = []
-            for card in stack.cards:
-                s.append('%d%03d%d' % (card.suit, card.rank, card.face_up))
-            sn.append(''.join(s))
-        sn = '-'.join(sn)
-        # optimisation
-        sn = hash(sn)
-        return sn
+        # hash of the current position; kept up to date by the atomic
+        # moves (see zobrist.py)
+        return self.zobrist.getValue(self.allstacks)
 
     def createSnGroups(self):
         # group stacks by class and cap
@@ -809,13 +826,7 @@ class Game:
 
 
     def updateSnapshots(self):
-        sn = self.getSnapshot()
-        if sn in self.snapshots:
-            ##self.updateStatus(snapshot=True)
-            pass
-        else:
-            self.snapshots.append(sn)
-            ##self.updateStatus(snapshot=False)
+        self.snapshots.add(self.getSnapshot())
 
 
     #
@@ -1263,7 +1274,7 @@ class Game:
         if card.face_up:
             im2 = card._back_image._pil_image
         else:
-            im2 = card._face_image._pil_image
+            im2 = card.getFaceImage()._pil_image
         w, h = im1.size
         id = card.item.id
         #
@@ -1506,7 +1517,7 @@ class Game:
             scards.append(c)
             cards.remove(c)
         for c in scards:
-            self.win_animation.images.append(c._face_image._pil_image)
+            self.win_animation.images.append(c.getFaceImage()._pil_image)
         # compute visible geometry
         self.win_animation.width = self.canvas.winfo_width()
         self.win_animation.height = self.canvas.winfo_height()
@@ -1591,6 +1602,26 @@ class Game:
     def getCardShadeImage(self):
         return self.app.images.getShade()
 
+    def prefetchCardFaces(self, n=4):
+        # the face images are loaded on first use; get the faces of the
+        # face down cards a few at a time when Tk is idle, so that turning
+        # a card does not have to wait for its image
+        if self.prefetch_timer:
+            after_cancel(self.prefetch_timer)
+            self.prefetch_timer = None
+        if not hasattr(Card, 'getFaceImage'):
+            return
+        cards = [c for c in self.cards if not c.face_up]
+        self._prefetchCardFaces(cards, n)
+
+    def _prefetchCardFaces(self, cards, n):
+        self.prefetch_timer = None
+        for card in cards[:n]:
+            card.getFaceImage()
+        if len(cards) > n:
+            self.prefetch_timer = after_idle(self.top, self._prefetchCardFaces,
+                                             cards[n:], n)
+
     #
     # layout support
     #
@@ -2400,11 +2431,12 @@ Congratulations, you did it !
             mixed = mixed,
             sleep = self.app.opt.timeouts['demo'],
             last_deal = [],
-            snapshots = [],
+            snapshots = set(),
             hint = None,
             keypress = None,
             start_demo_moves = self.stats.demo_moves,
             info_text = None,
+            stuck = None,
         )
         self.hints.list = None
         self.createDemoInfoText()
@@ -2534,10 +2566,12 @@ Congratulations, you did it !
             if self.demo:
                 after_idle(self.top, self.demoEvent) # schedule next move
 
-    # play one demo move while in the demo event
+    # play one demo move while in the demo event;
+    # when the demo gives up the reason is kept in demo.stuck
     def playOneDemoMove(self, demo):
         if self.moves.index > 2000:
             # we're probably looping because of some bug in the hint code
+            demo.stuck = 'too many moves'
             return 1
         sleep = demo.sleep
         # first try to deal cards to the Waste (unless there was a forced move)
@@ -2548,6 +2582,7 @@ Congratulations, you did it !
         h = self.showHint(demo.level, sleep, taken_hint=demo.hint)
         demo.hint = h
         if not h:
+            demo.stuck = 'no hints'
             return 1
         # now actually play the hint
         score, pos, ncards, from_stack, to_stack, text_color, forced_move = h
@@ -2555,6 +2590,7 @@ Congratulations, you did it !
             # a deal-move
             # do not let games like Klondike and Canfield deal forever
             if self.dealCards() == 0:
+                demo.stuck = 'no more deals'
                 return 1
             if 0:                       # old version, based on dealing card
                 c = self.s.talon.getCard()
@@ -2569,8 +2605,9 @@ Congratulations, you did it !
                 sn = self.getSnapshot()
                 if sn in demo.snapshots:
                     # not unique
+                    demo.stuck = 'repeated position'
                     return 1
-                demo.snapshots.append(sn)
+                demo.snapshots.add(sn)
         elif from_stack == to_stack:
             # a flip-move
             from_stack.flipMove(animation=True)
@@ -2667,7 +2704,7 @@ Congratulations, you did it !
     def getStuck(self):
         h = self.Stuck_Class.getHints(None)
         if h:
-            self.failed_snapshots = []
+            self.failed_snapshots = set()
             return True
         if not self.canDealCards():
             return False
@@ -2675,7 +2712,7 @@ Congratulations, you did it !
         sn = self.getSnapshot()
         if sn in self.failed_snapshots:
             return False
-        self.failed_snapshots.append(sn)
+        self.failed_snapshots.add(sn)
         return True
 
     def updateStuck(self):
@@ -2709,10 +2746,11 @@ Congratulations, you did it !
     def startMoves(self):
         self.moves = Struct(
             state = self.S_PLAY,
-            history = [],        # list of lists of atomic moves
+            history = [],        # list of tuples of atomic moves
             index = 0,
             current = [],        # atomic moves for the current move
         )
+        self.checkpoints = {}
         # reset statistics
         self.stats.undo_moves = 0
         self.stats.redo_moves = 0
@@ -2851,20 +2889,27 @@ Congratulations, you did it !
                         break
                 else:
                     redo = 1
-        # add current move to history (which is a list of lists)
+        # add current move to history (which is a list of tuples)
         if redo:
             ###print "detected redo:", current
             # overwrite existing entry because minor things like
             # shadow/frames may have changed
-            moves.history[moves.index] = current
+            moves.history[moves.index] = tuple(current)
             moves.index += 1
         else:
             # resize (i.e. possibly shorten list from previous undos)
-            moves.history[moves.index : ] = [current]
+            if moves.index < len(moves.history):
+                self._dropCheckpoints(moves.index)
+                self._detachBookmarks(moves.index)
+            moves.history[moves.index : ] = [tuple(current)]
             moves.index += 1
             assert moves.index == len(moves.history)
+        if moves.index % self.CHECKPOINT_INTERVAL == 0:
+            self.checkpoints[moves.index] = self._getCheckpoint()
 
         moves.current = []
+        if self.journal:
+            self._journalMove(moves.index - 1, not redo)
         self.updateSnapshots()
         # update view
         self.updateText()
@@ -2889,10 +2934,8 @@ Congratulations, you did it !
             return
         self.moves.index -= 1
         m = self.moves.history[self.moves.index]
-        m = m[:]
-        m.reverse()
         self.moves.state = self.S_UNDO
-        for atomic_move in m:
+        for atomic_move in reversed(m):
             atomic_move.undo(self)
         self.moves.state = self.S_PLAY
         self.stats.undo_moves += 1
@@ -2903,8 +2946,10 @@ Congratulations, you did it !
         self.updateStatus(moves=(self.moves.index, self.stats.total_moves))
         self.updateMenus()
         self.updateStatus(stuck='')
-        self.failed_snapshots = []
+        self.failed_snapshots = set()
         reset_solver_dialog()
+        if self.journal:
+            self._journalSeek()
 
 
     def redo(self):
@@ -2932,6 +2977,240 @@ Congratulations, you did it !
         self.updateMenus()
         self.updateStuck()
         reset_solver_dialog()
+        if self.journal:
+            self._journalSeek()
+
+    # Undo or redo to the given index of the move history in one batch:
+    # no animations and the view is updated only once at the end. When a
+    # checkpoint is closer to the target than the current index the
+    # position is restored from it and only the remaining moves are
+    # replayed.
+    def gotoMove(self, index):
+        moves = self.moves
+        assert moves.state == self.S_PLAY and len(moves.current) == 0
+        index = max(0, min(index, len(moves.history)))
+        if index == moves.index:
+            return
+        if index < moves.index:
+            assert self.canUndo()
+        else:
+            assert self.canRedo()
+        if self._hasOwnHistory():
+            # the game has its own move history, go step by step
+            while moves.index > index:
+                self.undo()
+            while moves.index < index:
+                self.redo()
+            return
+        old_index = moves.index
+        opt = self.app.opt
+        animations, flip_animation = opt.animations, opt.flip_animation
+        opt.animations, opt.flip_animation = 0, False
+        try:
+            start = [i for i in self.checkpoints if i <= index]
+            if start and self._canUseCheckpoints():
+                start = max(start)
+                if index - start < abs(index - moves.index):
+                    self._restoreCheckpoint(self.checkpoints[start])
+                    moves.index = start
+            interval = self.CHECKPOINT_INTERVAL
+            moves.state = self.S_UNDO
+            while moves.index > index:
+                moves.index -= 1
+                for atomic_move in reversed(moves.history[moves.index]):
+                    atomic_move.undo(self)
+                if moves.index % interval == 0 and \
+                       moves.index not in self.checkpoints:
+                    self.checkpoints[moves.index] = self._getCheckpoint()
+            moves.state = self.S_REDO
+            while moves.index < index:
+                for atomic_move in moves.history[moves.index]:
+                    atomic_move.redo(self)
+                moves.index += 1
+                if moves.index % interval == 0 and \
+                       moves.index not in self.checkpoints:
+                    self.checkpoints[moves.index] = self._getCheckpoint()
+        finally:
+            moves.state = self.S_PLAY
+            opt.animations, opt.flip_animation = animations, flip_animation
+        n = abs(index - old_index)
+        if index < old_index:
+            self.stats.undo_moves += n
+        else:
+            self.stats.redo_moves += n
+        self.stats.total_moves += n
+        self.hints.list = None
+        for stack in self.allstacks:
+            stack.updateText()
+        self.updateSnapshots()
+        self.updateText()
+        self.updateStatus(moves=(moves.index, self.stats.total_moves))
+        self.updateMenus()
+        if index < old_index:
+            self.updateStatus(stuck='')
+            self.failed_snapshots = set()
+        else:
+            self.updateStuck()
+        reset_solver_dialog()
+        if self.journal:
+            self._journalSeek()
+
+    # checkpoints: the cards of all stacks (card id and face up flag
+    # packed in an int), the talon round, the game variables, what
+    # _getCheckpointHook() returns and the state of the random generator
+    # (for the shuffles of later redeals)
+    def _getCheckpoint(self):
+        stacks = []
+        for stack in self.allstacks:
+            stacks.append(tuple([(c.id << 1) | c.face_up
+                                 for c in stack.cards]))
+        return (tuple(stacks), self.s.talon.round, self.getState(),
+                self._getCheckpointHook(), self.random.getstate())
+
+    def _restoreCheckpoint(self, checkpoint):
+        stacks, talon_round, state, hook_state, random_state = checkpoint
+        changed = []
+        for stack, cards in zip(self.allstacks, stacks):
+            if len(stack.cards) != len(cards) or \
+                   [(c.id << 1) | c.face_up for c in stack.cards] != list(cards):
+                changed.append((stack, cards))
+        # first empty all changed stacks, then fill them
+        old_state = self.moves.state
+        self.moves.state = self.S_RESTORE
+        for stack, cards in changed:
+            while stack.cards:
+                stack.removeCard(update=0)
+        for stack, cards in changed:
+            for c in cards:
+                card = self.cards[c >> 1]
+                if c & 1:
+                    card.showFace()
+                else:
+                    card.showBack()
+                stack.addCard(card, update=0)
+        self.moves.state = old_state
+        self.s.talon.round = talon_round
+        self.setState(state)
+        self._restoreCheckpointHook(hook_state)
+        self.random.setstate(random_state)
+        self.zobrist.reset(self.allstacks)
+
+    # a Stack.updateModel() of the game changes the game in a way that
+    # a checkpoint does not keep, unless the game has a checkpoint hook
+    def _canUseCheckpoints(self):
+        from pysollib.stack import Stack
+        if self.__class__._getCheckpointHook.im_func is not \
+               Game._getCheckpointHook.im_func:
+            return True
+        for stack in self.allstacks:
+            if stack.__class__.updateModel.im_func is not \
+                   Stack.updateModel.im_func:
+                return False
+        return True
+
+    def _dropCheckpoints(self, index):
+        # the history after index is about to be replaced
+        for i in self.checkpoints.keys():
+            if i > index:
+                del self.checkpoints[i]
+
+    # games with their own undo/redo keep extra values in the history
+    def _hasOwnHistory(self):
+        cls = self.__class__
+        return (cls.undo.im_func is not Game.undo.im_func or
+                cls.redo.im_func is not Game.redo.im_func or
+                cls.finishMove.im_func is not Game.finishMove.im_func)
+
+    # The autosave journal (see journal.py): the whole game is saved
+    # when it starts, after that only moves and seeks are appended.
+    def _startJournal(self):
+        journal = getattr(self.app, 'journal', None)
+        self.journal = None
+        if not journal or self.preview:
+            return
+        if self._hasOwnHistory() or not self.canSaveGame():
+            journal.remove()
+            return
+        try:
+            journal.start(self._dumpGameString(bookmark=1))
+        except EnvironmentError, ex:
+            print_err('cannot write the autosave journal: %s' % ex)
+            return
+        self.journal = journal
+
+    # games without undo and games that save extra values (a score,
+    # the base rank, ...) may keep state outside of the move history;
+    # they are saved as a whole after each move
+    def _journalSavesGame(self):
+        return (not self.canUndo() or
+                self.__class__._saveGameHook.im_func is not
+                Game._saveGameHook.im_func)
+
+    def _journalMove(self, index, truncated):
+        if self._journalSavesGame():
+            self._startJournal()
+            return
+        try:
+            entry = packMoves([self.moves.history[index]])[0]
+        except ValueError:
+            self._startJournal()
+            return
+        self._journalAppend(('m', index, entry, truncated))
+
+    def _journalSeek(self):
+        if self._journalSavesGame():
+            self._startJournal()
+        else:
+            self._journalAppend(('i', self.moves.index))
+
+    def _journalAppend(self, record):
+        try:
+            self.journal.append(record)
+        except EnvironmentError, ex:
+            print_err('cannot write the autosave journal: %s' % ex)
+            self.journal = None
+            return
+        if self.journal.needsCompaction():
+            self._startJournal()
+
+    # replay the records of a journal, see _loadJournal()
+    def _replayJournal(self, records):
+        moves, stats = self.moves, self.stats
+        try:
+            for record in records:
+                if record[0] == 'm':
+                    kind, index, entry, truncated = record
+                    entry = tuple(unpackMoves([entry])[0])
+                    if not 0 <= index <= len(moves.history):
+                        break
+                    self.gotoMove(index)
+                    if truncated:
+                        self._dropCheckpoints(index)
+                        self._detachBookmarks(index)
+                        moves.history[index : ] = [entry]
+                    else:
+                        moves.history[index] = entry
+                    moves.state = self.S_REDO
+                    for atomic_move in entry:
+                        atomic_move.redo(self)
+                    moves.state = self.S_PLAY
+                    moves.index = index + 1
+                    stats.player_moves += 1
+                    stats.total_moves += 1
+                    self.updateSnapshots()
+                elif record[0] == 'i':
+                    kind, index = record
+                    self.gotoMove(index)
+                else:
+                    break
+        except (UnpicklingError, ValueError, TypeError, IndexError):
+            # a damaged record; keep what was replayed so far
+            moves.state = self.S_PLAY
+        for stack in self.allstacks:
+            stack.updateText()
+        self.updateText()
+        self.updateStatus(moves=(moves.index, stats.total_moves))
+        self.updateMenus()
 
 
     #
@@ -2949,6 +3228,21 @@ Congratulations, you did it !
     #
     # bookmarks
     #
+    # A bookmark is a Struct with the index into the move history. While
+    # the history up to that index is unchanged, that is all we need:
+    # going to the bookmark is a seek in the history (see gotoMove()).
+    # The state of game.random is kept too, and set back after the seek:
+    #   random - random.getstate() (None in bookmarks of older versions)
+    # When the history gets replaced by
+    # a new move or a restart, the lost part of the bookmark's branch
+    # is copied into the bookmark (see _detachBookmarks()):
+    #   base - the history up to this index is shared with the game
+    #          (None while the bookmark is attached)
+    #   tail - the bookmark's own history entries after base
+    #
+    # Games without undo keep the old bookmarks: a tuple with the whole
+    # game saved to a string (see _dumpGameString()) and the move index.
+    #
 
     def setBookmark(self, n, confirm=1):
         self.finishMove()       # just in case
@@ -2960,11 +3254,13 @@ Congratulations, you did it !
             if not self.areYouSure(_("Set bookmark"),
                                    _("Replace existing bookmark %d ?") % (n+1)):
                 return 0
-        file = StringIO()
-        p = Pickler(file, 1)
+        if self.canUndo():
+            bm = Struct(index=self.moves.index, base=None, tail=[],
+                        random=self.random.getstate())
+            self.gsaveinfo.bookmarks[n] = bm
+            return 1
         try:
-            self._dumpGame(p, bookmark=2)
-            bm = (file.getvalue(), self.moves.index)
+            bm = (self._dumpGameString(bookmark=2), self.moves.index)
         except:
             pass
         else:
@@ -2983,12 +3279,36 @@ Congratulations, you did it !
             if not self.areYouSure(_("Goto bookmark"),
                                    _("Goto bookmark %d ?") % (n+1)):
                 return
+        if isinstance(bm, tuple):
+            self._gotoSavedBookmark(n, bm, update_stats)
+            return
+        self.setCursor(cursor=CURSOR_WATCH)
+        # save state for undoGotoBookmark
+        self.setBookmark(-1, confirm=0)
+        if bm.base is not None:
+            # switch to the bookmark's branch of the move history
+            self.gotoMove(bm.base)
+            self._dropCheckpoints(bm.base)
+            self._detachBookmarks(bm.base)
+            self.moves.history[bm.base : ] = bm.tail
+            bm.base, bm.tail = None, []
+            # the journal only records moves, start it anew
+            self._startJournal()
+        self.gotoMove(bm.index)
+        random_state = getattr(bm, 'random', None)
+        if random_state is not None:
+            self.random.setstate(random_state)
+        if update_stats:
+            self.stats.goto_bookmark_moves = self.stats.goto_bookmark_moves + 1
+            self.gstats.goto_bookmark_moves = self.gstats.goto_bookmark_moves + 1
+        self.setCursor(cursor=self.app.top_cursor)
+
+    # bookmarks of older versions and of games without undo
+    def _gotoSavedBookmark(self, n, bm, update_stats):
         try:
             s, moves_index = bm
             self.setCursor(cursor=CURSOR_WATCH)
-            file = StringIO(s)
-            p = Unpickler(file)
-            game = self._undumpGame(p, self.app)
+            game = self._undumpGameString(s, self.app)
             assert game.id == self.id
             # save state for undoGotoBookmark
             self.setBookmark(-1, confirm=0)
@@ -2999,9 +3319,24 @@ Congratulations, you did it !
             if update_stats:
                 self.stats.goto_bookmark_moves = self.stats.goto_bookmark_moves + 1
                 self.gstats.goto_bookmark_moves = self.gstats.goto_bookmark_moves + 1
+            # the whole move history gets replaced
+            self._detachBookmarks(0)
             self.restoreGame(game, reset=0)
             destruct(game)
 
+    # the move history from index on is about to be replaced; keep the
+    # entries the bookmarks still need
+    def _detachBookmarks(self, index):
+        history = self.moves.history
+        for bm in self.gsaveinfo.bookmarks.values():
+            if isinstance(bm, tuple):
+                continue
+            if bm.base is None:
+                if bm.index > index:
+                    bm.base, bm.tail = index, history[index:]
+            elif bm.base > index:
+                bm.base, bm.tail = index, history[index:bm.base] + bm.tail
+
     def undoGotoBookmark(self):
         self.gotoBookmark(-1, update_stats=0)
 
@@ -3084,13 +3419,30 @@ Please report this bug."""))
         f = None
         try:
             f = open(filename, "rb")
-            p = Unpickler(f)
-            game = self._undumpGame(p, app)
-            game.gstats.loaded = game.gstats.loaded + 1
+            data = f.read()
         finally:
             if f: f.close()
+        game = self._undumpGameString(data, app)
+        game.gstats.loaded = game.gstats.loaded + 1
         return game
 
+    # load the game of an autosave journal; the recorded moves are
+    # replayed by restoreGame()
+    def _loadJournal(self, filename, app):
+        data, records = readJournal(filename)
+        game = self._undumpGameString(data, app)
+        game.loadinfo.journal = records
+        return game
+
+    # load a game saved by _dumpGameString(); older versions
+    # pickled the game, see _undumpGame()
+    def _undumpGameString(self, data, app):
+        if isSaveFile(data):
+            header, body = unpackSaveFile(data)
+            return self._undumpGameData(header, body, app)
+        p = Unpickler(StringIO(data))
+        return self._undumpGame(p, app)
+
     def _undumpGame(self, p, app):
         self.updateTime()
         #
@@ -3165,7 +3517,7 @@ in the current implementation.''') % version)
         moves = pload(Struct)
         game.moves.__dict__.update(moves.__dict__)
         snapshots = pload(list)
-        game.snapshots = snapshots
+        game.snapshots = set(snapshots)
         if 0 <= bookmark <= 1:
             gstats = pload(Struct)
             game.gstats.__dict__.update(gstats.__dict__)
@@ -3182,17 +3534,149 @@ in the current implementation.''') % version)
             game.gsaveinfo = self.gsaveinfo
         return game
 
+    def _undumpGameData(self, header, body, app):
+        # see _dumpGameData()
+        self.updateTime()
+        #
+        err_txt = _("Invalid or damaged %s save file") % PACKAGE
+        #
+        def validate(v, txt=err_txt):
+            if not v:
+                raise UnpicklingError(txt)
+        def get(d, key, t=None):
+            validate(isinstance(d, dict) and key in d)
+            obj = d[key]
+            if t is not None:
+                validate(isinstance(obj, t))
+            return obj
+        def getStruct(d, key):
+            obj = get(d, key, dict)
+            for k in obj.keys():
+                validate(isinstance(k, str))
+            return obj
+        #
+        package = get(header, 'package', str)
+        validate(package == PACKAGE)
+        version = get(header, 'version', str)
+        version_tuple = get(header, 'version_tuple', tuple)
+        validate(version_tuple >= (1,0), _('''\
+Cannot load games saved with
+%s version %s''') % (PACKAGE, version))
+        bookmark = get(header, 'bookmark', int)
+        validate(0 <= bookmark <= 2)
+        game_version = get(header, 'game_version', int)
+        validate(game_version > 0)
+        id = get(header, 'id', int)
+        validate(id > 0)
+        game = None
+        if id not in GI.PROTECTED_GAMES:
+            game = app.constructGame(id)
+            if game:
+                if not game.canLoadGame(version_tuple, game_version):
+                    destruct(game)
+                    game = None
+        validate(game is not None, _('''\
+Cannot load this game from version %s
+as the game rules have changed
+in the current implementation.''') % version)
+        game.version = version
+        game.version_tuple = version_tuple
+        #
+        initial_seed = random__long2str(get(body, 'seed', (int, long)))
+        game.random = constructRandom(initial_seed)
+        try:
+            game.random.setstate(get(body, 'random'))
+        except (TypeError, ValueError):
+            validate(False)
+        # the cards: card id and face up flag packed in an int
+        ncards = game.gameinfo.ncards
+        stacks = get(body, 'stacks', tuple)
+        validate(len(stacks) >= 1)
+        game.loadinfo.stacks = []
+        game.loadinfo.ncards = 0
+        for cards in stacks:
+            validate(isinstance(cards, tuple))
+            stack = []
+            for c in cards:
+                validate(isinstance(c, int) and 0 <= c >> 1 < ncards)
+                stack.append((c >> 1, c & 1))
+            game.loadinfo.stacks.append(stack)
+            game.loadinfo.ncards = game.loadinfo.ncards + len(stack)
+        validate(game.loadinfo.ncards == ncards)
+        game.loadinfo.talon_round = get(body, 'talon_round', int)
+        game.finished = get(body, 'finished', (int, bool))
+        if 0 <= bookmark <= 1:
+            saveinfo = getStruct(body, 'saveinfo')
+            stack_caps = []
+            for t in get(saveinfo, 'stack_caps', list):
+                validate(isinstance(t, tuple) and len(t) == 2 and
+                         isinstance(t[1], dict))
+                stack_caps.append((t[0], Struct(**t[1])))
+            saveinfo['stack_caps'] = stack_caps
+            game.saveinfo.__dict__.update(saveinfo)
+            gsaveinfo = getStruct(body, 'gsaveinfo')
+            bookmarks = {}
+            for n, bm in get(gsaveinfo, 'bookmarks', dict).items():
+                if isinstance(bm, tuple):
+                    # a game without undo: the game saved to a string
+                    validate(len(bm) == 2 and isinstance(bm[0], str) and
+                             isSaveFile(bm[0]))
+                else:
+                    validate(isinstance(bm, dict))
+                    random_state = bm.get('random')
+                    validate(isinstance(random_state,
+                                        (tuple, int, long, type(None))))
+                    bm = Struct(index=get(bm, 'index', int),
+                                base=get(bm, 'base', (int, type(None))),
+                                tail=unpackMoves(get(bm, 'tail')),
+                                random=random_state)
+                bookmarks[n] = bm
+            gsaveinfo['bookmarks'] = bookmarks
+            game.gsaveinfo.__dict__.update(gsaveinfo)
+        moves = getStruct(body, 'moves')
+        moves['history'] = unpackMoves(get(moves, 'history'))
+        moves['current'] = list(unpackMoves([get(moves, 'current')])[0])
+        validate(0 <= get(moves, 'index', int) <= len(moves['history']))
+        game.moves.__dict__.update(moves)
+        game.snapshots = set(get(body, 'snapshots', list))
+        if 0 <= bookmark <= 1:
+            game.gstats.__dict__.update(getStruct(body, 'gstats'))
+            game.stats.__dict__.update(getStruct(body, 'stats'))
+        game._loadGameHook(HookReader(get(body, 'hooks', list)))
+        if bookmark == 2:
+            # copy back all variables that are not saved
+            game.stats = self.stats
+            game.gstats = self.gstats
+            game.saveinfo = self.saveinfo
+            game.gsaveinfo = self.gsaveinfo
+        return game
+
     def _saveGame(self, filename, protocol=-1):
         f = None
         try:
             if not self.canSaveGame():
                 raise Exception("Cannot save this game.")
+            data = self._dumpGameString(protocol=protocol)
             f = open(filename, "wb")
-            p = Pickler(f, protocol)
-            self._dumpGame(p)
+            f.write(data)
         finally:
             if f: f.close()
 
+    def _dumpGameString(self, bookmark=0, protocol=-1):
+        try:
+            header, body = self._dumpGameData(bookmark)
+            data = packSaveFile(header, body)
+        except ValueError:
+            # values the compact format can't store (e.g. from the
+            # _saveGameHook of a plugin game); pickle the game
+            file = StringIO()
+            p = Pickler(file, protocol)
+            self._dumpGame(p, bookmark=bookmark)
+            return file.getvalue()
+        if bookmark == 0:
+            self.gstats.saved = self.gstats.saved + 1
+        return data
+
     def _dumpGame(self, p, bookmark=0):
         self.updateTime()
         assert 0 <= bookmark <= 2
@@ -3218,7 +3702,7 @@ in the current implementation.''') % version)
             p.dump(self.saveinfo)
             p.dump(self.gsaveinfo)
         p.dump(self.moves)
-        p.dump(self.snapshots)
+        p.dump(list(self.snapshots))
         if 0 <= bookmark <= 1:
             if bookmark == 0:
                 self.gstats.saved = self.gstats.saved + 1
@@ -3227,6 +3711,68 @@ in the current implementation.''') % version)
         self._saveGameHook(p)
         p.dump("EOF")
 
+    # the compact save format, see savefile.py
+    def _dumpGameData(self, bookmark=0):
+        self.updateTime()
+        assert 0 <= bookmark <= 2
+        header = {
+            'package': PACKAGE,
+            'version': VERSION,
+            'version_tuple': VERSION_TUPLE,
+            'bookmark': bookmark,
+            'game_version': self.GAME_VERSION,
+            'id': self.id,
+            # for listing saved games, see savelibrary.py
+            'name': self.gameinfo.en_name,
+            'seed': self.getGameNumber(format=0),
+            'moves': self.moves.index,
+            'date': int(time.time()),
+            'finished': self.finished,
+            }
+        body = {
+            'seed': random__str2long(self.random.getSeedStr()),
+            'random': self.random.getstate(),
+            'stacks': tuple([tuple([(c.id << 1) | c.face_up
+                                    for c in stack.cards])
+                             for stack in self.allstacks]),
+            'talon_round': self.s.talon.round,
+            'finished': self.finished,
+            }
+        if 0 <= bookmark <= 1:
+            saveinfo = dict(self.saveinfo.__dict__)
+            saveinfo['stack_caps'] = [(stack_id, cap.__dict__)
+                                      for stack_id, cap in saveinfo['stack_caps']]
+            body['saveinfo'] = saveinfo
+            gsaveinfo = dict(self.gsaveinfo.__dict__)
+            bookmarks = {}
+            for n, bm in gsaveinfo['bookmarks'].items():
+                if isinstance(bm, tuple):
+                    if not isSaveFile(bm[0]):
+                        # a pickle of an older version
+                        raise ValueError('pickled bookmark')
+                    bookmarks[n] = bm
+                else:
+                    bookmarks[n] = {'index': bm.index, 'base': bm.base,
+                                    'tail': packMoves(bm.tail),
+                                    'random': getattr(bm, 'random', None)}
+            gsaveinfo['bookmarks'] = bookmarks
+            body['gsaveinfo'] = gsaveinfo
+        moves = dict(self.moves.__dict__)
+        moves['history'] = packMoves(moves['history'])
+        moves['current'] = packMoves([moves['current']])[0]
+        body['moves'] = moves
+        body['snapshots'] = list(self.snapshots)
+        if 0 <= bookmark <= 1:
+            gstats = dict(self.gstats.__dict__)
+            if bookmark == 0:
+                gstats['saved'] = gstats['saved'] + 1
+            body['gstats'] = gstats
+            body['stats'] = dict(self.stats.__dict__)
+        p = HookWriter()
+        self._saveGameHook(p)
+        body['hooks'] = p.values
+        return header, body
+
     #
     # Playing time
     #
@@ -3334,3 +3880,10 @@ in the current implementation.''') % version)
     def _saveGameHook(self, p):
         pass
 
+    def _getCheckpointHook(self):
+        # values changed by moves that getState() does not return
+        return None
+
+    def _restoreCheckpointHook(self, state):
+        pass
+
@@ -23,7 +23,11 @@
 
 
 # imports
+import os
+import sys
 import imp
+import time
+import marshal
 
 # PySol imports
 from pysollib.mfxutil import Struct, print_err
@@ -31,6 +35,7 @@ from pysollib.resource import CSI
 import pysollib.settings
 
 from pysollib.mygettext import _, n_
+from pysollib.settings import VERSION
 
 # ************************************************************************
 # * constants
@@ -488,6 +493,18 @@ class GameInfo(Struct):
                         trumps=tuple(trumps),
                         si=gi_si, rules_filename=rules_filename)
 
+    def __getattr__(self, name):
+        # the class of a game from the manifest is imported on first use
+        if name == 'gameclass' and GAME_DB.loadGameModule(self.id):
+            return self.__dict__['gameclass']
+        raise AttributeError(name)
+
+
+class ManifestGameInfo(GameInfo):
+    # a GameInfo read from the manifest; everything but the gameclass
+    def __init__(self, **kw):
+        Struct.__init__(self, **kw)
+
 
 class GameManager:
     def __init__(self):
@@ -500,12 +517,16 @@ class GameManager:
         self.__games_by_altname = None
         self.__all_games = {}           # includes hidden games
         self.__all_gamenames = {}       # includes hidden games
+        self.__all_gameclasses = {}     # gameclass -> gi, for _check_game
         self.__games_for_solver = []
         self.check_game = True
         self.current_filename = None
         self.registered_game_types = {}
         self.callback = None            # update progress-bar (see main.py)
         self._num_games = 0             # for callback only
+        self.__modules = []             # (gameid, module) in order
+        self.__lazy_modules = {}        # gameid -> module, see loadManifest
+        self.__module_times = {}        # module -> [ngames, import seconds]
 
     def setCallback(self, func):
         self.callback = func
@@ -531,28 +552,47 @@ class GameManager:
             raise GameInfoException("duplicate game name %s: %s and %s" %
                                     (gi.name, str(gi.gameclass),
                                      str(gameclass)))
-        if 1:
-            for id, game in self.__all_games.items():
-                if gi.gameclass is game.gameclass:
-                    raise GameInfoException(
-                        "duplicate game class %s: %s and %s" %
-                        (gi.id, str(gi.gameclass), str(game.gameclass)))
+        if gi.gameclass in self.__all_gameclasses:
+            game = self.__all_gameclasses[gi.gameclass]
+            raise GameInfoException(
+                "duplicate game class %s: %s and %s" %
+                (gi.id, str(gi.gameclass), str(game.gameclass)))
         for n in gi.altnames:
             if n in self.__all_gamenames:
                 raise GameInfoException("duplicate game altname %s: %s" %
                                         (gi.id, n))
 
-    def register(self, gi):
+    def register(self, gi, module=None):
+        # module: the module that registers the game (for the manifest)
         ##print gi.id, gi.short_name.encode('utf-8')
         if not isinstance(gi, GameInfo):
             raise GameInfoException("wrong GameInfo class")
+        if gi.id in self.__lazy_modules:
+            # the module of a game from the manifest was imported
+            del self.__lazy_modules[gi.id]
+            self.__all_games[gi.id].__dict__['gameclass'] = gi.gameclass
+            self.__all_gameclasses[gi.gameclass] = self.__all_games[gi.id]
+            return
         if self.check_game and pysollib.settings.CHECK_GAMES:
             self._check_game(gi)
+        self.__modules.append((gi.id, module))
+        has_solver = (hasattr(gi.gameclass, 'Solver_Class') and
+                      gi.gameclass.Solver_Class is not None)
+        self._addGame(gi, has_solver)
+        if self.current_filename is not None:
+            gi.gameclass.MODULE_FILENAME = self.current_filename
+        if module is None:
+            module = self.current_filename
+        self.__module_times.setdefault(module, [0, 0.0])[0] += 1
+
+    def _addGame(self, gi, has_solver):
         ##if 0 and gi.si.game_flags & GI.GT_XORIGINAL:
         ##    return
         ##print gi.id, gi.name
         self.__all_games[gi.id] = gi
         self.__all_gamenames[gi.name] = gi
+        if 'gameclass' in gi.__dict__:
+            self.__all_gameclasses[gi.gameclass] = gi
         for n in gi.altnames:
             self.__all_gamenames[n] = gi
         if not (gi.si.game_flags & GI.GT_HIDDEN):
@@ -571,11 +611,8 @@ class GameManager:
 ##                     if gi.id in k: break
 ##                 else:
 ##                     print gi.id
-            if hasattr(gi.gameclass, 'Solver_Class') and \
-               gi.gameclass.Solver_Class is not None:
+            if has_solver:
                 self.__games_for_solver.append(gi.id)
-        if self.current_filename is not None:
-            gi.gameclass.MODULE_FILENAME = self.current_filename
 
         if self.callback and self._num_games % 10 == 0:
             self.callback()
@@ -637,6 +674,82 @@ class GameManager:
     def getGamesForSolver(self):
         return self.__games_for_solver
 
+    def addImportTime(self, module, seconds):
+        self.__module_times.setdefault(module, [0, 0.0])[1] += seconds
+
+    def getRegistrationTimes(self):
+        # [(seconds, ngames, module)], the slowest module first
+        l = [(t, n, m) for m, (n, t) in self.__module_times.items()]
+        l.sort(reverse=True)
+        return l
+
+    #
+    # the manifest: the GameInfo of all games of some packages and the
+    # module that registers each of them, so the games can be listed
+    # without importing any game module (see loadGamePackages() below)
+    #
+
+    def loadGameModule(self, gameid):
+        # import the module of a game from the manifest; return True if
+        # the game has its gameclass now
+        module = self.__lazy_modules.get(gameid)
+        if module is not None:
+            __import__(module)
+        return gameid in self.__all_games and gameid not in self.__lazy_modules
+
+    def saveManifest(self, filename, key, packages):
+        prefixes = tuple([p + '.' for p in packages])
+        entries = []
+        for gameid, module in self.__modules:
+            if not module or not module.startswith(prefixes):
+                continue
+            gi = self.__all_games[gameid]
+            fields = dict(gi.__dict__)
+            del fields['gameclass']
+            fields['si'] = dict(gi.si.__dict__)
+            solver = gameid in self.__games_for_solver
+            entries.append((module, solver, fields))
+        tmp = filename + '.tmp'
+        try:
+            data = marshal.dumps((key, entries), 2)
+            f = open(tmp, 'wb')
+            try:
+                f.write(data)
+            finally:
+                f.close()
+            if os.name == 'nt' and os.path.exists(filename):
+                os.remove(filename)
+            os.rename(tmp, filename)
+        except (EnvironmentError, ValueError), ex:
+            print_err('cannot write the games manifest: %s' % ex)
+
+    def loadManifest(self, filename, key):
+        # return the packages of the manifest or None if it is missing
+        # or out of date
+        try:
+            f = open(filename, 'rb')
+            try:
+                manifest_key, entries = marshal.load(f)
+            finally:
+                f.close()
+        except (EnvironmentError, EOFError, ValueError, TypeError):
+            return None
+        if manifest_key != key:
+            return None
+        for module, solver, fields in entries:
+            fields['si'] = Struct(**fields['si'])
+            gi = ManifestGameInfo(**fields)
+            flags = gi.si.game_flags
+            for f, l in ((GI.GT_CHILDREN, GI._CHILDREN_GAMES),
+                         (GI.GT_OPEN, GI._OPEN_GAMES),
+                         (GI.GT_POPULAR, GI._POPULAR_GAMES)):
+                if (flags & f) and (gi.id not in l):
+                    l.append(gi.id)
+            self.__lazy_modules[gi.id] = module
+            self.__modules.append((gi.id, module))
+            self._addGame(gi, solver)
+        return True
+
 
 # ************************************************************************
 # *
@@ -647,7 +760,12 @@ GAME_DB = GameManager()
 
 
 def registerGame(gameinfo):
-    GAME_DB.register(gameinfo)
+    # the module whose top-level code registers the game
+    f = sys._getframe(1)
+    while f and f.f_code.co_name != '<module>':
+        f = f.f_back
+    module = f and f.f_globals.get('__name__')
+    GAME_DB.register(gameinfo, module)
     return gameinfo
 
 
@@ -655,7 +773,100 @@ def loadGame(modname, filename, check_game=False):
     ##print "load game", modname, filename
     GAME_DB.check_game = check_game
     GAME_DB.current_filename = filename
+    t = time.time()
     module = imp.load_source(modname, filename)
     ##execfile(filename, globals(), globals())
+    GAME_DB.addImportTime(modname, time.time() - t)
     GAME_DB.current_filename = None
 
+
+
+# ************************************************************************
+# * game packages
+# ************************************************************************
+
+GAME_PACKAGES = ('pysollib.games',
+                 'pysollib.games.ultra',
+                 'pysollib.games.mahjongg',
+                 'pysollib.games.special',
+                 )
+
+
+def _manifestKey(packages):
+    # the manifest is valid for this version, the language (the game
+    # names are translated) and the game modules as they are now
+    files = []
+    for package in packages:
+        dir = os.path.join(os.path.dirname(pysollib.settings.__file__),
+                           *package.split('.')[1:])
+        for name in sorted(os.listdir(dir)):
+            if name.endswith('.py'):
+                st = os.stat(os.path.join(dir, name))
+                files.append((package, name, st.st_mtime, st.st_size))
+    lang = tuple([os.environ.get(v) for v in
+                  ('LANGUAGE', 'LC_ALL', 'LC_MESSAGES', 'LANG')])
+    return (VERSION, tuple(packages), lang,
+            pysollib.settings.TRANSLATE_GAME_NAMES, tuple(files))
+
+
+def _packageModules(package):
+    dir = os.path.join(os.path.dirname(pysollib.settings.__file__),
+                       *package.split('.')[1:])
+    return [package + '.' + name[:-3] for name in sorted(os.listdir(dir))
+            if name.endswith('.py') and name != '__init__.py']
+
+
+def _importPackage(package):
+    # import the game modules one at a time, to time them (see
+    # GameManager.getRegistrationTimes()); a module is charged for the
+    # modules it is the first to import
+    if package not in sys.modules:
+        try:
+            modules = _packageModules(package)
+        except EnvironmentError:
+            # i.e. library.zip
+            modules = None
+        if modules is not None:
+            _installStubPackages([package])
+            for module in modules:
+                t = time.time()
+                __import__(module)
+                GAME_DB.addImportTime(module, time.time() - t)
+            return
+    __import__(package)
+
+
+def _installStubPackages(packages):
+    # empty package modules, so importing a game module does not run
+    # the __init__ of its package (which imports all games)
+    for package in packages:
+        if package in sys.modules:
+            continue
+        parent, name = package.rsplit('.', 1)
+        if parent not in sys.modules:
+            __import__(parent)
+        module = imp.new_module(package)
+        module.__path__ = [os.path.join(sys.modules[parent].__path__[0],
+                                        name)]
+        sys.modules[package] = module
+        setattr(sys.modules[parent], name, module)
+
+
+def loadGamePackages(packages, manifest=None):
+    # register the games of the packages from the manifest or, if it is
+    # missing or out of date, import them and write a new manifest
+    if manifest and not pysollib.settings.CHECK_GAMES:
+        try:
+            key = _manifestKey(packages)
+        except EnvironmentError:
+            # i.e. library.zip
+            manifest = None
+    if manifest and not pysollib.settings.CHECK_GAMES:
+        if not [p for p in packages if p in sys.modules]:
+            if GAME_DB.loadManifest(manifest, key):
+                _installStubPackages(packages)
+                return
+    for package in packages:
+        _importPackage(package)
+    if manifest and not pysollib.settings.CHECK_GAMES:
+        GAME_DB.saveManifest(manifest, key, packages)
@@ -337,6 +337,12 @@ class ThreeShufflesAndADraw(LaBelleLucie):
     def _saveGameHook(self, p):
         p.dump(self.draw_done)
 
+    def _getCheckpointHook(self):
+        return self.draw_done
+
+    def _restoreCheckpointHook(self, state):
+        self.draw_done = state
+
 
 # ************************************************************************
 # * Trefoil
@@ -330,6 +330,8 @@ class LarasGame(Game):
         # resize (i.e. possibly shorten list from previous undos)
         if not moves.index == 0:
             m = moves.history[len(moves.history) - 1]
+        if moves.index < len(moves.history):
+            self._detachBookmarks(moves.index)
         del moves.history[moves.index : ]
         # update stats
         if self.demo:
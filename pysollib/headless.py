@@ -0,0 +1,313 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+##---------------------------------------------------------------------------##
+##
+## Copyright (C) 1998-2003 Markus Franz Xaver Johannes Oberhumer
+## Copyright (C) 2003 Mt. Hood Playing Card Co.
+## Copyright (C) 2005-2009 Skomoroh
+##
+## This program is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## This program is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with this program.  If not, see <http://www.gnu.org/licenses/>.
+##
+##---------------------------------------------------------------------------##
+
+# ************************************************************************
+# * Headless mode.
+# *
+# * Runs the game engine (Game, Stack, moves and hints) with the null
+# * toolkit: no Tk, no windows and no image files. This module must be
+# * imported before pysollib.pysoltk, e.g.:
+# *
+# *   from pysollib.headless import HeadlessApplication
+# *   app = HeadlessApplication()
+# *   game = app.runGame(2, random=constructRandom('123'))
+# *
+# * There is no headless mode of pysol.py: the null toolkit has none of
+# * the windows, menus and dialogs of the application.
+# ************************************************************************
+
+__all__ = ['HeadlessApplication']
+
+# imports
+import sys
+import __builtin__
+
+import pysollib.settings
+if 'pysollib.pysoltk' not in sys.modules:
+    pysollib.settings.TOOLKIT = 'none'
+if pysollib.settings.TOOLKIT != 'none':
+    raise ImportError('pysollib.headless must be imported before pysollib.pysoltk')
+
+# PySol imports
+from pysollib.mfxutil import destruct, Struct
+from pysollib.resource import CSI, Cardset, CardsetManager
+from pysollib.images import Images, ImagesCardback
+from pysollib.pysolrandom import PysolRandom
+from pysollib.solvercache import SolverCache
+from pysollib.gamedb import GI, GAME_DB, GAME_PACKAGES, loadGamePackages
+from pysollib.options import Options
+from pysollib.mygettext import _, n_
+
+# Toolkit imports
+from pysollib.pysoltk import MfxRoot, MfxCanvas
+
+# some game modules use the gettext functions without importing them
+__builtin__.__dict__.setdefault('_', _)
+__builtin__.__dict__.setdefault('n_', n_)
+
+
+# ************************************************************************
+# * Images without any image data
+# ************************************************************************
+
+class HeadlessImages(Images):
+    def __init__(self, cs):
+        Images.__init__(self, None, cs)
+        nbottoms = max(7, cs.nbottoms)
+        self._card = [None] * cs.ncards
+        self._back = [ImagesCardback(0, '', None)]
+        self._bottom_positive = [None] * nbottoms
+        self._bottom_negative = [None] * nbottoms
+        self._letter_positive = [None] * 4
+        self._letter_negative = [None] * 4
+        self._highlight = [None]
+        self.setNegative(0)
+
+    def resize(self, xf, yf):
+        self._xfactor = xf
+        self._yfactor = yf
+        self.setOffsets()
+
+
+# ************************************************************************
+# * Menubar & statistics stand-ins
+# ************************************************************************
+
+class HeadlessMenubar:
+    def connectGame(self, game):
+        pass
+
+    def updateMenus(self):
+        pass
+
+    def disableMenus(self):
+        pass
+
+    def mPause(self, *args):
+        pass
+
+    def mDrop(self, *args):
+        pass
+
+    def mUndo(self, *args):
+        pass
+
+    def mRedo(self, *args):
+        pass
+
+
+class HeadlessStatistics:
+    # keeps nothing; headless runs never touch the player statistics
+    def __init__(self):
+        self.total_balance = {}
+        self.session_balance = {}
+        self.gameid_balance = 0
+
+    def getStats(self, player, gameid):
+        return (0, 0)
+
+    def getFullStats(self, player, gameid):
+        return (0, 0, 0, 0)
+
+    def getSessionStats(self, player, gameid):
+        return (0, 0)
+
+    def updateStats(self, player, game, status):
+        return None
+
+
+# ************************************************************************
+# * A minimal Application for the null toolkit
+# ************************************************************************
+
+class HeadlessApplication:
+    # metrics of the synthesized cardsets (see the standard cardset)
+    CARDSET_METRICS = dict(CARDW=71, CARDH=96, CARDD=8,
+                           CARD_XOFFSET=13, CARD_YOFFSET=25,
+                           SHADOW_XOFFSET=7, SHADOW_YOFFSET=7)
+
+    def __init__(self, french_only=False, solver_cache=None):
+        # solver_cache: directory for the solver results or None
+        self.gdb = GAME_DB
+        self.opt = Options()
+        self.stats = HeadlessStatistics()
+        self.top = MfxRoot()
+        self.top.connectApp(self)
+        self.top_cursor = ''
+        self.canvas = MfxCanvas(self.top)
+        self.menubar = HeadlessMenubar()
+        self.toolbar = None
+        self.statusbar = None
+        self.helpbar = None
+        self.audio = None
+        self.game = None
+        self.images = None
+        self.subsampled_images = None
+        self.gimages = Struct(
+            demo = [],
+            pause = [],
+            logos = [None] * 6,
+            redeal = [None, None],
+        )
+        self.cardset_manager = CardsetManager()
+        self.cardset = None
+        self.cardsets_cache = {}
+        self.solver_cache = None
+        if solver_cache:
+            self.solver_cache = SolverCache(solver_cache)
+        self.intro = Struct(
+            progress = None,
+        )
+        self.gamerandom = PysolRandom()
+        self.miscrandom = PysolRandom()
+        self.demo_counter = 0
+        self.journal = None
+        self.nextgame = Struct(
+            id = 0,
+            random = None,
+            loadedgame = None,
+            startdemo = 0,
+            cardset = None,
+            holdgame = 0,
+            bookmark = None,
+        )
+        self.initOptions()
+        # init games database
+        if french_only:
+            loadGamePackages(GAME_PACKAGES[:1])
+        else:
+            loadGamePackages(GAME_PACKAGES)
+
+    def initOptions(self):
+        opt = self.opt
+        opt.player = 'headless'
+        opt.update_player_stats = False
+        opt.confirm = False
+        opt.sound = False
+        opt.animations = 0
+        opt.redeal_animation = False
+        opt.win_animation = False
+        opt.shadow = False
+        opt.shade = False
+        opt.shrink_face_down = False
+        opt.randomize_place = False
+        opt.statusbar = False
+        opt.helpbar = False
+        opt.num_cards = False
+        opt.demo_logo = False
+        opt.auto_scale = False
+        opt.save_games_geometry = False
+        timeouts = dict(opt.timeouts)
+        for k in timeouts:
+            timeouts[k] = 0
+        opt.timeouts = timeouts
+
+    #
+    # cardsets
+    #
+
+    def getCardsetForGame(self, gi):
+        # synthesize a cardset of the type required by the game
+        key = gi.category
+        if gi.category == GI.GC_TRUMP_ONLY:
+            key = (gi.category, gi.ncards)
+        cs = self.cardsets_cache.get(key)
+        if cs is not None:
+            return cs
+        cs = Cardset()
+        cs.update(self.CARDSET_METRICS)
+        cs.update(dict(type=gi.category, ncards=gi.ncards,
+                       ident='headless-%s' % CSI.TYPE_ID[gi.category],
+                       name='Headless %s %d' % (CSI.TYPE_ID[gi.category],
+                                                gi.ncards),
+                       backnames=('',)))
+        self.cardset_manager.register(cs)
+        self.cardsets_cache[key] = cs
+        return cs
+
+    def loadCardset(self, cs):
+        if cs is self.cardset:
+            return
+        self.cardset = cs
+        self.images = HeadlessImages(cs)
+        self.subsampled_images = self.images
+
+    #
+    # games
+    #
+
+    def runGame(self, id, random=None, autoplay=1):
+        if self.game:
+            self.freeGame()
+        gi = self.getGameInfo(id)
+        if gi is None:
+            raise Exception("Unknown game (id %d)" % id)
+        self.loadCardset(self.getCardsetForGame(gi))
+        self.game = self.constructGame(id)
+        self.gdb.setSelected(id)
+        self.game.busy = 1
+        self.game.create(self)
+        self.stats.gameid_balance = 0
+        self.game.newGame(random=random, autoplay=autoplay)
+        self.game.busy = 0
+        return self.game
+
+    def freeGame(self):
+        self.canvas.deleteAllItems()
+        if self.game:
+            self.game.destruct()
+            destruct(self.game)
+        self.game = None
+
+    def constructGame(self, id):
+        gi = self.gdb.get(id)
+        if gi is None:
+            raise Exception("Unknown game (id %d)" % id)
+        return gi.gameclass(gi)
+
+    def getGameInfo(self, id):
+        return self.gdb.get(id)
+
+    def getGameClass(self, id):
+        gi = self.gdb.get(id)
+        if gi is None: return None
+        return gi.gameclass
+
+    def getGameTitleName(self, id):
+        gi = self.gdb.get(id)
+        if gi is None: return None
+        return gi.name
+
+    def getRandomGameId(self, games=None):
+        if games is None:
+            return self.miscrandom.choice(self.gdb.getGamesIdSortedById())
+        return self.miscrandom.choice(games)
+
+    def getFont(self, name):
+        return self.opt.fonts.get(name)
+
+    def wm_save_state(self):
+        pass
+
+    def wm_withdraw(self):
+        pass
@@ -23,14 +23,14 @@
 
 
 # imports
-import os
 import time
-import subprocess
 import re
 
 # PySol imports
 from pysollib.settings import DEBUG, FCS_COMMAND
 from pysollib.mfxutil import destruct
+from pysollib.solverpool import getSolverPool
+from pysollib.solverpool import SolverError, SolverTimeout, SolverCancelled
 from pysollib.util import KING
 
 # ************************************************************************
@@ -718,9 +718,13 @@ class Base_Solver_Hint:
             'max_iters': 10000,
             'progress': False,
             'preset': None,
+            'timeout': None,            # seconds
+            'cancel': None,             # threading.Event
             }
         self.hints = []
         self.hints_index = 0
+        self.solver_state = 'not_started'
+        self.interrupted = False        # timeout, cancel or solver error
 
         # correct cards rank if foundations.base_rank != 0 (Penguin, Opus)
         if 'base_rank' in game_type:    # (Simple Simon)
@@ -733,6 +737,77 @@ class Base_Solver_Hint:
     def config(self, **kw):
         self.options.update(kw)
 
+    def runSolver(self, command, args, board):
+        # iterate over the output lines of the solver; a timeout sets
+        # solver_state to 'intractable', a cancel to 'cancelled'
+        pool = getSolverPool(command)
+        try:
+            for line in pool.solve(args, board,
+                                   timeout=self.options['timeout'],
+                                   cancel=self.options['cancel']):
+                yield line
+        except SolverTimeout:
+            self.solver_state = 'intractable'
+            self.interrupted = True
+        except SolverCancelled:
+            self.solver_state = 'cancelled'
+            self.interrupted = True
+        except SolverError, err:
+            if DEBUG:
+                print err
+            self.interrupted = True
+
+    def isInterrupted(self):
+        return self.interrupted
+
+    #
+    # results are kept in app.solver_cache (see solvercache.py);
+    # stacks are stored by their index in game.allstacks
+    #
+
+    def _cacheKey(self, board):
+        return (self.__class__.__name__,
+                tuple(sorted(self.game_type.items())),
+                self.options['preset'],
+                int(self.options['max_iters']),
+                board)
+
+    def loadCachedHints(self, board):
+        cache = self.game.app.solver_cache
+        if cache is None:
+            return False
+        r = cache.get(self._cacheKey(board))
+        if r is None:
+            return False
+        solver_state, moves = r
+        allstacks = self.game.allstacks
+        hints = []
+        for ncards, src, dest in moves:
+            if dest is not None:
+                dest = allstacks[dest]
+            hints.append([ncards, allstacks[src], dest])
+        self.solver_state = solver_state
+        self.hints = hints
+        self.hints.append(None)
+        return True
+
+    def saveCachedHints(self, board):
+        cache = self.game.app.solver_cache
+        if cache is None or self.interrupted:
+            return
+        if self.solver_state not in ('solved', 'unsolved', 'intractable'):
+            return
+        if self.solver_state == 'solved' and not [h for h in self.hints if h]:
+            return                      # no output; the solver is missing?
+        moves = []
+        for h in self.hints:
+            if h is None:
+                continue
+            ncards, src, dest = h
+            if dest is not None:
+                dest = dest.id
+            moves.append((ncards, src.id, dest))
+        cache.put(self._cacheKey(board), (self.solver_state, moves))
 
     def card2str1(self, card):
         # row and reserves
@@ -831,15 +906,20 @@ class FreeCellSolver_Hint(Base_Solver_Hint):
         return self.board
 
 
-    def computeHints(self):
+    def computeHints(self, board=None):
+        # board: the calcBoardString() of the game; pass it in when the
+        # solver runs off the Tk thread
         game = self.game
         game_type = self.game_type
         progress = self.options['progress']
 
-        board = self.calcBoardString()
+        if board is None:
+            board = self.calcBoardString()
         #
         if DEBUG:
             print '--------------------\n', board, '--------------------'
+        if self.loadCachedHints(board):
+            return
         #
         args = []
         ##args += ['-sam', '-p', '-opt', '--display-10-as-t']
@@ -865,19 +945,9 @@ class FreeCellSolver_Hint(Base_Solver_Hint):
         if 'esf' in game_type:
             args += ['--empty-stacks-filled-by', game_type['esf']]
 
-        command = FCS_COMMAND+' '+' '.join([str(i) for i in args])
         if DEBUG:
-            print command
-        kw = {'shell': True,
-              'stdin': subprocess.PIPE,
-              'stdout': subprocess.PIPE,
-              'stderr': subprocess.PIPE}
-        if os.name != 'nt':
-            kw['close_fds'] = True
-        p = subprocess.Popen(command, **kw)
-        pin, pout, perr = p.stdin, p.stdout, p.stderr
-        pin.write(board)
-        pin.close()
+            print FCS_COMMAND+' '+' '.join([str(i) for i in args])
+        pout = self.runSolver(FCS_COMMAND, args, board)
         #
         stack_types = {
             'the'      : game.s.foundations,
@@ -976,18 +1046,16 @@ class FreeCellSolver_Hint(Base_Solver_Hint):
             print 'time:', time.time()-start_time
         ##print perr.read(),
 
+        if self.isInterrupted():
+            hints = []                  # timeout or cancel
         self.hints = hints
         if len(hints) > 0:
             self.solver_state = 'solved'
         self.hints.append(None)         # XXX
+        self.saveCachedHints(board)
 
         ##print self.hints
 
-        pout.close()
-        perr.close()
-        if os.name == 'posix':
-            os.wait()
-
 class BlackHoleSolver_Hint(Base_Solver_Hint):
     BLACK_HOLE_SOLVER_COMMAND = 'black-hole-solve'
 
@@ -1010,15 +1078,18 @@ class BlackHoleSolver_Hint(Base_Solver_Hint):
 
         return board;
 
-    def computeHints(self):
+    def computeHints(self, board=None):
         game = self.game
         game_type = self.game_type
         progress = self.options['progress']
 
-        board = self.calcBoardString()
+        if board is None:
+            board = self.calcBoardString()
         #
         if DEBUG:
             print '--------------------\n', board, '--------------------'
+        if self.loadCachedHints(board):
+            return
         #
         args = []
         ##args += ['-sam', '-p', '-opt', '--display-10-as-t']
@@ -1026,19 +1097,9 @@ class BlackHoleSolver_Hint(Base_Solver_Hint):
         args += ['--max-iters', self.options['max_iters'],]
         #
 
-        command = self.BLACK_HOLE_SOLVER_COMMAND+' '+' '.join([str(i) for i in args])
         if DEBUG:
-            print command
-        kw = {'shell': True,
-              'stdin': subprocess.PIPE,
-              'stdout': subprocess.PIPE,
-              'stderr': subprocess.PIPE}
-        if os.name != 'nt':
-            kw['close_fds'] = True
-        p = subprocess.Popen(command, **kw)
-        pin, pout, perr = p.stdin, p.stdout, p.stderr
-        pin.write(board)
-        pin.close()
+            print self.BLACK_HOLE_SOLVER_COMMAND+' '+' '.join([str(i) for i in args])
+        pout = self.runSolver(self.BLACK_HOLE_SOLVER_COMMAND, args, board)
         #
         if DEBUG:
             start_time = time.time()
@@ -1059,11 +1120,15 @@ class BlackHoleSolver_Hint(Base_Solver_Hint):
                 break
         self.dialog.setText(iter=iter, depth=depth, states=states)
 
+        if self.isInterrupted():
+            return
         if (result == 'Intractable!'):
             self.solver_state = 'intractable'
+            self.saveCachedHints(board)
             return
         if (result == 'Unsolved!'):
             self.solver_state = 'unsolved'
+            self.saveCachedHints(board)
             return
 
         self.solver_state = 'solved'
@@ -1104,16 +1169,15 @@ class BlackHoleSolver_Hint(Base_Solver_Hint):
             print 'time:', time.time()-start_time
         ##print perr.read(),
 
+        if self.isInterrupted():
+            self.hints = [None]
+            return
         self.hints = hints
         self.hints.append(None)         # XXX
+        self.saveCachedHints(board)
 
         ##print self.hints
 
-        pout.close()
-        perr.close()
-        if os.name == 'posix':
-            os.wait()
-
 class FreeCellSolverWrapper:
 
     def __init__(self, **game_type):
@@ -25,11 +25,15 @@
 # imports
 import os
 import traceback
+try:
+    from hashlib import md5
+except ImportError:
+    from md5 import md5
 
 # PySol imports
 from pysollib.resource import CSI
-from pysollib.settings import TOOLKIT
-from pysollib.mfxutil import Image, ImageTk, USE_PIL
+from pysollib.settings import TOOLKIT, DEBUG
+from pysollib.mfxutil import Struct, Image, ImageTk, USE_PIL, OrderedDict
 
 # Toolkit imports
 from pysollib.pysoltk import loadImage, copyImage, createImage, shadowImage, createBottom, resizeBottom
@@ -39,6 +43,49 @@ from pysollib.pysoltk import loadImage, copyImage, createImage, shadowImage, cre
 # ************************************************************************
 
 
+class LazyImages:
+    # A list of images that are loaded on first use: load(index) returns
+    # the image. With a cache_size, only that many of the loaded images
+    # are kept, the least recently used are dropped (and loaded again
+    # when used); images still in use are kept alive by their canvas
+    # items. Images appended to the list are never dropped.
+    def __init__(self, load, n, cache_size=0):
+        self._load = load
+        self._images = [None] * n
+        self._nlazy = n
+        self.cache_size = cache_size
+        self._used = OrderedDict()      # indexes, least recently used first
+
+    def __len__(self):
+        return len(self._images)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self._images)
+        im = self._images[index]
+        if im is None and index < self._nlazy:
+            im = self._images[index] = self._load(index)
+        if self.cache_size and index < self._nlazy:
+            used = self._used
+            used.pop(index, None)
+            used[index] = True
+            if len(used) > self.cache_size:
+                i = used.popitem(last=False)[0]
+                self._images[i] = None
+        return im
+
+    def __setitem__(self, index, im):
+        self._images[index] = im
+
+    def append(self, im):
+        self._images.append(im)
+
+    def getLoaded(self):
+        # [(index, image)] of the images loaded so far
+        return [(i, im) for i, im in enumerate(self._images)
+                if im is not None]
+
+
 class ImagesCardback:
     def __init__(self, index, name, image, menu_image=None):
         if menu_image is None: menu_image = image
@@ -49,6 +96,13 @@ class ImagesCardback:
 
 
 class Images:
+    # the number of face images kept, see LazyImages
+    CARD_CACHE_SIZE = 128
+    # scale factors are rounded to 1/SCALE_STEPS, and the images of the
+    # last used scales are kept, up to SCALE_CACHE_MEMORY bytes
+    SCALE_STEPS = 50
+    SCALE_CACHE_MEMORY = 32 * 1024 * 1024
+
     def __init__(self, dataloader, cs, r=1):
         self.d = dataloader
         self.cs = cs
@@ -73,6 +127,9 @@ class Images:
         self._highlight = []            # highlight of card (tip)
         self._highlight_index = 0       #
         self._highlighted_images = {}   # key: (suit, rank)
+        self._scaled = {}               # key: (xfactor, yfactor)
+        self._scaled_tick = 0
+        self.cache_dir = None           # on-disk cache of scaled images
 
     def destruct(self):
         pass
@@ -95,7 +152,68 @@ class Images:
                 raise ValueError("Invalid size %dx%d of image %s" % (w, h, f))
         return img
 
-    def __loadBottom(self, filename, check_w=1, check_h=1, color='white'):
+    def __loadFace(self, index, xf=1, yf=1):
+        name = self._card_names[index]
+        if xf != 1 or yf != 1:
+            # resize the face of the unscaled images
+            images = self._scaled[(1.0, 1.0)]
+            img = self.__loadScaled(name + self.cs.ext, xf, yf,
+                                    lambda: images.card[index].resize(xf, yf))
+        else:
+            img = self.__loadCard(name + self.cs.ext)
+            if img is None:
+                raise ValueError("Missing image %s%s" % (name, self.cs.ext))
+        img.filename = name
+        return img
+
+    def __createBlankFace(self, card, xf, yf):
+        # card: a face of the same size
+        if USE_PIL:
+            return createBottom(card, 'white')
+        w, h = int(self.CARDW * xf), int(self.CARDH * yf)
+        return createImage(w, h, fill='#ffffff', outline='#000000')
+
+    def __getScaledFilename(self, filename, xf, yf):
+        # the file of an image in the on-disk cache of scaled cardsets
+        if not self.cache_dir:
+            return None
+        w, h = int(self.CARDW * xf), int(self.CARDH * yf)
+        name = os.path.splitext(filename)[0] + '.png'
+        # cardsets in different dirs may have the same dir name
+        csdir = os.path.abspath(self.cs.dir)
+        csdir = '%s-%s' % (os.path.basename(csdir), md5(csdir).hexdigest()[:8])
+        return os.path.join(self.cache_dir, csdir, '%dx%d' % (w, h), name)
+
+    def __loadScaled(self, filename, xf, yf, resize):
+        # resize() returns the image scaled; with a cache_dir the scaled
+        # image is read from and saved to the on-disk cache
+        fn = self.__getScaledFilename(filename, xf, yf)
+        if fn is None:
+            return resize()
+        try:
+            f = os.path.join(self.cs.dir, filename)
+            if os.path.getmtime(fn) >= os.path.getmtime(f):
+                return loadImage(file=fn)
+        except EnvironmentError:
+            pass
+        img = resize()
+        tmp = fn + '.tmp'
+        try:
+            d = os.path.dirname(fn)
+            if not os.path.isdir(d):
+                os.makedirs(d)
+            img._pil_image.save(tmp, 'PNG')
+            if os.name == 'nt' and os.path.exists(fn):
+                os.remove(fn)
+            os.rename(tmp, fn)
+        except EnvironmentError:
+            if DEBUG:
+                traceback.print_exc()
+        return img
+
+    def __loadBottom(self, filename, check_w=1, check_h=1, color='white',
+                     card=None, xf=1, yf=1):
+        # card: the face the bottom is made from (with PIL)
         cs_type = CSI.TYPE_ID[self.cs.type]
         imagedir = None
         d = os.path.join('images', 'cards', 'bottoms')
@@ -108,7 +226,7 @@ class Images:
             img = self.__loadCard(filename+self.cs.ext, check_w, check_h)
             if USE_PIL:
                 # we have no bottom images (data/images/cards/bottoms/<cs_type>)
-                img = img.resize(self._xfactor, self._yfactor)
+                img = img.resize(xf, yf)
             return img
         # create image
         d = os.path.join('images', 'cards', 'bottoms', cs_type)
@@ -116,9 +234,37 @@ class Images:
             fn = self.d.findImage(filename, d)
         except:
             fn = None
-        img = createBottom(self._card[0], color, fn)
+        img = createBottom(card, color, fn)
         return img
 
+    def _createLazyImages(self, xf, yf):
+        # the lists of faces, bottoms and letters for the size xf, yf;
+        # a loaded image is used at that size even if the images are
+        # resized later (see SubsampledImages)
+        def face(index):
+            try:
+                return self.__loadFace(index, xf, yf)
+            except ValueError:
+                # a damaged face image, found in the middle of a game:
+                # show a blank card and mark the cardset
+                if DEBUG:
+                    traceback.print_exc()
+                self.cs.error = 1
+                return self.__createBlankFace(cards[0], xf, yf)
+        cards = LazyImages(face, self.cs.ncards, self.CARD_CACHE_SIZE)
+        def bottoms(name, color, n):
+            def load(index):
+                return self.__loadBottom(name % (index + 1), color=color,
+                                         card=cards[0], xf=xf, yf=yf)
+            return LazyImages(load, n)
+        self._card = cards
+        self._bottom_positive = bottoms("bottom%02d", 'black',
+                                        self.cs.nbottoms)
+        self._bottom_negative = bottoms("bottom%02d-n", 'white',
+                                        self.cs.nbottoms)
+        self._letter_positive = bottoms("l%02d", 'black', self.cs.nletters)
+        self._letter_negative = bottoms("l%02d-n", 'white', self.cs.nletters)
+
     def __addBack(self, im1, name):
         r = max(self.CARDW / 40.0, self.CARDH / 60.0)
         r = max(2, int(round(r)))
@@ -158,39 +304,26 @@ class Images:
         ext = self.cs.ext[1:]
         pstep = 0
         if progress:
-            pstep = self.cs.ncards + len(self.cs.backnames) + self.cs.nbottoms + self.cs.nletters
+            pstep = len(self.cs.backnames) + 1
             pstep += self.cs.nshadows + 1 # shadows & shade
             pstep = max(0, (80.0 - progress.percent) / pstep)
-        # load face cards
-        for n in self.cs.getFaceCardNames():
-            self._card.append(self.__loadCard(n + self.cs.ext))
-            self._card[-1].filename = n
-            if progress: progress.update(step=pstep)
+        # face cards, bottoms and letters are loaded on first use;
+        # only check that the face cards are there
+        self._card_names = self.cs.getFaceCardNames()
+        for n in self._card_names:
+            if not os.path.exists(os.path.join(self.cs.dir, n + self.cs.ext)):
+                raise ValueError("Missing image %s%s" % (n, self.cs.ext))
+        self._createLazyImages(1, 1)
+        # the first face gives the size; a damaged one fails the load
+        self._card[0] = self.__loadFace(0)
         assert len(self._card) == self.cs.ncards
+        if progress: progress.update(step=pstep)
         # load backgrounds
         for name in self.cs.backnames:
             if name:
                 im = self.__loadCard(name)
                 self.__addBack(im, name)
         if progress: progress.update(step=1)
-        # load bottoms
-        for i in range(self.cs.nbottoms):
-            name = "bottom%02d" % (i + 1)
-            self._bottom_positive.append(self.__loadBottom(name, color='black'))
-            if progress: progress.update(step=pstep)
-            # load negative bottoms
-            name = "bottom%02d-n" % (i + 1)
-            self._bottom_negative.append(self.__loadBottom(name, color='white'))
-            if progress: progress.update(step=pstep)
-        # load letters
-        for rank in range(self.cs.nletters):
-            name = "l%02d" % (rank + 1)
-            self._letter_positive.append(self.__loadBottom(name, color='black'))
-            if progress: progress.update(step=pstep)
-            # load negative letters
-            name = "l%02d-n" % (rank + 1)
-            self._letter_negative.append(self.__loadBottom(name, color='white'))
-            if progress: progress.update(step=pstep)
         # shadow
         if not USE_PIL:
             for i in range(self.cs.nshadows):
@@ -380,41 +513,94 @@ class Images:
         return (int(self.CARD_DX * self._xfactor),
                 int(self.CARD_DY * self._yfactor))
 
+    def quantizeScale(self, xf, yf):
+        # round the scale factors, so that nearby sizes of the window
+        # share their scaled images (see resize)
+        n = float(self.SCALE_STEPS)
+        return (max(1, round(xf * n)) / n, max(1, round(yf * n)) / n)
+
+    def __saveScaledImages(self):
+        # keep the images of the current scale for a later resize
+        self._scaled_tick += 1
+        self._scaled[(self._xfactor, self._yfactor)] = Struct(
+            card = self._card,
+            back = [b.image for b in self._back],
+            bottom_positive = self._bottom_positive,
+            bottom_negative = self._bottom_negative,
+            letter_positive = self._letter_positive,
+            letter_negative = self._letter_negative,
+            blank_bottom = self._blank_bottom,
+            highlight = self._highlight,
+            highlighted_images = self._highlighted_images,
+            pil_shadow = self._pil_shadow,
+            tick = self._scaled_tick,
+        )
+        # drop the least recently used scales; the unscaled images
+        # are always kept, the other scales are resized from them
+        l = [(images.tick, key) for key, images in self._scaled.items()
+             if key != (1.0, 1.0)]
+        l.sort()
+        size = sum([self.__getScaledImagesSize(images)
+                    for images in self._scaled.values()])
+        for tick, key in l:
+            if size <= self.SCALE_CACHE_MEMORY:
+                break
+            size -= self.__getScaledImagesSize(self._scaled[key])
+            del self._scaled[key]
+
+    def __getScaledImagesSize(self, images):
+        # the (approximate) memory used by the images of a scale
+        l = images.back + images.highlight
+        for lst in (images.card, images.bottom_positive,
+                    images.bottom_negative, images.letter_positive,
+                    images.letter_negative):
+            l += [im for i, im in lst.getLoaded()]
+        size = 0
+        for im in l:
+            size += im.width() * im.height() * 4
+        return size
+
+    def __setScaledImages(self, images):
+        self._card = images.card
+        for b, im in zip(self._back, images.back):
+            b.image = im
+        self._bottom_positive = images.bottom_positive
+        self._bottom_negative = images.bottom_negative
+        self._letter_positive = images.letter_positive
+        self._letter_negative = images.letter_negative
+        self._blank_bottom = images.blank_bottom
+        self._highlight = images.highlight
+        self._highlighted_images = images.highlighted_images
+        self._pil_shadow = images.pil_shadow
+
     def resize(self, xf, yf):
         #print 'Images.resize:', xf, yf, self._card[0].width(), self.CARDW
+        xf, yf = self.quantizeScale(xf, yf)
         if self._xfactor == xf and self._yfactor == yf:
             #print 'no resize'
-            return
+            return False
+        neg = self._bottom is self._bottom_negative
+        self.__saveScaledImages()
         self._xfactor = xf
         self._yfactor = yf
         #???self._setSize(xf, yf)
         self.setOffsets()
-        # cards
-        cards = []
-        for c in self._card:
-            c = c.resize(xf, yf)
-            cards.append(c)
-        self._card = cards
+        images = self._scaled.get((xf, yf))
+        if images:
+            # the images of this scale are still there
+            self.__setScaledImages(images)
+            self.setNegative(neg)
+            return True
+        # cards, bottoms and letters are resized on first use
+        orig = self._scaled[(1.0, 1.0)].back
+        self._createLazyImages(xf, yf)
         # back
         for b in self._back:
-            b.image = b.image.resize(xf, yf)
-        # stack bottom image
-        neg = self._bottom is self._bottom_negative
-        self._bottom_negative = []
-        self._bottom_positive = []
-        for i in range(self.cs.nbottoms):
-            name = "bottom%02d" % (i + 1)
-            self._bottom_positive.append(self.__loadBottom(name, color='black'))
-            name = "bottom%02d-n" % (i + 1)
-            self._bottom_negative.append(self.__loadBottom(name, color='white'))
-        # letters
-        self._letter_positive = []
-        self._letter_negative = []
-        for rank in range(self.cs.nletters):
-            name = "l%02d" % (rank + 1)
-            self._letter_positive.append(self.__loadBottom(name, color='black'))
-            name = "l%02d-n" % (rank + 1)
-            self._letter_negative.append(self.__loadBottom(name, color='white'))
+            if b.name:
+                b.image = self.__loadScaled(b.name, xf, yf,
+                                            lambda: orig[b.index].resize(xf, yf))
+            else:
+                b.image = orig[b.index].resize(xf, yf)
         self._createMissingImages()
         self.setNegative(neg)
         #
@@ -422,6 +608,7 @@ class Images:
         self._highlight = []
         self._highlight.append(self._getHighlight(self._card[0], None, '#3896f8'))
         self._pil_shadow = {}
+        return True
 
     def reset(self):
         print 'Image.reset'
@@ -433,9 +620,13 @@ class Images:
 # ************************************************************************
 
 class SubsampledImages(Images):
+    # the images are subsampled on first use; the lists of images are
+    # taken as they are now, so later resizing of images does not change
+    # the size of the subsampled images
     def __init__(self, images, r=2):
         Images.__init__(self, None, images.cs, r=r)
         self._card = self._subsample(images._card, r)
+        self._card.cache_size = self.CARD_CACHE_SIZE
         self._bottom_positive = self._subsample(images._bottom_positive, r)
         self._letter_positive = self._subsample(images._letter_positive, r)
         self._bottom_negative = self._subsample(images._bottom_negative, r)
@@ -459,11 +650,10 @@ class SubsampledImages(Images):
         return None
 
     def _subsample(self, l, r):
-        s = []
-        for im in l:
+        def load(index):
+            im = l[index]
             if im is None or r == 1:
-                s.append(im)
-            else:
-                s.append(im.subsample(r))
-        return s
+                return im
+            return im.subsample(r)
+        return LazyImages(load, len(l))
 
@@ -27,6 +27,7 @@ import traceback
 from pysollib.mygettext import _, n_
 import gettext
 import pysollib.settings
+from pysollib.startupprofile import STARTUP_PROFILE
 
 # ************************************************************************
 # * init
@@ -35,6 +36,12 @@ import pysollib.settings
 
 def init():
 
+    # start-up profile (see startupprofile.py)
+    if '--profile-startup' in sys.argv:
+        sys.argv.remove('--profile-startup')
+        STARTUP_PROFILE.enable()
+    STARTUP_PROFILE.phase('gettext')
+
     if os.name == 'nt' and 'LANG' not in os.environ:
         try:
             l = locale.getdefaultlocale()
@@ -70,6 +77,7 @@ def init():
         print 'PySol debugging: set DEBUG to', pysollib.settings.DEBUG
 
     ## init toolkit
+    STARTUP_PROFILE.phase('toolkit')
     if '--gtk' in sys.argv:
         pysollib.settings.TOOLKIT = 'gtk'
         sys.argv.remove('--gtk')
@@ -110,6 +118,7 @@ def init():
         Tkinter._default_root = None
 
     # check FreeCell-Solver
+    STARTUP_PROFILE.phase('solver check')
     pysollib.settings.USE_FREECELL_SOLVER = False
     if os.name == 'nt':
         if sys.path[0] and not os.path.isdir(sys.path[0]): # i.e. library.zip
@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+##---------------------------------------------------------------------------##
+##
+## Copyright (C) 1998-2003 Markus Franz Xaver Johannes Oberhumer
+## Copyright (C) 2003 Mt. Hood Playing Card Co.
+## Copyright (C) 2005-2009 Skomoroh
+##
+## This program is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## This program is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with this program.  If not, see <http://www.gnu.org/licenses/>.
+##
+##---------------------------------------------------------------------------##
+
+# ************************************************************************
+# * Autosave journal.
+# *
+# * An append-only file for crash recovery. It starts with the whole
+# * game saved to a string (see Game._dumpGameString()); after that
+# * every finished move, undo and redo appends a small record (see
+# * Game._journalMove()). Each frame has a length and a CRC32, and is
+# * flushed to the disk, so after a crash the journal is good up to
+# * the last complete frame.
+# *
+# * Every max_records records the journal is compacted: a new file with
+# * the current game replaces it atomically.
+# ************************************************************************
+
+__all__ = ['GameJournal',
+           'readJournal',
+           'packFrame',
+           'unpackFrames',
+           ]
+
+# imports
+import os
+import marshal
+import struct
+import zlib
+
+# PySol imports
+from pysollib.mfxutil import UnpicklingError
+
+
+MAGIC = 'PySolFC-journal\x1a'
+_FRAME = '<Ii'
+_FRAME_SIZE = struct.calcsize(_FRAME)
+
+
+def packFrame(data):
+    return struct.pack(_FRAME, len(data), zlib.crc32(data)) + data
+
+def unpackFrames(data, pos=0):
+    # return the list of complete frames; stops at an incomplete write
+    frames = []
+    while pos + _FRAME_SIZE <= len(data):
+        length, crc = struct.unpack(_FRAME, data[pos:pos+_FRAME_SIZE])
+        frame = data[pos+_FRAME_SIZE:pos+_FRAME_SIZE+length]
+        if len(frame) != length or zlib.crc32(frame) != crc:
+            break
+        frames.append(frame)
+        pos += _FRAME_SIZE + length
+    return frames
+
+
+# ************************************************************************
+# *
+# ************************************************************************
+
+class GameJournal:
+    def __init__(self, filename, max_records=200, sync=True):
+        self.filename = filename
+        self.max_records = max_records
+        self.sync = sync
+        self.file = None
+        self.nrecords = 0
+
+    def _flush(self, f):
+        f.flush()
+        if self.sync:
+            os.fsync(f.fileno())
+
+    def start(self, data):
+        # begin a new journal with the saved game `data'
+        self.close()
+        tmp = self.filename + '.tmp'
+        f = open(tmp, 'wb')
+        try:
+            f.write(MAGIC + packFrame(data))
+            self._flush(f)
+        finally:
+            f.close()
+        if os.name == 'nt' and os.path.exists(self.filename):
+            # no atomic rename on Windows
+            os.remove(self.filename)
+        os.rename(tmp, self.filename)
+        self.file = open(self.filename, 'ab')
+        self.nrecords = 0
+
+    def append(self, record):
+        if self.file is None:
+            return
+        self.file.write(packFrame(marshal.dumps(record, 2)))
+        self._flush(self.file)
+        self.nrecords += 1
+
+    def needsCompaction(self):
+        return self.nrecords >= self.max_records
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def remove(self):
+        self.close()
+        if os.path.exists(self.filename):
+            os.remove(self.filename)
+
+
+# return the saved game and the list of records
+def readJournal(filename):
+    f = open(filename, 'rb')
+    try:
+        data = f.read()
+    finally:
+        f.close()
+    if data[:len(MAGIC)] != MAGIC:
+        raise UnpicklingError('Not a journal file')
+    frames = unpackFrames(data, len(MAGIC))
+    if not frames:
+        raise UnpicklingError('Invalid or damaged journal file')
+    records = []
+    for frame in frames[1:]:
+        try:
+            records.append(marshal.loads(frame))
+        except (EOFError, ValueError, TypeError):
+            break
+    return frames[0], records
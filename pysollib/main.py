@@ -33,10 +33,11 @@ from pysollib.util import DataLoader
 from pysollib.mfxutil import print_err
 from pysollib.resource import Tile
 from pysollib.app import Application
-from pysollib.gamedb import GAME_DB
+from pysollib.gamedb import GAME_DB, GAME_PACKAGES, loadGamePackages
+from pysollib.startupprofile import STARTUP_PROFILE
 from pysollib.pysolaudio import AbstractAudioClient, PysolSoundServerModuleClient
 from pysollib.pysolaudio import Win32AudioClient, OSSAudioClient, PyGameAudioClient
-from pysollib.settings import TITLE, SOUND_MOD
+from pysollib.settings import TITLE, SOUND_MOD, CHECK_GAMES
 from pysollib.winsystems import init_root_window
 
 # Toolkit imports
@@ -141,6 +142,7 @@ def parse_option(argv):
 def pysol_init(app, args):
 
     # init commandline options (undocumented)
+    STARTUP_PROFILE.phase('command line')
     opts = parse_option(args)
     if not opts:
         return 1
@@ -178,12 +180,14 @@ def pysol_init(app, args):
     app.dataloader = DataLoader(args[0], f)
 
     # init toolkit 1)
+    STARTUP_PROFILE.phase('root window')
     top = MfxRoot(className=TITLE)
     app.top = top
     app.top_bg = top.cget("bg")
     app.top_cursor = top.cget("cursor")
 
     # load options
+    STARTUP_PROFILE.phase('options')
     try:
         app.loadOptions()
     except:
@@ -191,6 +195,7 @@ def pysol_init(app, args):
         pass
 
     # init toolkit 2)
+    STARTUP_PROFILE.phase('root window')
     init_root_window(top, app)
 
     # prepare the progress bar
@@ -210,16 +215,18 @@ def pysol_init(app, args):
     app.intro.progress.update(step=1)
 
     # init games database
+    STARTUP_PROFILE.phase('games')
     def progressCallback(*args):
         app.intro.progress.update(step=1)
     GAME_DB.setCallback(progressCallback)
-    import pysollib.games
-    if not opts['french-only']:
-        import pysollib.games.ultra
-        import pysollib.games.mahjongg
-        import pysollib.games.special
+    if opts['french-only']:
+        # pysollib.games only
+        loadGamePackages(GAME_PACKAGES[:1])
+    else:
+        loadGamePackages(GAME_PACKAGES, app.fn.games_manifest)
 
     # try to load plugins
+    STARTUP_PROFILE.phase('plugins')
     if not opts["noplugins"]:
         for dir in (os.path.join(app.dataloader.dir, "games"),
                     os.path.join(app.dataloader.dir, "plugins"),
@@ -229,8 +236,13 @@ def pysol_init(app, args):
             except:
                 pass
     GAME_DB.setCallback(None)
+    if CHECK_GAMES:
+        print 'PySol debugging: import time per module'
+        for t, n, module in GAME_DB.getRegistrationTimes()[:10]:
+            print '  %.4fs %4d games %s' % (t, n, module)
 
     # init audio 1)
+    STARTUP_PROFILE.phase('audio')
     app.audio = None
     sounds = {'pss':     PysolSoundServerModuleClient,
               'pygame':  PyGameAudioClient,
@@ -284,6 +296,7 @@ Please check your %s installation.
         return 1
 
     # init cardsets
+    STARTUP_PROFILE.phase('cardsets')
     app.initCardsets()
     cardset = None
     c = app.opt.cardset.get(0)
@@ -298,6 +311,7 @@ Please check your %s installation.
         return 3
 
     # init tiles
+    STARTUP_PROFILE.phase('tiles')
     manager = app.tabletile_manager
     tile = Tile()
     tile.color = app.opt.colors['table']
@@ -312,8 +326,10 @@ Please check your %s installation.
                 break
 
     # init samples and music resources
+    STARTUP_PROFILE.phase('sounds')
     app.initSamples()
     app.initMusic()
+    app.rescanResources()
 
     # init audio 2)
     if not app.audio.CAN_PLAY_SOUND:
@@ -334,11 +350,13 @@ Please check your %s installation.
             app.audio.playContinuousMusic(app.music_playlist)
 
     # prepare other images
+    STARTUP_PROFILE.phase('images')
     app.loadImages2()
     app.loadImages3()
     app.loadImages4()
 
     # load cardset
+    STARTUP_PROFILE.phase('cardset images')
     progress = app.intro.progress
     if not app.loadCardset(cardset, progress=progress, update=1):
         for cardset in app.cardset_manager.getAll():
@@ -36,6 +36,38 @@ try:
 except:
     thread = None
 
+try:
+    from collections import OrderedDict
+except ImportError:
+    # Python < 2.7; just what the LRU caches use
+    class OrderedDict(dict):
+        def __init__(self):
+            dict.__init__(self)
+            self._keys = []
+        def __setitem__(self, key, value):
+            if key not in self:
+                self._keys.append(key)
+            dict.__setitem__(self, key, value)
+        def __delitem__(self, key):
+            dict.__delitem__(self, key)
+            self._keys.remove(key)
+        def __iter__(self):
+            return iter(self._keys)
+        def keys(self):
+            return self._keys[:]
+        def pop(self, key, *default):
+            if key in self:
+                self._keys.remove(key)
+            return dict.pop(self, key, *default)
+        def popitem(self, last=True):
+            if not self._keys:
+                raise KeyError('dictionary is empty')
+            if last:
+                key = self._keys.pop()
+            else:
+                key = self._keys.pop(0)
+            return key, dict.pop(self, key)
+
 from pysollib.settings import PACKAGE, TOOLKIT, USE_TILE
 
 Image = ImageTk = ImageOps = None
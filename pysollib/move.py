@@ -23,6 +23,7 @@
 
 
 # imports
+from operator import attrgetter
 
 
 # ************************************************************************
@@ -38,15 +39,59 @@
 ## - save the seed of game.random
 ## - shuffle a stack
 
-class AtomicMove:
+## The atomic moves are kept in Game.moves.history, pickled into every
+## saved game and bookmark, and a long game has thousands of them. So they
+## are slotted classes: no per-instance __dict__, and the pickled state is
+## a plain tuple of the slot values.
+
+class AtomicMoveType(type):
+    def __init__(cls, name, bases, dct):
+        type.__init__(cls, name, bases, dct)
+        # collect the slots of the class and its bases
+        fields = ()
+        for base in bases:
+            fields = fields + getattr(base, '_fields', ())
+        fields = fields + tuple(dct.get('__slots__', ()))
+        cls._fields = fields
+        # pickle the slot values as a tuple (attrgetter is much faster
+        # than a loop over the fields)
+        if len(fields) == 1:
+            getter = attrgetter(fields[0])
+            cls.__getstate__ = lambda self: (getter(self),)
+        elif fields:
+            getter = attrgetter(*fields)
+            cls.__getstate__ = lambda self: getter(self)
+
+    # Saves of older versions pickled the moves as classic instances;
+    # the unpickler creates those by calling the class without
+    # arguments and restores the attribute dict with __setstate__.
+    def __call__(cls, *args, **kw):
+        if not args and not kw:
+            return cls.__new__(cls)
+        return type.__call__(cls, *args, **kw)
+
+
+class AtomicMove(object):
+    __metaclass__ = AtomicMoveType
+    __slots__ = ()
 
     def do(self, game):
         self.redo(game)
 
+    def __getstate__(self):
+        return ()
+
+    def __setstate__(self, state):
+        if isinstance(state, dict):
+            # old save file
+            state = [state[f] for f in self._fields]
+        for f, v in zip(self._fields, state):
+            setattr(self, f, v)
+
     def __repr__(self):
-        return str(self.__dict__)
+        return str(dict(zip(self._fields, self.__getstate__())))
     def __str__(self):
-        return str(self.__dict__)
+        return self.__repr__()
 
     # Custom comparison for detecting redo moves. See Game.finishMove().
     def cmpForRedo(self, other):
@@ -58,6 +103,8 @@ class AtomicMove:
 # ************************************************************************
 
 class AMoveMove(AtomicMove):
+    __slots__ = ('ncards', 'from_stack_id', 'to_stack_id', 'frames', 'shadow')
+
     def __init__(self, ncards, from_stack, to_stack, frames, shadow=-1):
         assert from_stack is not to_stack
         self.ncards = ncards
@@ -80,10 +127,12 @@ class AMoveMove(AtomicMove):
             x, y = to_stack.getPositionForNextCard()
             game.animatedMoveTo(from_stack, to_stack, cards, x, y,
                                 frames=frames, shadow=self.shadow)
+        game.zobrist.remove(from_stack, ncards)
         for i in range(ncards):
             from_stack.removeCard()
         for c in cards:
             to_stack.addCard(c)
+        game.zobrist.add(to_stack, ncards)
         from_stack.updatePositions()
         to_stack.updatePositions()
 
@@ -106,6 +155,8 @@ class AMoveMove(AtomicMove):
 # ************************************************************************
 
 class AFlipMove(AtomicMove):
+    __slots__ = ('stack_id',)
+
     def __init__(self, stack):
         self.stack_id = stack.id
 
@@ -117,6 +168,7 @@ class AFlipMove(AtomicMove):
             card.showBack()
         else:
             card.showFace()
+        game.zobrist.flip(stack)
 
     def redo(self, game):
         self._doMove(game, game.allstacks[self.stack_id])
@@ -129,6 +181,8 @@ class AFlipMove(AtomicMove):
 
 # flip with animation
 class ASingleFlipMove(AFlipMove):
+    __slots__ = ()
+
     def _doMove(self, game, stack):
         card = stack.cards[-1]
         game.animatedFlip(stack)
@@ -136,9 +190,11 @@ class ASingleFlipMove(AFlipMove):
             card.showBack()
         else:
             card.showFace()
+        game.zobrist.flip(stack)
 
 # flip and move one card
 class AFlipAndMoveMove(AtomicMove):
+    __slots__ = ('from_stack_id', 'to_stack_id', 'frames')
 
     def __init__(self, from_stack, to_stack, frames):
         assert from_stack is not to_stack
@@ -158,13 +214,16 @@ class AFlipAndMoveMove(AtomicMove):
             c.showBack()
         else:
             c.showFace()
+        game.zobrist.flip(from_stack)
         if not moved:
             cards = from_stack.cards[-1:]
             x, y = to_stack.getPositionForNextCard()
             game.animatedMoveTo(from_stack, to_stack, cards, x, y,
                                 frames=self.frames, shadow=0)
+        game.zobrist.remove(from_stack)
         c = from_stack.removeCard(update=False)
         to_stack.addCard(c, update=False)
+        game.zobrist.add(to_stack)
         from_stack.updateText()
         to_stack.updateText()
 
@@ -186,6 +245,8 @@ class AFlipAndMoveMove(AtomicMove):
 # ************************************************************************
 
 class AFlipAllMove(AtomicMove):
+    __slots__ = ('stack_id',)
+
     def __init__(self, stack):
         self.stack_id = stack.id
 
@@ -196,6 +257,7 @@ class AFlipAllMove(AtomicMove):
                 card.showBack()
             else:
                 card.showFace()
+        game.zobrist.update(stack)
         stack.refreshView()
 
     def undo(self, game):
@@ -205,6 +267,7 @@ class AFlipAllMove(AtomicMove):
                 card.showBack()
             else:
                 card.showFace()
+        game.zobrist.update(stack)
         stack.refreshView()
 
     def cmpForRedo(self, other):
@@ -216,6 +279,8 @@ class AFlipAllMove(AtomicMove):
 # ************************************************************************
 
 class ATurnStackMove(AtomicMove):
+    __slots__ = ('from_stack_id', 'to_stack_id')
+
     def __init__(self, from_stack, to_stack):
         assert from_stack is not to_stack
         self.from_stack_id = from_stack.id
@@ -237,6 +302,8 @@ class ATurnStackMove(AtomicMove):
             to_stack.addCard(card, unhide=unhide, update=0)
             card.showBack(unhide=unhide)
             ##print 3, unhide, to_stack.getCard().__dict__
+        game.zobrist.update(from_stack)
+        game.zobrist.update(to_stack)
         from_stack.updateText()
         to_stack.updateText()
 
@@ -253,6 +320,8 @@ class ATurnStackMove(AtomicMove):
             assert not card.face_up
             card.showFace(unhide=unhide)
             to_stack.addCard(card, unhide=unhide, update=0)
+        game.zobrist.update(from_stack)
+        game.zobrist.update(to_stack)
         from_stack.updateText()
         to_stack.updateText()
 
@@ -268,6 +337,8 @@ class ATurnStackMove(AtomicMove):
 # ************************************************************************
 
 class NEW_ATurnStackMove(AtomicMove):
+    __slots__ = ('from_stack_id', 'to_stack_id', 'update_flags')
+
     def __init__(self, from_stack, to_stack, update_flags=1):
         assert from_stack is not to_stack
         self.from_stack_id = from_stack.id
@@ -302,6 +373,8 @@ class NEW_ATurnStackMove(AtomicMove):
             assert to_stack.round < to_stack.max_rounds or to_stack.max_rounds < 0
             to_stack.round = to_stack.round + 1
         self._doMove(from_stack, to_stack, 0)
+        game.zobrist.update(from_stack)
+        game.zobrist.update(to_stack)
 
     def undo(self, game):
         from_stack = game.allstacks[self.from_stack_id]
@@ -311,6 +384,8 @@ class NEW_ATurnStackMove(AtomicMove):
             assert to_stack.round > 1
             to_stack.round = to_stack.round - 1
         self._doMove(to_stack, from_stack, 1)
+        game.zobrist.update(from_stack)
+        game.zobrist.update(to_stack)
 
     def cmpForRedo(self, other):
         return (cmp(self.from_stack_id, other.from_stack_id) or
@@ -324,6 +399,8 @@ class NEW_ATurnStackMove(AtomicMove):
 # ************************************************************************
 
 class AUpdateStackMove(AtomicMove):
+    __slots__ = ('stack_id', 'flags')
+
     def __init__(self, stack, flags):
         self.stack_id = stack.id
         self.flags = flags
@@ -333,6 +410,7 @@ class AUpdateStackMove(AtomicMove):
         if self.flags & 64:
             # model
             stack.updateModel(undo, self.flags)
+            game.zobrist.update(stack)
         else:
             # view
             if self.flags & 16:
@@ -361,6 +439,8 @@ AUpdateStackViewMove = AUpdateStackMove
 # ************************************************************************
 
 class ANextRoundMove(AtomicMove):
+    __slots__ = ('stack_id',)
+
     def __init__(self, stack):
         self.stack_id = stack.id
 
@@ -387,6 +467,8 @@ class ANextRoundMove(AtomicMove):
 # ************************************************************************
 
 class ASaveSeedMove(AtomicMove):
+    __slots__ = ('state',)
+
     def __init__(self, game):
         self.state = game.random.getstate()
 
@@ -405,6 +487,8 @@ class ASaveSeedMove(AtomicMove):
 # ************************************************************************
 
 class ASaveStateMove(AtomicMove):
+    __slots__ = ('state', 'flags')
+
     def __init__(self, game, flags):
         self.state = game.getState()
         self.flags = flags
@@ -426,6 +510,8 @@ class ASaveStateMove(AtomicMove):
 # ************************************************************************
 
 class AShuffleStackMove(AtomicMove):
+    __slots__ = ('stack_id', 'card_ids', 'state')
+
     def __init__(self, stack, game):
         self.stack_id = stack.id
         # save cards and state
@@ -444,6 +530,7 @@ class AShuffleStackMove(AtomicMove):
             j = game.random.randint(0, n)
             seq[n], seq[j] = seq[j], seq[n]
             n = n - 1
+        game.zobrist.update(stack)
         stack.refreshView()
 
     def undo(self, game):
@@ -455,6 +542,7 @@ class AShuffleStackMove(AtomicMove):
             assert c.id == id
             cards.append(c)
         stack.cards = cards
+        game.zobrist.update(stack)
         # restore the state
         game.random.setstate(self.state)
         stack.refreshView()
@@ -471,6 +559,8 @@ class AShuffleStackMove(AtomicMove):
 # ************************************************************************
 
 class ASingleCardMove(AtomicMove):
+    __slots__ = ('from_stack_id', 'to_stack_id', 'from_pos',
+                 'frames', 'shadow')
 
     def __init__(self, from_stack, to_stack, from_pos, frames, shadow=-1):
         self.from_stack_id = from_stack.id
@@ -492,6 +582,8 @@ class ASingleCardMove(AtomicMove):
             game.animatedMoveTo(from_stack, to_stack, [card], x, y,
                                 frames=self.frames, shadow=self.shadow)
         to_stack.addCard(card)
+        game.zobrist.update(from_stack)
+        game.zobrist.update(to_stack)
         ##to_stack.refreshView()
 
     def undo(self, game):
@@ -504,6 +596,8 @@ class ASingleCardMove(AtomicMove):
 ##             game.animatedMoveTo(from_stack, to_stack, [card], x, y,
 ##                                 frames=self.frames, shadow=self.shadow)
         from_stack.insertCard(card, from_pos)
+        game.zobrist.update(from_stack)
+        game.zobrist.update(to_stack)
         ##to_stack.refreshView()
 
     def cmpForRedo(self, other):
@@ -516,6 +610,7 @@ class ASingleCardMove(AtomicMove):
 # ************************************************************************
 
 class AInnerMove(AtomicMove):
+    __slots__ = ('stack_id', 'from_pos', 'to_pos')
 
     def __init__(self, stack, from_pos, to_pos):
         self.stack_id = stack.id
@@ -531,3 +626,26 @@ class AInnerMove(AtomicMove):
         return cmp((self.stack_id, self.from_pos, self.to_pos),
                    (other.stack_id, other.from_pos, other.to_pos))
 
+
+
+# ************************************************************************
+# * The codes of the atomic moves in save files (see savefile.py).
+# * Only append to this list.
+# ************************************************************************
+
+MOVE_CLASSES = (
+    AMoveMove,
+    AFlipMove,
+    ASingleFlipMove,
+    AFlipAndMoveMove,
+    AFlipAllMove,
+    ATurnStackMove,
+    NEW_ATurnStackMove,
+    AUpdateStackMove,
+    ANextRoundMove,
+    ASaveSeedMove,
+    ASaveStateMove,
+    AShuffleStackMove,
+    ASingleCardMove,
+    AInnerMove,
+    )
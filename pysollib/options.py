@@ -87,6 +87,7 @@ helpbar = boolean
 num_recent_games = integer(10, 100)
 last_gameid = integer
 game_holded = integer
+autosave_journal = boolean
 wm_maximized = boolean
 splashscreen = boolean
 mouse_type = string
@@ -174,6 +175,7 @@ scale_x = float
 scale_y = float
 auto_scale = boolean
 preserve_aspect_ratio = boolean
+cache_scaled_cardsets = boolean
 '''.splitlines()
 
 
@@ -223,6 +225,7 @@ class Options:
         ('num_recent_games', 'int'),
         ('last_gameid', 'int'),
         ('game_holded', 'int'),
+        ('autosave_journal', 'bool'),
         ('wm_maximized', 'bool'),
         ('splashscreen', 'bool'),
         ('mouse_type', 'str'),
@@ -371,6 +374,7 @@ class Options:
         self.favorite_gameid = []
         self.last_gameid = 0            # last game played
         self.game_holded = 0            # gameid or 0
+        self.autosave_journal = False   # resume the game after a crash
         self.wm_maximized = 0
         self.save_games_geometry = False
         self.games_geometry = {} # saved games geometry (gameid: (width, height))
@@ -386,6 +390,7 @@ class Options:
         self.scale_y = 1.0
         self.auto_scale = False
         self.preserve_aspect_ratio = True
+        self.cache_scaled_cardsets = False  # keep scaled cards on disk
         # solver
         self.solver_presets = [
             'none',
@@ -513,7 +518,8 @@ class Options:
         for key, val in self.cardset.items():
             config['cardsets'][str(key)] = val
         for key in ('scale_cards', 'scale_x', 'scale_y',
-                    'auto_scale', 'preserve_aspect_ratio'):
+                    'auto_scale', 'preserve_aspect_ratio',
+                    'cache_scaled_cardsets'):
             config['cardsets'][key] = getattr(self, key)
 
         # games_geometry
@@ -683,7 +689,8 @@ class Options:
                        ('scale_x', 'float'),
                        ('scale_y', 'float'),
                        ('auto_scale', 'bool'),
-                       ('preserve_aspect_ratio', 'bool')):
+                       ('preserve_aspect_ratio', 'bool'),
+                       ('cache_scaled_cardsets', 'bool')):
             val = self._getOption('cardsets', key, t)
             if val is not None:
                 setattr(self, key, val)
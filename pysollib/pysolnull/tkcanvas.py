@@ -0,0 +1,250 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+##---------------------------------------------------------------------------##
+##
+## Copyright (C) 1998-2003 Markus Franz Xaver Johannes Oberhumer
+## Copyright (C) 2003 Mt. Hood Playing Card Co.
+## Copyright (C) 2005-2009 Skomoroh
+##
+## This program is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## This program is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with this program.  If not, see <http://www.gnu.org/licenses/>.
+##
+##---------------------------------------------------------------------------##
+
+__all__ = ['MfxCanvasGroup',
+           'MfxCanvasImage',
+           'MfxCanvasText',
+           'MfxCanvasLine',
+           'MfxCanvasRectangle',
+           'MfxCanvas']
+
+
+# ************************************************************************
+# * canvas items
+# *
+# * A null item only remembers its coordinates and options; nothing
+# * is ever drawn.
+# ************************************************************************
+
+class _MfxCanvasItem:
+    def __init__(self, canvas, *args, **kwargs):
+        self.canvas = canvas
+        self.id = canvas._newItemId()
+        self.tag = None
+        self._coords = list(args)
+        self._config = {}
+        group = kwargs.pop('group', None)
+        self._config.update(kwargs)
+        canvas.items[self.id] = self
+        if group:
+            self.addtag(group)
+
+    def __str__(self):
+        return str(self.id)
+
+    def config(self, cnf={}, **kw):
+        self._config.update(cnf)
+        self._config.update(kw)
+    configure = config
+
+    def cget(self, option):
+        return self._config.get(option, '')
+
+    def __getitem__(self, key):
+        return self.cget(key)
+
+    def __setitem__(self, key, value):
+        self._config[key] = value
+
+    def coords(self, pts=()):
+        if pts:
+            self._coords = []
+            for x, y in pts:
+                self._coords.extend((x, y))
+        return self._coords
+
+    def bbox(self):
+        x, y = self._coords[:2]
+        return (x, y), (x, y)
+
+    def move(self, dx, dy):
+        c = self._coords
+        for i in range(0, len(c) - 1, 2):
+            c[i] = c[i] + dx
+            c[i+1] = c[i+1] + dy
+
+    def moveTo(self, x, y):
+        c = self._coords
+        self.move(x - c[0], y - c[1])
+
+    def addtag(self, tag, option="withtag"):
+        pass
+
+    def dtag(self, tag=None):
+        pass
+
+    def gettags(self):
+        return ()
+
+    def bind(self, sequence=None, command=None, add=None):
+        pass
+
+    def unbind(self, sequence, funcid=None):
+        pass
+
+    def tkraise(self, aboveThis=None):
+        pass
+
+    def lower(self, belowThis=None):
+        pass
+
+    def show(self):
+        self._config['state'] = 'normal'
+
+    def hide(self):
+        self._config['state'] = 'hidden'
+
+    def delete(self):
+        self.canvas.items.pop(self.id, None)
+
+
+class MfxCanvasGroup(_MfxCanvasItem):
+    def __init__(self, canvas, tag=None):
+        _MfxCanvasItem.__init__(self, canvas, 0, 0)
+        self.tag = tag or 'Group%d' % self.id
+
+
+class MfxCanvasImage(_MfxCanvasItem):
+    def __init__(self, canvas, x, y, **kwargs):
+        self.init_coord = x, y
+        _MfxCanvasItem.__init__(self, canvas, x, y, **kwargs)
+
+
+class MfxCanvasLine(_MfxCanvasItem):
+    pass
+
+
+class MfxCanvasRectangle(_MfxCanvasItem):
+    pass
+
+
+class MfxCanvasText(_MfxCanvasItem):
+    def __init__(self, canvas, x, y, preview=-1, **kwargs):
+        self.init_coord = x, y
+        self.x, self.y = x, y
+        self.text_format = None
+        _MfxCanvasItem.__init__(self, canvas, x, y, **kwargs)
+
+    def moveTo(self, x, y):
+        dx, dy = x - self.x, y - self.y
+        self.x, self.y = x, y
+        self.move(dx, dy)
+
+
+# ************************************************************************
+# * canvas
+# ************************************************************************
+
+class MfxCanvas:
+    def __init__(self, *args, **kw):
+        self.preview = 0
+        self.busy = False
+        self.items = {}
+        self.xmargin, self.ymargin = 10, 10
+        self._config = {'width': 0, 'height': 0}
+        self._config.update(kw)
+        self._item_id = 0
+
+    def _newItemId(self):
+        self._item_id += 1
+        return self._item_id
+
+    def config(self, cnf={}, **kw):
+        self._config.update(cnf)
+        self._config.update(kw)
+    configure = config
+
+    def cget(self, option):
+        return self._config.get(option, '')
+
+    def coords(self, item, *args):
+        if args:
+            item._coords = list(args)
+        return item._coords
+
+    def delete(self, *items):
+        for item in items:
+            if isinstance(item, _MfxCanvasItem):
+                item.delete()
+
+    def bind(self, sequence=None, func=None, add=None):
+        pass
+
+    def unbind(self, sequence, funcid=None):
+        pass
+
+    def after(self, ms, func=None, *args):
+        return None
+
+    def after_cancel(self, id):
+        pass
+
+    def update(self):
+        pass
+
+    def update_idletasks(self):
+        pass
+
+    def winfo_ismapped(self):
+        return 0
+
+    def winfo_width(self):
+        return int(self._config['width'])
+
+    def winfo_height(self):
+        return int(self._config['height'])
+
+    def xview(self, *args):
+        return (0.0, 1.0)
+
+    def yview(self, *args):
+        return (0.0, 1.0)
+
+    def setInitialSize(self, width, height, margins=True, scrollregion=True):
+        if margins and not self.preview:
+            width, height = width + 2*self.xmargin, height + 2*self.ymargin
+        self.config(width=width, height=height)
+
+    def deleteAllItems(self):
+        self.items = {}
+
+    def findCard(self, stack, event):
+        return -1
+
+    def setBackgroundImage(self, event=None):
+        pass
+
+    def setTextColor(self, color):
+        pass
+
+    def setTile(self, image, stretch=0, save_aspect=0):
+        return 1
+
+    def setTopImage(self, image, cw=0, ch=0):
+        return 1
+
+    def hideAllItems(self):
+        pass
+
+    def showAllItems(self):
+        pass
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+##---------------------------------------------------------------------------##
+##
+## Copyright (C) 1998-2003 Markus Franz Xaver Johannes Oberhumer
+## Copyright (C) 2003 Mt. Hood Playing Card Co.
+## Copyright (C) 2005-2009 Skomoroh
+##
+## This program is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## This program is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with this program.  If not, see <http://www.gnu.org/licenses/>.
+##
+##---------------------------------------------------------------------------##
+
+__all__ = ['wm_withdraw',
+           'wm_deiconify',
+           'wm_map',
+           'wm_get_geometry',
+           'make_help_toplevel',
+           'bind',
+           'unbind_destroy',
+           'after',
+           'after_idle',
+           'after_cancel',
+           'copyImage',
+           'loadImage',
+           'createImage',
+           'shadowImage',
+           'markImage',
+           'createBottom',
+           'resizeBottom',
+           'get_text_width',
+           ]
+
+# ************************************************************************
+# * The null toolkit has no windows, no event loop and no images.
+# * All functions are no-ops that return placeholder values so that
+# * the game engine can run unchanged.
+# ************************************************************************
+
+
+# ************************************************************************
+# * window manager util
+# ************************************************************************
+
+def wm_withdraw(window):
+    pass
+
+def wm_deiconify(window):
+    pass
+
+def wm_map(window, maximized=0):
+    pass
+
+def wm_get_geometry(window):
+    return (0, 0, 0, 0)
+
+def make_help_toplevel(app, title=None):
+    return None
+
+
+# ************************************************************************
+# * bind wrapper
+# ************************************************************************
+
+def bind(widget, sequence, func, add=None):
+    pass
+
+def unbind_destroy(widget):
+    pass
+
+
+# ************************************************************************
+# * timer wrapper - there is no event loop, so nothing is ever scheduled
+# ************************************************************************
+
+def after(widget, ms, func, *args):
+    return None
+
+def after_idle(widget, func, *args):
+    return None
+
+def after_cancel(t):
+    pass
+
+
+# ************************************************************************
+# * image handling
+# ************************************************************************
+
+def loadImage(file=None, data=None, dither=None, alpha=None):
+    return None
+
+def copyImage(image, x, y, width, height):
+    return None
+
+def createImage(width, height, fill, outline=None):
+    return None
+
+def shadowImage(image, color='#3896f8', factor=0.3):
+    return None
+
+def markImage(image):
+    return None
+
+def createBottom(maskimage, color='white', backfile=None):
+    return None
+
+def resizeBottom(image, maskimage, color='white', backfile=None):
+    pass
+
+
+# ************************************************************************
+# * font utils
+# ************************************************************************
+
+def get_text_width(text, font, root=None):
+    return 0
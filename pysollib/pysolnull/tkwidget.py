@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+##---------------------------------------------------------------------------##
+##
+## Copyright (C) 1998-2003 Markus Franz Xaver Johannes Oberhumer
+## Copyright (C) 2003 Mt. Hood Playing Card Co.
+## Copyright (C) 2005-2009 Skomoroh
+##
+## This program is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## This program is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with this program.  If not, see <http://www.gnu.org/licenses/>.
+##
+##---------------------------------------------------------------------------##
+
+__all__ = ['MfxDialog',
+           'MfxMessageDialog',
+           'MfxExceptionDialog',
+           'MfxSimpleEntry',
+           'PysolAboutDialog',
+           'StackDesc',
+           ]
+
+# imports
+import traceback
+
+
+# ************************************************************************
+# * Dialogs are never shown; they behave as if they were closed
+# * by the window manager (status 1), so no follow-up action is taken.
+# ************************************************************************
+
+class MfxDialog:
+    def __init__(self, parent, title="", resizable=False, default=-1):
+        self.parent = parent
+        self.status = 1
+        self.button = default
+
+    def mainloop(self, focus=None, timeout=0, transient=True):
+        pass
+
+    def destroy(self):
+        self.parent = None
+
+
+class MfxMessageDialog(MfxDialog):
+    def __init__(self, parent, title, **kw):
+        MfxDialog.__init__(self, parent, title, default=kw.get('default', 0))
+
+
+class MfxExceptionDialog(MfxMessageDialog):
+    def __init__(self, parent, ex, title="Error", **kw):
+        MfxMessageDialog.__init__(self, parent, title, **kw)
+        traceback.print_exc()
+
+
+class MfxSimpleEntry(MfxDialog):
+    def __init__(self, parent, title, label, value, **kw):
+        MfxDialog.__init__(self, parent, title, default=kw.get('default', 0))
+        self.value = value
+
+
+class PysolAboutDialog(MfxMessageDialog):
+    def __init__(self, app, parent, title, **kw):
+        MfxMessageDialog.__init__(self, parent, title, **kw)
+
+
+class StackDesc:
+    def __init__(self, game, stack):
+        self.game = game
+        self.stack = stack
+
+    def delete(self):
+        pass
@@ -67,6 +67,18 @@ if TOOLKIT == 'tk':
         from pysollib.tk.selectcardset import *
         from pysollib.tk.selecttree import *
 
+elif TOOLKIT == 'none':
+    # headless mode: no windows, no images (see pysollib/headless.py)
+    from pysollib.pysolnull.tkconst import *
+    from pysollib.pysolnull.tkutil import *
+    from pysollib.pysolnull.tkcanvas import *
+    from pysollib.pysolnull.tkwrap import *
+    from pysollib.pysolnull.tkwidget import *
+    from pysollib.pysolnull.tkhtml import *
+    from pysollib.pysolnull.findcarddialog import *
+    from pysollib.pysolnull.solverdialog import *
+    from pysollib.pysolnull.card import *
+
 else: # gtk
     from pysollib.pysolgtk.tkconst import *
     from pysollib.pysolgtk.tkutil import *
@@ -24,10 +24,11 @@
 
 # imports
 import os, glob, traceback
+import marshal
 
 # PySol imports
 from pysollib.mfxutil import Struct, KwStruct
-from pysollib.settings import DEBUG
+from pysollib.settings import DEBUG, VERSION
 
 from pysollib.mygettext import _
 
@@ -153,6 +154,89 @@ class ResourceManager:
         return result
 
 
+# ************************************************************************
+# * Resource cache - what was found in the resource directories at the
+# * last start, so unchanged directories need not be scanned and parsed
+# * again. Every entry has a stamp (e.g. the mtimes of the files it was
+# * made from) and is used only if the stamp is unchanged. The entries
+# * of a section that were not used in a run are dropped on save.
+# ************************************************************************
+
+class ResourceCache:
+    CACHE_VERSION = 1
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.entries = {}       # (section, key) -> (stamp, value)
+        self.used = {}          # the entries of this run
+        self.sections = {}      # the sections used in this run
+        self.changed = False
+        try:
+            f = open(filename, 'rb')
+            try:
+                version, entries = marshal.load(f)
+            finally:
+                f.close()
+            if version == (self.CACHE_VERSION, VERSION):
+                self.entries = entries
+        except (EnvironmentError, EOFError, ValueError, TypeError):
+            pass
+        self._saved = len(self.entries)     # the entries in the file
+
+    def get(self, section, key, stamp):
+        # return the cached value or None
+        self.sections[section] = True
+        entry = self.used.get((section, key)) or \
+                self.entries.get((section, key))
+        if entry is None or entry[0] != stamp:
+            return None
+        self.used[(section, key)] = entry
+        return entry[1]
+
+    def set(self, section, key, stamp, value):
+        self.sections[section] = True
+        if self.used.get((section, key)) != (stamp, value):
+            self.used[(section, key)] = (stamp, value)
+            self.changed = True
+
+    def save(self):
+        entries = self.used
+        for k, v in self.entries.items():
+            if k[0] not in self.sections:
+                entries[k] = v
+        self.entries, self.used, self.sections = entries, {}, {}
+        if not self.changed and len(entries) == self._saved:
+            return
+        self.changed = False
+        tmp = self.filename + '.tmp'
+        try:
+            data = marshal.dumps(((self.CACHE_VERSION, VERSION), entries), 2)
+            f = open(tmp, 'wb')
+            try:
+                f.write(data)
+            finally:
+                f.close()
+            if os.name == 'nt' and os.path.exists(self.filename):
+                os.remove(self.filename)
+            os.rename(tmp, self.filename)
+        except (EnvironmentError, ValueError):
+            if DEBUG:
+                traceback.print_exc()
+        self._saved = len(entries)
+
+    #
+    # static methods
+    #
+
+    def getStamp(*filenames):
+        # the mtimes of the files or None if one is missing
+        try:
+            return tuple([os.stat(f).st_mtime for f in filenames])
+        except EnvironmentError:
+            return None
+    getStamp = staticmethod(getStamp)
+
+
 # ************************************************************************
 # * Cardset
 # ************************************************************************
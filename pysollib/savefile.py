@@ -0,0 +1,204 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+##---------------------------------------------------------------------------##
+##
+## Copyright (C) 1998-2003 Markus Franz Xaver Johannes Oberhumer
+## Copyright (C) 2003 Mt. Hood Playing Card Co.
+## Copyright (C) 2005-2009 Skomoroh
+##
+## This program is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## This program is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with this program.  If not, see <http://www.gnu.org/licenses/>.
+##
+##---------------------------------------------------------------------------##
+
+# ************************************************************************
+# * Compact save files.
+# *
+# *   magic       MAGIC
+# *   format      1 byte
+# *   length      4 bytes (little endian) - length of the header
+# *   header      marshal'ed dict: package, version, game id, ...
+# *   body        zlib compressed marshal'ed dict: cards, moves, stats, ...
+# *
+# * Unlike pickle, marshal does no class lookup and imports nothing; the
+# * atomic moves are stored as tuples (code, slot values...), see
+# * MOVE_CLASSES. marshal is not safe against crafted data, though:
+# * only load save files from sources you trust.
+# * Older versions pickled the whole game; see Game._loadGame().
+# ************************************************************************
+
+__all__ = ['MAGIC',
+           'isSaveFile',
+           'packSaveFile',
+           'unpackSaveFile',
+           'readSaveHeader',
+           'packMoves',
+           'unpackMoves',
+           'HookWriter',
+           'HookReader',
+           ]
+
+# imports
+import marshal
+import struct
+import zlib
+
+# PySol imports
+from pysollib.mfxutil import UnpicklingError
+from pysollib.move import AtomicMove, MOVE_CLASSES
+
+
+MAGIC = 'PySolFC\x1a'
+FORMAT = 1
+_PREFIX = '<BI'
+_PREFIX_SIZE = struct.calcsize(_PREFIX)
+_MARSHAL_VERSION = 2
+
+_move_codes = dict([(c, i) for i, c in enumerate(MOVE_CLASSES)])
+
+
+def isSaveFile(data):
+    return data[:len(MAGIC)] == MAGIC
+
+
+# ************************************************************************
+# * read/write
+# ************************************************************************
+
+def packSaveFile(header, body):
+    # raises ValueError if header or body contain values other than
+    # plain data
+    header = marshal.dumps(header, _MARSHAL_VERSION)
+    body = zlib.compress(marshal.dumps(body, _MARSHAL_VERSION))
+    return ''.join((MAGIC, struct.pack(_PREFIX, FORMAT, len(header)),
+                    header, body))
+
+def _unpackPrefix(data):
+    if not isSaveFile(data) or len(data) < len(MAGIC) + _PREFIX_SIZE:
+        raise UnpicklingError('Not a save file')
+    format, length = struct.unpack(
+        _PREFIX, data[len(MAGIC):len(MAGIC)+_PREFIX_SIZE])
+    if format > FORMAT:
+        raise UnpicklingError('Unknown save file format %d' % format)
+    return len(MAGIC) + _PREFIX_SIZE, length
+
+def _loads(data):
+    try:
+        obj = marshal.loads(data)
+    except (EOFError, ValueError, TypeError):
+        raise UnpicklingError('Invalid or damaged save file')
+    if not isinstance(obj, dict):
+        raise UnpicklingError('Invalid or damaged save file')
+    return obj
+
+def unpackSaveFile(data):
+    # return (header, body)
+    start, length = _unpackPrefix(data)
+    header = _loads(data[start:start+length])
+    try:
+        body = zlib.decompress(data[start+length:])
+    except zlib.error:
+        raise UnpicklingError('Invalid or damaged save file')
+    return header, _loads(body)
+
+def readSaveHeader(f):
+    # read only the header of an open file
+    data = f.read(len(MAGIC) + _PREFIX_SIZE)
+    start, length = _unpackPrefix(data)
+    data = f.read(length)
+    if len(data) != length:
+        raise UnpicklingError('Invalid or damaged save file')
+    return _loads(data)
+
+
+# ************************************************************************
+# * move history
+# ************************************************************************
+
+def packMoves(history):
+    # history is a list of move lists (or tuples); games may add
+    # other values to them (Lara's Game adds the active row, an int
+    # or None)
+    codes = _move_codes
+    packed = []
+    for entry in history:
+        items = []
+        for am in entry:
+            if isinstance(am, AtomicMove):
+                items.append((codes[am.__class__],) + tuple(am.__getstate__()))
+            elif am is None or isinstance(am, (int, long)):
+                items.append(am)
+            else:
+                raise ValueError('cannot save move %r' % (am,))
+        if isinstance(entry, list):
+            packed.append(items)
+        else:
+            packed.append(tuple(items))
+    return packed
+
+def unpackMoves(packed):
+    if not isinstance(packed, list):
+        raise UnpicklingError('Invalid or damaged move history')
+    history = []
+    for entry in packed:
+        if not isinstance(entry, (list, tuple)):
+            raise UnpicklingError('Invalid or damaged move history')
+        items = []
+        for item in entry:
+            if isinstance(item, tuple):
+                try:
+                    cls = MOVE_CLASSES[item[0]]
+                except (IndexError, TypeError):
+                    raise UnpicklingError('Invalid or damaged move history')
+                if len(item) != len(cls._fields) + 1:
+                    raise UnpicklingError('Invalid or damaged move history')
+                am = cls()
+                am.__setstate__(item[1:])
+                items.append(am)
+            elif item is None or isinstance(item, (int, long)):
+                items.append(item)
+            else:
+                raise UnpicklingError('Invalid or damaged move history')
+        if isinstance(entry, list):
+            history.append(items)
+        else:
+            history.append(tuple(items))
+    return history
+
+
+# ************************************************************************
+# * Values of Game._saveGameHook() and Game._loadGameHook(); they use
+# * the same dump()/load() interface as a Pickler.
+# ************************************************************************
+
+class HookWriter:
+    def __init__(self):
+        self.values = []
+
+    def dump(self, obj):
+        self.values.append(obj)
+
+
+class HookReader:
+    def __init__(self, values):
+        if not isinstance(values, list):
+            raise UnpicklingError('Invalid or damaged save file')
+        self.values = values
+        self.index = 0
+
+    def load(self):
+        if self.index >= len(self.values):
+            raise UnpicklingError('Invalid or damaged save file')
+        obj = self.values[self.index]
+        self.index += 1
+        return obj
@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+##---------------------------------------------------------------------------##
+##
+## Copyright (C) 1998-2003 Markus Franz Xaver Johannes Oberhumer
+## Copyright (C) 2003 Mt. Hood Playing Card Co.
+## Copyright (C) 2005-2009 Skomoroh
+##
+## This program is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## This program is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with this program.  If not, see <http://www.gnu.org/licenses/>.
+##
+##---------------------------------------------------------------------------##
+
+# ************************************************************************
+# * Saved games library.
+# *
+# * Lists the saved games of a directory with the game, the seed, the
+# * number of moves, the date and the finished state. Only the header
+# * of each save file is read (see savefile.py), and the headers are
+# * kept in an index file; a file is read again only when its mtime or
+# * size changes.
+# ************************************************************************
+
+__all__ = ['SavedGamesLibrary',
+           ]
+
+# imports
+import os
+import marshal
+
+# PySol imports
+from pysollib.mfxutil import Struct, Unpickler, print_err
+from pysollib.savefile import MAGIC, readSaveHeader
+
+
+SAVE_EXTENSION = '.pso'
+INDEX_VERSION = 1
+
+
+# ************************************************************************
+# *
+# ************************************************************************
+
+class SavedGamesLibrary:
+    def __init__(self, dir, index_file, gdb=None):
+        self.dir = dir
+        self.index_file = index_file
+        self.gdb = gdb
+        self.index = None       # file name -> (mtime, size, header)
+
+    def _loadIndex(self):
+        self.index = {}
+        if not os.path.exists(self.index_file):
+            return
+        try:
+            f = open(self.index_file, 'rb')
+            try:
+                version, index = marshal.load(f)
+            finally:
+                f.close()
+        except (EnvironmentError, EOFError, ValueError, TypeError):
+            return
+        if version == INDEX_VERSION and isinstance(index, dict):
+            self.index = index
+
+    def _saveIndex(self):
+        tmp = self.index_file + '.tmp'
+        try:
+            f = open(tmp, 'wb')
+            try:
+                marshal.dump((INDEX_VERSION, self.index), f, 2)
+            finally:
+                f.close()
+            if os.name == 'nt' and os.path.exists(self.index_file):
+                os.remove(self.index_file)
+            os.rename(tmp, self.index_file)
+        except EnvironmentError, ex:
+            print_err('cannot write %s: %s' % (self.index_file, ex))
+
+    def _readHeader(self, filename):
+        f = open(filename, 'rb')
+        try:
+            if f.read(len(MAGIC)) == MAGIC:
+                f.seek(0)
+                return readSaveHeader(f)
+            # older versions pickled the game; the first values are
+            # package, version, version_tuple, bookmark, game_version
+            # and id
+            f.seek(0)
+            p = Unpickler(f)
+            # the header is plain values: don't import and call anything
+            # a file may name
+            p.find_global = None
+            values = [p.load() for i in range(6)]
+            header = dict(zip(('package', 'version', 'version_tuple',
+                               'bookmark', 'game_version', 'id'), values))
+            if not isinstance(header['id'], int):
+                return None
+            return header
+        finally:
+            f.close()
+
+    # read the headers of new or changed files; return the number of
+    # files read
+    def refresh(self):
+        if self.index is None:
+            self._loadIndex()
+        try:
+            names = os.listdir(self.dir)
+        except EnvironmentError:
+            names = []
+        index, nread = {}, 0
+        for name in names:
+            if not name.lower().endswith(SAVE_EXTENSION):
+                continue
+            filename = os.path.join(self.dir, name)
+            try:
+                st = os.stat(filename)
+            except EnvironmentError:
+                continue
+            entry = self.index.get(name)
+            if entry and entry[:2] == (st.st_mtime, st.st_size):
+                index[name] = entry
+                continue
+            try:
+                header = self._readHeader(filename)
+            except Exception:
+                # not a save file or a damaged one
+                header = None
+            index[name] = (st.st_mtime, st.st_size, header)
+            nread += 1
+        if nread or len(index) != len(self.index):
+            self.index = index
+            self._saveIndex()
+        return nread
+
+    # return a list of Structs, most recent first
+    def getGames(self):
+        self.refresh()
+        games = []
+        for name, (mtime, size, header) in self.index.items():
+            if header is None:
+                continue
+            id = header.get('id')
+            game_name = header.get('name')
+            if game_name is None and self.gdb:
+                gi = self.gdb.get(id)
+                if gi:
+                    game_name = gi.en_name
+            games.append(Struct(
+                filename = os.path.join(self.dir, name),
+                id = id,
+                name = game_name,
+                seed = header.get('seed'),
+                moves = header.get('moves'),
+                date = header.get('date', int(mtime)),
+                finished = header.get('finished'),
+                bookmark = header.get('bookmark'),
+            ))
+        games.sort(key=lambda g: g.date, reverse=True)
+        return games
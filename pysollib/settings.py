@@ -37,7 +37,7 @@ VERSION_TUPLE = (3,0,0)
 WIN_SYSTEM = 'x11'                      # win32, x11, aqua, classic
 
 # toolkit
-TOOLKIT = 'tk'                          # or 'gtk'
+TOOLKIT = 'tk'                          # or 'gtk' or 'none' (headless)
 USE_TILE = 'auto'                       # or True or False
 
 # sound
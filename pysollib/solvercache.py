@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+##---------------------------------------------------------------------------##
+##
+## Copyright (C) 1998-2003 Markus Franz Xaver Johannes Oberhumer
+## Copyright (C) 2003 Mt. Hood Playing Card Co.
+## Copyright (C) 2005-2009 Skomoroh
+##
+## This program is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## This program is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with this program.  If not, see <http://www.gnu.org/licenses/>.
+##
+##---------------------------------------------------------------------------##
+
+# ************************************************************************
+# * On-disk cache of solver results.
+# *
+# * One small pickle file per entry, named by the MD5 of the key, so
+# * that several processes can share a cache directory. Reading an
+# * entry touches the file; when there are more than max_entries files
+# * the least recently used ones are removed.
+# ************************************************************************
+
+__all__ = ['SolverCache']
+
+# imports
+import os
+try:
+    from hashlib import md5
+except ImportError:
+    from md5 import md5
+
+# PySol imports
+from pysollib.mfxutil import Pickler, Unpickler
+
+
+# ************************************************************************
+# *
+# ************************************************************************
+
+class SolverCache:
+    EXT = '.dat'
+
+    def __init__(self, dirname, max_entries=10000):
+        self.dirname = dirname
+        self.max_entries = max_entries
+        self.count = None               # number of entries, if known
+
+    def _filename(self, key):
+        return os.path.join(self.dirname, md5(repr(key)).hexdigest()+self.EXT)
+
+    def _entries(self):
+        try:
+            names = os.listdir(self.dirname)
+        except OSError:
+            return []
+        return [os.path.join(self.dirname, n)
+                for n in names if n.endswith(self.EXT)]
+
+    def get(self, key):
+        fn = self._filename(key)
+        try:
+            f = open(fn, 'rb')
+        except IOError:
+            return None
+        try:
+            try:
+                k, value = Unpickler(f).load()
+            except Exception:
+                return None             # broken entry
+        finally:
+            f.close()
+        if k != key:
+            return None                 # MD5 collision
+        try:
+            os.utime(fn, None)
+        except OSError:
+            pass
+        return value
+
+    def put(self, key, value):
+        if self.max_entries <= 0:
+            return
+        fn = self._filename(key)
+        tmp = '%s.%d.tmp' % (fn, os.getpid())
+        try:
+            if not os.path.isdir(self.dirname):
+                os.makedirs(self.dirname)
+            new = not os.path.exists(fn)
+            f = open(tmp, 'wb')
+            try:
+                Pickler(f, -1).dump((key, value))
+            finally:
+                f.close()
+            if os.name == 'nt' and not new:
+                os.remove(fn)
+            os.rename(tmp, fn)
+        except (IOError, OSError):
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return
+        if self.count is None:
+            self.count = len(self._entries())
+        elif new:
+            self.count += 1
+        if self.count > self.max_entries:
+            self.evict()
+
+    def evict(self):
+        # remove the least recently used entries, down to 90%
+        entries = []
+        for fn in self._entries():
+            try:
+                entries.append((os.path.getmtime(fn), fn))
+            except OSError:
+                pass
+        entries.sort()
+        n = max(0, len(entries) - self.max_entries * 9 // 10)
+        for t, fn in entries[:n]:
+            try:
+                os.remove(fn)
+            except OSError:
+                pass
+        self.count = len(entries) - n
+
+    def clear(self):
+        for fn in self._entries():
+            try:
+                os.remove(fn)
+            except OSError:
+                pass
+        self.count = 0
@@ -0,0 +1,284 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+##---------------------------------------------------------------------------##
+##
+## Copyright (C) 1998-2003 Markus Franz Xaver Johannes Oberhumer
+## Copyright (C) 2003 Mt. Hood Playing Card Co.
+## Copyright (C) 2005-2009 Skomoroh
+##
+## This program is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## This program is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with this program.  If not, see <http://www.gnu.org/licenses/>.
+##
+##---------------------------------------------------------------------------##
+
+# ************************************************************************
+# * Long-lived solver processes.
+# *
+# * A SolverProcess keeps a worker (see solverworker.py) running and
+# * sends it one board per request; the output of the solver is
+# * streamed back line by line. A request that runs into its timeout
+# * or is cancelled kills the worker and the solver it runs (they are
+# * in a process group of their own), a new one is started on the
+# * next request. Where the worker can't be run (frozen executables)
+# * the solver itself is started for every request, without a shell.
+# ************************************************************************
+
+__all__ = ['SolverError',
+           'SolverTimeout',
+           'SolverCancelled',
+           'SolverProcess',
+           'SolverPool',
+           'getSolverPool',
+           'closeSolverPools']
+
+# imports
+import sys, os
+import time
+import signal
+import threading
+import subprocess
+import atexit
+from Queue import Queue, Empty
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
+# PySol imports
+from pysollib.solverworker import END_OF_BOARD, END_OF_OUTPUT
+
+
+# ************************************************************************
+# * exceptions
+# ************************************************************************
+
+class SolverError(Exception):
+    pass
+
+class SolverTimeout(SolverError):
+    pass
+
+class SolverCancelled(SolverError):
+    pass
+
+
+# ************************************************************************
+# * one solver process
+# ************************************************************************
+
+class SolverProcess:
+    # how often a waiting request looks at its cancel event
+    POLL_INTERVAL = 0.1
+
+    def __init__(self, command, persistent=True):
+        # persistent: command runs solverworker.py (see workerCommand());
+        # otherwise command is the solver itself
+        self.command = list(command)
+        self.persistent = persistent
+        self.proc = None
+        self.lines = None               # Queue, filled by the reader thread
+
+    def isRunning(self):
+        return self.proc is not None and self.proc.poll() is None
+
+    def _start(self, args=()):
+        kw = {'stdin': subprocess.PIPE,
+              'stdout': subprocess.PIPE,
+              'stderr': open(os.devnull, 'w')}
+        if os.name != 'nt':
+            kw['close_fds'] = True
+            # a new session: kill() kills the solver started by the
+            # worker too
+            kw['preexec_fn'] = os.setsid
+        try:
+            self.proc = subprocess.Popen(self.command + list(args), **kw)
+        except OSError, err:
+            raise SolverError('%s: %s' % (self.command[0], err))
+        kw['stderr'].close()
+        self.lines = Queue()
+        t = threading.Thread(target=self._reader,
+                             args=(self.proc.stdout, self.lines))
+        t.setDaemon(True)
+        t.start()
+
+    def _reader(self, pout, lines):
+        # readline() instead of iterating the file: no read-ahead
+        for line in iter(pout.readline, ''):
+            lines.put(line)
+        lines.put(None)                 # EOF
+        pout.close()
+
+    def kill(self):
+        proc, self.proc = self.proc, None
+        if proc is None:
+            return
+        try:
+            proc.stdin.close()
+        except (IOError, OSError):
+            pass
+        if os.name != 'nt':
+            # the worker may be gone, but not its solver
+            try:
+                os.killpg(proc.pid, signal.SIGKILL)
+            except OSError:
+                pass
+        elif proc.poll() is None:
+            try:
+                proc.kill()
+            except OSError:
+                pass
+        proc.wait()
+
+    def solve(self, args, board, timeout=None, cancel=None):
+        # generator: yields the output lines of the solver;
+        # cancel is a threading.Event
+        args = [str(i) for i in args]
+        if self.persistent:
+            if not self.isRunning():
+                self.kill()
+                self._start()
+            request = json.dumps(args) + '\n' + board
+            if not board.endswith('\n'):
+                request += '\n'
+            request += END_OF_BOARD + '\n'
+        else:
+            self.kill()
+            self._start(args)
+            request = board
+        done = False
+        try:
+            try:
+                self.proc.stdin.write(request)
+                self.proc.stdin.flush()
+                if not self.persistent:
+                    self.proc.stdin.close()
+            except (IOError, OSError), err:
+                raise SolverError('%s: %s' % (self.command[0], err))
+            for line in self._readLines(timeout, cancel):
+                yield line
+            done = True
+        finally:
+            if not done or not self.persistent:
+                # timeout, cancel, error or the caller stopped reading
+                self.kill()
+
+    def _readLines(self, timeout, cancel):
+        if timeout is not None:
+            deadline = time.time() + timeout
+        end = self.persistent and END_OF_OUTPUT + '\n' or None
+        while True:
+            wait = self.POLL_INTERVAL
+            if timeout is not None:
+                wait = min(wait, deadline - time.time())
+                if wait <= 0:
+                    raise SolverTimeout('no result after %s seconds' % timeout)
+            if cancel is not None and cancel.isSet():
+                raise SolverCancelled('cancelled')
+            try:
+                line = self.lines.get(True, wait)
+            except Empty:
+                continue
+            if line is None:
+                if self.persistent:
+                    raise SolverError('%s: unexpected exit' % self.command[0])
+                return
+            if line == end:
+                return
+            yield line
+
+
+# ************************************************************************
+# * a pool of solver processes
+# ************************************************************************
+
+class SolverPool:
+    def __init__(self, command, size=1, persistent=True):
+        self.command = command
+        self.persistent = persistent
+        self.free = [SolverProcess(command, persistent) for i in range(size)]
+        self.busy = []
+        self.cond = threading.Condition()
+
+    def _acquire(self):
+        self.cond.acquire()
+        try:
+            while not self.free:
+                self.cond.wait()
+            p = self.free.pop()
+            self.busy.append(p)
+            return p
+        finally:
+            self.cond.release()
+
+    def _release(self, p):
+        self.cond.acquire()
+        try:
+            self.busy.remove(p)
+            self.free.append(p)
+            self.cond.notify()
+        finally:
+            self.cond.release()
+
+    def solve(self, args, board, timeout=None, cancel=None):
+        # generator: see SolverProcess.solve()
+        p = self._acquire()
+        try:
+            for line in p.solve(args, board, timeout, cancel):
+                yield line
+        finally:
+            self._release(p)
+
+    def close(self):
+        self.cond.acquire()
+        try:
+            for p in self.free + self.busy:
+                p.kill()
+        finally:
+            self.cond.release()
+
+
+# ************************************************************************
+# * shared pools, one per solver command
+# ************************************************************************
+
+_pools = {}
+
+def workerCommand(solver_command):
+    # None if solverworker.py can't be run (e.g. py2exe)
+    if getattr(sys, 'frozen', False):
+        return None
+    import pysollib.solverworker
+    script = os.path.splitext(pysollib.solverworker.__file__)[0] + '.py'
+    if not os.path.exists(script):
+        return None
+    return [sys.executable, '-u', script, solver_command]
+
+
+def getSolverPool(solver_command, size=1):
+    pool = _pools.get(solver_command)
+    if pool is None:
+        command = workerCommand(solver_command)
+        if command is None:
+            pool = SolverPool([solver_command], size, persistent=False)
+        else:
+            pool = SolverPool(command, size)
+        _pools[solver_command] = pool
+    return pool
+
+
+def closeSolverPools():
+    for pool in _pools.values():
+        pool.close()
+    _pools.clear()
+
+atexit.register(closeSolverPools)
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+##---------------------------------------------------------------------------##
+##
+## Copyright (C) 1998-2003 Markus Franz Xaver Johannes Oberhumer
+## Copyright (C) 2003 Mt. Hood Playing Card Co.
+## Copyright (C) 2005-2009 Skomoroh
+##
+## This program is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## This program is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with this program.  If not, see <http://www.gnu.org/licenses/>.
+##
+##---------------------------------------------------------------------------##
+
+# ************************************************************************
+# * Solver worker, run by solverpool.SolverProcess:
+# *
+# *   python solverworker.py fc-solve
+# *
+# * Reads requests from stdin: a JSON list of solver arguments on one
+# * line, then the board, then END_OF_BOARD. For every request the
+# * solver is run (without a shell) and its output is copied to stdout
+# * line by line, followed by END_OF_OUTPUT.
+# *
+# * This module must not import anything from pysollib: it is run as
+# * a script.
+# ************************************************************************
+
+# imports
+import sys, os
+import subprocess
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
+END_OF_BOARD = '-=-=-=-= end of board =-=-=-=-'
+END_OF_OUTPUT = '-=-=-=-= end of output =-=-=-=-'
+
+
+def solve(solver_command, args, board, out):
+    kw = {'stdin': subprocess.PIPE,
+          'stdout': subprocess.PIPE}
+    if os.name != 'nt':
+        kw['close_fds'] = True
+    try:
+        p = subprocess.Popen([solver_command] + args, **kw)
+    except OSError, err:
+        print >> sys.stderr, '%s: %s' % (solver_command, err)
+        return
+    p.stdin.write(board)
+    p.stdin.close()
+    for line in iter(p.stdout.readline, ''):
+        if not line.endswith('\n'):
+            line += '\n'
+        out.write(line)
+        out.flush()
+    p.stdout.close()
+    p.wait()
+
+
+def main(argv):
+    if len(argv) != 2:
+        print >> sys.stderr, 'usage: %s SOLVER' % argv[0]
+        return 2
+    solver_command = argv[1]
+    pin, pout = sys.stdin, sys.stdout
+    while True:
+        line = pin.readline()
+        if not line:
+            break                       # parent closed the pipe
+        args = json.loads(line)
+        board = []
+        while True:
+            line = pin.readline()
+            if not line or line.rstrip('\n') == END_OF_BOARD:
+                break
+            board.append(line)
+        if not line:
+            break
+        solve(solver_command, args, ''.join(board), pout)
+        pout.write(END_OF_OUTPUT + '\n')
+        pout.flush()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+##---------------------------------------------------------------------------##
+##
+## Copyright (C) 1998-2003 Markus Franz Xaver Johannes Oberhumer
+## Copyright (C) 2003 Mt. Hood Playing Card Co.
+## Copyright (C) 2005-2009 Skomoroh
+##
+## This program is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## This program is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with this program.  If not, see <http://www.gnu.org/licenses/>.
+##
+##---------------------------------------------------------------------------##
+
+# ************************************************************************
+# * Start-up profile.
+# *
+# * The start-up is split into phases (see init.py, main.py and
+# * Application.mainloop); STARTUP_PROFILE.phase(name) ends the current
+# * phase and begins the next one, so the phases add up to the whole
+# * start-up. The wall and CPU times of the phases are always taken, as
+# * they cost next to nothing. With PYSOL_PROFILE_STARTUP in the
+# * environment or the --profile-startup option the number of new
+# * objects (the change in the objects tracked by the garbage collector)
+# * is counted as well, and a report is printed when the first game is
+# * drawn. If PYSOL_PROFILE_STARTUP is a file name (not "1") the report
+# * is written there too, in JSON.
+# ************************************************************************
+
+__all__ = ['STARTUP_PROFILE',
+           'StartupProfile',
+           ]
+
+# imports
+import os
+import sys
+import gc
+import time
+
+try:
+    import json
+except ImportError:
+    json = None
+
+
+# ************************************************************************
+# *
+# ************************************************************************
+
+class StartupProfile:
+    def __init__(self):
+        self.phases = []            # [name, wall, cpu, objects]
+        self.running = True
+        self.enabled = False
+        self.filename = None
+        self.current = None
+        self._start = None
+
+    def enable(self, filename=None):
+        self.enabled = True
+        if filename:
+            self.filename = filename
+
+    def _now(self):
+        t = os.times()
+        objects = None
+        if self.enabled:
+            objects = len(gc.get_objects())
+        return time.time(), t[0] + t[1], objects
+
+    def phase(self, name):
+        if not self.running:
+            return
+        now = self._now()
+        if self.current is not None:
+            self._add(self.current, self._start, now)
+        self.current, self._start = name, self._now()
+
+    def _add(self, name, start, end):
+        wall, cpu = end[0] - start[0], end[1] - start[1]
+        objects = None
+        if start[2] is not None and end[2] is not None:
+            objects = end[2] - start[2]
+        for p in self.phases:
+            # a phase may be entered more than once
+            if p[0] == name:
+                p[1] += wall
+                p[2] += cpu
+                if objects is not None:
+                    p[3] = (p[3] or 0) + objects
+                return
+        self.phases.append([name, wall, cpu, objects])
+
+    def finish(self):
+        if not self.running:
+            return
+        self.phase(None)
+        self.running = False
+        if self.enabled:
+            print >> sys.stderr, self.getReport()
+            if self.filename:
+                self.writeReport(self.filename)
+
+    def getTotal(self):
+        wall = sum([p[1] for p in self.phases])
+        cpu = sum([p[2] for p in self.phases])
+        return wall, cpu
+
+    def getReport(self):
+        lines = ['PySol start-up profile',
+                 '%-16s %8s %8s %9s' % ('phase', 'wall', 'cpu', 'objects')]
+        for name, wall, cpu, objects in self.phases:
+            if objects is None:
+                objects = '-'
+            else:
+                objects = '%+d' % objects
+            lines.append('%-16s %8.3f %8.3f %9s' % (name, wall, cpu, objects))
+        lines.append('%-16s %8.3f %8.3f' % (('total',) + self.getTotal()))
+        return '\n'.join(lines)
+
+    def writeReport(self, filename):
+        phases = [dict(phase=p[0], wall=p[1], cpu=p[2], objects=p[3])
+                  for p in self.phases]
+        wall, cpu = self.getTotal()
+        try:
+            f = open(filename, 'w')
+            try:
+                if json:
+                    json.dump(dict(phases=phases, wall=wall, cpu=cpu), f,
+                              indent=1)
+                else:
+                    f.write(self.getReport() + '\n')
+            finally:
+                f.close()
+        except EnvironmentError, ex:
+            print >> sys.stderr, 'cannot write the start-up profile:', ex
+
+
+STARTUP_PROFILE = StartupProfile()
+
+if os.environ.get('PYSOL_PROFILE_STARTUP'):
+    filename = os.environ['PYSOL_PROFILE_STARTUP']
+    if filename == '1':
+        filename = None
+    STARTUP_PROFILE.enable(filename)
@@ -23,7 +23,12 @@
 
 
 # imports
+import csv
 import time
+try:
+    import json
+except ImportError:
+    json = None
 
 # PySol imports
 from pysollib.mfxutil import format_time
@@ -31,6 +36,26 @@ from pysollib.gamedb import GI
 from pysollib.mygettext import _, n_
 
 
+# the log of a game is a tuple (gameid, game number, status, start time,
+# elapsed time, version tuple, score, casino score, game version); logs of
+# older versions are shorter
+def normLog(log):
+    # return the log padded to 9 values or None if it is invalid
+    if not isinstance(log, tuple):
+        return None
+    if len(log) == 5:
+        log = log + ("", None, None, 1)
+    elif len(log) == 7:
+        log = log + (None, 1)
+    elif len(log) == 8:
+        log = log + (1,)
+    if len(log) < 8:
+        return None
+    if not isinstance(log[0], int):
+        return None
+    return log
+
+
 # ************************************************************************
 # *
 # ************************************************************************
@@ -46,7 +71,7 @@ class PysolStatsFormatter:
                 _('Moves'),
                 _("% won"))
 
-    def getStatResults(self, player, sort_by='name'):
+    def getGamesIdSorted(self, player, sort_by='name'):
         app = self.app
         #
         sort_functions = {
@@ -59,10 +84,15 @@ class PysolStatsFormatter:
             'percent': app.getGamesIdSortedByPercent,
             }
         sort_func = sort_functions[sort_by]
-        g = sort_func(player=player)
+        return sort_func(player=player)
+
+    def getStatResults(self, player, sort_by='name'):
+        app = self.app
+        g = self.getGamesIdSorted(player, sort_by)
+        table = app.stats.getAggregates(player)
         t_won, tlost, tgames, ttime, tmoves = 0, 0, 0, 0, 0
         for id in g:
-            won, lost, time, moves = app.stats.getFullStats(player, id)
+            won, lost, time, moves = table.get(id, (0, 0, 0, 0))
             if won > 0 or lost > 0 or id == app.game.id:
                 # yield only played games
                 name = app.getGameTitleName(id)
@@ -113,19 +143,10 @@ class PysolStatsFormatter:
     def getLogResults(self, player, prev_games):
         t_won, tlost = 0, 0
         for pg in prev_games:
-            if not isinstance(pg, tuple):
-                continue
-            if len(pg) == 5:
-                pg = pg + ("", None, None, 1)
-            elif len(pg) == 7:
-                pg = pg + (None, 1)
-            elif len(pg) == 8:
-                pg = pg + (1,)
-            if len(pg) < 8:
+            pg = normLog(pg)
+            if pg is None:
                 continue
             gameid = pg[0]
-            if not isinstance(gameid, int):
-                continue
             gi = self.app.getGameInfo(gameid)
             if not gi:
                 gi = self.app.getGameInfo(GI.PROTECTED_GAMES.get(gameid))
@@ -237,6 +258,140 @@ class FileStatsFormatter(PysolStatsFormatter):
         return self.writeLog(player, header, prev_games)
 
 
+# ************************************************************************
+# * Export of the statistics and the game logs in CSV or JSON Lines,
+# * one row per game; the exported logs can be merged into the
+# * statistics of another installation (see readLogs() and
+# * Statistics.mergeGames())
+# ************************************************************************
+
+LOG_FIELDS = ('player', 'gameid', 'gamenumber', 'status', 'start_time',
+              'elapsed_time', 'version', 'score', 'score_casino',
+              'game_version')
+STATS_FIELDS = ('player', 'gameid', 'name', 'played', 'won', 'lost',
+                'time', 'moves')
+
+
+def _version2str(version):
+    if isinstance(version, tuple):
+        return '.'.join([str(i) for i in version])
+    return version
+
+def _str2version(s):
+    if not s:
+        return ""
+    return tuple([int(i) for i in s.split('.')])
+
+def _csvValue(value):
+    if value is None:
+        return ''
+    if isinstance(value, float):
+        return repr(value)
+    if isinstance(value, unicode):
+        return value.encode('utf-8')
+    return value
+
+def _csvNumber(s):
+    if s == '':
+        return None
+    try:
+        return int(s)
+    except ValueError:
+        return float(s)
+
+
+class ExportStatsFormatter(PysolStatsFormatter):
+    # format: 'csv' or 'jsonl'; the rows are written as they are read
+    # from the statistics
+
+    def __init__(self, app, file, format='csv'):
+        assert format in ('csv', 'jsonl')
+        if format == 'jsonl' and json is None:
+            raise ValueError('JSON Lines needs the json module')
+        self.app = app
+        self.file = file
+        self.format = format
+        self.fields = None
+        if format == 'csv':
+            self.csv_writer = csv.writer(file)
+
+    def writeRow(self, fields, values):
+        if self.format == 'csv':
+            if fields != self.fields:
+                self.csv_writer.writerow(fields)
+            self.csv_writer.writerow([_csvValue(v) for v in values])
+        else:
+            self.file.write(json.dumps(dict(zip(fields, values)),
+                                       sort_keys=True) + '\n')
+        self.fields = fields
+
+    def writeStats(self, player, sort_by='id'):
+        # sort_by: 'id' or a sort_by of getStatResults()
+        table = self.app.stats.getAggregates(player)
+        if sort_by == 'id':
+            ids = sorted(table)
+        else:
+            ids = [id for id in self.getGamesIdSorted(player, sort_by)
+                   if id in table]
+        n = 0
+        for id in ids:
+            won, lost, time, moves = table[id]
+            gi = self.app.getGameInfo(id)
+            name = gi and gi.en_name
+            self.writeRow(STATS_FIELDS,
+                          (player, id, name, won+lost, won, lost, time, moves))
+            n += 1
+        return n
+
+    def writeLog(self, player, prev_games):
+        n = 0
+        for log in prev_games or ():
+            log = normLog(log)
+            if log is None:
+                continue
+            log = log[:5] + (_version2str(log[5]),) + log[6:9]
+            self.writeRow(LOG_FIELDS, (player,) + log)
+            n += 1
+        return n
+
+    def writeFullLog(self, player):
+        return self.writeLog(player, self.app.stats.prev_games.get(player))
+
+    def writeSessionLog(self, player):
+        return self.writeLog(player, self.app.stats.session_games.get(player))
+
+
+def readLogs(file):
+    # read logs written by ExportStatsFormatter.writeFullLog() and
+    # yield (player, log)
+    line = file.readline()
+    if line.startswith('{'):
+        if json is None:
+            raise ValueError('JSON Lines needs the json module')
+        while line:
+            if line.strip():
+                row = json.loads(line)
+                yield row['player'], (
+                    row['gameid'], str(row['gamenumber']), row['status'],
+                    row['start_time'], row['elapsed_time'],
+                    _str2version(row['version']), row['score'],
+                    row['score_casino'], row['game_version'])
+            line = file.readline()
+        return
+    header = csv.reader([line]).next()
+    if tuple(header) != LOG_FIELDS:
+        raise ValueError('Not a game log')
+    for row in csv.reader(file):
+        if not row:
+            continue
+        player, gameid, gamenumber, status, start_time, elapsed_time, \
+                version, score, score_casino, game_version = row
+        yield player.decode('utf-8'), (
+            int(gameid), gamenumber, int(status), float(start_time),
+            float(elapsed_time), _str2version(version), _csvNumber(score),
+            _csvNumber(score_casino), int(game_version))
+
+
 # ************************************************************************
 # *
 # ************************************************************************
@@ -249,25 +404,16 @@ class ProgressionFormatter:
         self.all_results = all_results
         game_results = {}
         self.game_results = game_results
-        games = app.stats.prev_games.get(player)
-        if not games:
-            return
-        for g in games:
-            id = g[0]
-            status = g[2]
-            start_time = g[3]
-            t = time.localtime(start_time)[:3]
-            if t not in all_results:
-                all_results[t] = [0,0]
-            all_results[t][0] += 1
-            if status > 0:
-                all_results[t][1] += 1
+        daily = app.stats.getDailyResults(player)
+        for id, days in daily.items():
+            for t, (played, won) in days.items():
+                if t not in all_results:
+                    all_results[t] = [0,0]
+                all_results[t][0] += played
+                all_results[t][1] += won
             if id == gameid:
-                if t not in game_results:
-                    game_results[t] = [0,0]
-                game_results[t][0] += 1
-                if status > 0:
-                    game_results[t][1] += 1
+                for t, r in days.items():
+                    game_results[t] = r[:]
         ##from pprint import pprint; pprint(all_results)
 
     def norm_time(self, t):
@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+##---------------------------------------------------------------------------##
+##
+## Copyright (C) 1998-2003 Markus Franz Xaver Johannes Oberhumer
+## Copyright (C) 2003 Mt. Hood Playing Card Co.
+## Copyright (C) 2005-2009 Skomoroh
+##
+## This program is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## This program is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with this program.  If not, see <http://www.gnu.org/licenses/>.
+##
+##---------------------------------------------------------------------------##
+
+# ************************************************************************
+# * Statistics log.
+# *
+# * The lists of finished games (Statistics.prev_games and
+# * all_prev_games) grow with every game played, so they are not
+# * pickled with the rest of the statistics. Instead each game is
+# * appended to this log when it ends. The records are marshal'ed
+# * tuples in frames (see journal.py):
+# *
+# *   ('g', player, log)       a finished game
+# *   ('p', player, log)       a game in prev_games only
+# *   ('a', player, log)       a game in all_prev_games only
+# *   ('r', player, gameid)    resetStats(player, gameid)
+# *
+# * The log is read when the games are first needed (see
+# * Statistics.__getattr__), not at start-up. A log with resets or a
+# * damaged end is compacted when it is read.
+# ************************************************************************
+
+__all__ = ['StatisticsLog',
+           ]
+
+# imports
+import os
+import marshal
+
+# PySol imports
+from pysollib.journal import packFrame, unpackFrames
+
+
+MAGIC = 'PySolFC-stats\x1a'
+
+
+# ************************************************************************
+# *
+# ************************************************************************
+
+class StatisticsLog:
+    def __init__(self, filename):
+        self.filename = filename
+        self.compact = False            # see read()
+
+    def exists(self):
+        return os.path.exists(self.filename)
+
+    # return prev_games and all_prev_games; sets compact if the log
+    # has records that write() would leave out
+    def read(self):
+        prev_games, all_prev_games = {}, {}
+        f = open(self.filename, 'rb')
+        try:
+            data = f.read()
+        finally:
+            f.close()
+        if data[:len(MAGIC)] != MAGIC:
+            raise ValueError('Not a statistics log')
+        frames = unpackFrames(data, len(MAGIC))
+        size = len(MAGIC) + len(frames) * len(packFrame(''))
+        self.compact = False
+        for frame in frames:
+            size += len(frame)
+            kind, player, value = marshal.loads(frame)
+            if kind == 'r':
+                self.compact = True
+                games = prev_games.get(player)
+                if games is None:
+                    continue
+                if value == 0:
+                    del prev_games[player]
+                else:
+                    prev_games[player] = [g for g in games if g[0] != value]
+                continue
+            if kind in ('g', 'p'):
+                prev_games.setdefault(player, []).append(value)
+            if kind in ('g', 'a'):
+                all_prev_games.setdefault(player, []).append(value)
+        if size != len(data):
+            # an incomplete write; later appends would be lost
+            self.compact = True
+        return prev_games, all_prev_games
+
+    # write a new log (used for statistics of older versions and to
+    # compact the log)
+    def write(self, prev_games, all_prev_games):
+        tmp = self.filename + '.tmp'
+        f = open(tmp, 'wb')
+        try:
+            f.write(MAGIC)
+            for player in set(prev_games) | set(all_prev_games):
+                for kind, log in self._getRecords(prev_games.get(player, []),
+                                                  all_prev_games.get(player,
+                                                                     [])):
+                    f.write(packFrame(marshal.dumps((kind, player, log), 2)))
+        finally:
+            f.close()
+        if os.name == 'nt' and os.path.exists(self.filename):
+            os.remove(self.filename)
+        os.rename(tmp, self.filename)
+
+    def _getRecords(self, prev_games, all_prev_games):
+        # one 'g' record for a game in both lists
+        prev = {}
+        for log in prev_games:
+            prev[log] = prev.get(log, 0) + 1
+        records = []
+        for log in all_prev_games:
+            if prev.get(log):
+                prev[log] -= 1
+                records.append(('g', log))
+            else:
+                records.append(('a', log))
+        for log in prev_games:
+            if prev.get(log):
+                prev[log] -= 1
+                records.append(('p', log))
+        return records
+
+    def append(self, kind, player, value):
+        f = open(self.filename, 'ab')
+        try:
+            f.write(packFrame(marshal.dumps((kind, player, value), 2)))
+        finally:
+            f.close()
@@ -66,7 +66,7 @@ class _HideableCard(AbstractCard):
 class _OneImageCard(_HideableCard):
     def __init__(self, id, deck, suit, rank, game, x=0, y=0):
         _HideableCard.__init__(self, id, deck, suit, rank, game, x=x, y=y)
-        self._face_image = game.getCardFaceImage(deck, suit, rank)
+        self._face_image = None        # see getFaceImage()
         self._back_image = game.getCardBackImage(deck, suit, rank)
         self._shade_image = game.getCardShadeImage()
         self._active_image = self._back_image
@@ -79,9 +79,18 @@ class _OneImageCard(_HideableCard):
             self.item.config(image=image)
             self._active_image = image
 
+    def getFaceImage(self):
+        # the face image is got when the card is first shown face up
+        # (the images of a cardset are loaded on first use)
+        if self._face_image is None:
+            self._face_image = self.game.getCardFaceImage(self.deck,
+                                                          self.suit,
+                                                          self.rank)
+        return self._face_image
+
     def showFace(self, unhide=1):
         if not self.face_up:
-            self._setImage(image=self._face_image)
+            self._setImage(image=self.getFaceImage())
             self.tkraise(unhide)
             self.face_up = 1
 
@@ -109,11 +118,11 @@ class _OneImageCard(_HideableCard):
 
     # for resize
     def update(self, id, deck, suit, rank, game):
-        self._face_image = game.getCardFaceImage(deck, suit, rank)
+        self._face_image = None
         self._back_image = game.getCardBackImage(deck, suit, rank)
         self._shade_image = game.getCardShadeImage()
         if self.face_up:
-            img = self._face_image
+            img = self.getFaceImage()
         else:
             img = self._back_image
         self.item.config(image=img)
@@ -137,7 +146,7 @@ class _OneImageCardWithHideByConfig(_OneImageCard):
         if self.hide_stack is None:
             return 0
         if self.face_up:
-            self._setImage(image=self._face_image)
+            self._setImage(image=self.getFaceImage())
         else:
             self._setImage(image=self._back_image)
         self.hide_stack = None
@@ -150,7 +159,7 @@ class _OneImageCardWithHideByConfig(_OneImageCard):
     def showFace(self, unhide=1):
         if not self.face_up:
             if unhide:
-                self._setImage(image=self._face_image)
+                self._setImage(image=self.getFaceImage())
             self.item.tkraise()
             self.face_up = 1
 
@@ -1,10 +1,36 @@
 import Tkinter
+import threading
+from Queue import Queue, Empty
 
 from pysollib.mygettext import _, n_
+from pysollib.mfxutil import Struct
 from pysollib.ui.tktile.tkconst import EVENT_HANDLED
+from pysollib.ui.tktile.tkutil import after, after_cancel
 from pysollib.settings import TITLE
 
+
+# the solver runs in a thread and must not touch Tk; the progress is
+# passed to the dialog through a queue (see BaseSolverDialog.pollSolving)
+class SolverProgress:
+    def __init__(self):
+        self.queue = Queue()
+
+    def setText(self, **kw):
+        self.queue.put(kw)
+
+    def getText(self):
+        kw = {}
+        while True:
+            try:
+                kw.update(self.queue.get_nowait())
+            except Empty:
+                return kw
+
+
 class BaseSolverDialog:
+    # ms between two looks at the solver thread
+    POLL_INTERVAL = 100
+
     def __init__(self, parent, app, **kw):
         self.parent = parent
         self.app = app
@@ -22,6 +48,8 @@ class BaseSolverDialog:
             ##'"Soft" DFS':           'soft-dfs',
             }
         self.games = {}                 # key: gamename; value: gameid
+        self.solving = None             # a running solver thread
+        self.solving_timer = None
 
         #
         frame = self._calcToolkit().Frame(top_frame)
@@ -109,7 +137,10 @@ class BaseSolverDialog:
 
     def mDone(self, button):
         if button == 0:
-            self.startSolving()
+            if self.solving:
+                self.stopSolving()
+            else:
+                self.startSolving()
         elif button == 1:
             self.startPlay()
         elif button == 2:
@@ -117,6 +148,10 @@ class BaseSolverDialog:
         elif button == 3:
             global solver_dialog
             solver_dialog = None
+            self.stopSolving()
+            after_cancel(self.solving_timer)
+            self.solving_timer = None
+            self.solving = None
             self.destroy()
         return EVENT_HANDLED
 
@@ -140,20 +175,59 @@ class BaseSolverDialog:
         self.top.update_idletasks()
 
     def reset(self):
+        # the position has changed
+        self.stopSolving()
         self.play_button.config(state='disabled')
 
     def startSolving(self):
-        from gettext import ungettext
-
         self._reset()
         game = self.app.game
-        solver = game.Solver_Class(game, self) # create solver instance
-        game.solver = solver
+        progress = SolverProgress()
+        solver = game.Solver_Class(game, progress) # create solver instance
+        cancel = threading.Event()
         preset = self.preset_var.get()
         max_iters = self.max_iters_var.get()
-        progress = self.progress_var.get()
-        solver.config(preset=preset, max_iters=max_iters, progress=progress)
-        solver.computeHints()
+        show_progress = self.progress_var.get()
+        solver.config(preset=preset, max_iters=max_iters,
+                      progress=show_progress, cancel=cancel)
+        # the stacks are read here, the thread only gets the board
+        board = solver.calcBoardString()
+        thread = threading.Thread(target=solver.computeHints, args=(board,))
+        thread.setDaemon(True)
+        self.solving = Struct(game=game, solver=solver, progress=progress,
+                              cancel=cancel, thread=thread)
+        thread.start()
+        self.setStartButton(_('&Stop'))
+        self.result_label['text'] = _('Solving...')
+        self.solving_timer = after(self.top, self.POLL_INTERVAL,
+                                   self.pollSolving)
+
+    def stopSolving(self):
+        if self.solving:
+            self.solving.cancel.set()
+
+    def pollSolving(self):
+        from gettext import ungettext
+
+        self.solving_timer = None
+        solving = self.solving
+        if not solving:
+            return
+        kw = solving.progress.getText()
+        if kw:
+            self.setText(**kw)
+        if solving.thread.isAlive():
+            self.solving_timer = after(self.top, self.POLL_INTERVAL,
+                                       self.pollSolving)
+            return
+        self.solving = None
+        self.setStartButton(_('&Start'))
+        solver = solving.solver
+        if solving.cancel.isSet() or solving.game is not self.app.game:
+            self.result_label['text'] = _('Solving cancelled.')
+            self.play_button.config(state='disabled')
+            return
+        solving.game.solver = solver
         hints_len = len(solver.hints)-1
         if hints_len > 0:
             t = ungettext('This game is solveable in %d move.',
@@ -165,6 +239,11 @@ class BaseSolverDialog:
             self.result_label['text'] = (_('I could not solve this game.') if solver.solver_state == 'unsolved' else _('Iterations count exceeded (Intractable)'))
             self.play_button.config(state='disabled')
 
+    def setStartButton(self, label):
+        # like the button strings, '&' marks the key accelerator
+        self.start_button.config(text=label.replace('&', ''),
+                                 underline=label.find('&'))
+
     def startPlay(self):
         self.play_button.config(state='disabled')
         self.start_button.focus()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+##---------------------------------------------------------------------------##
+##
+## Copyright (C) 1998-2003 Markus Franz Xaver Johannes Oberhumer
+## Copyright (C) 2003 Mt. Hood Playing Card Co.
+## Copyright (C) 2005-2009 Skomoroh
+##
+## This program is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## This program is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with this program.  If not, see <http://www.gnu.org/licenses/>.
+##
+##---------------------------------------------------------------------------##
+
+# ************************************************************************
+# * Zobrist hashing of positions.
+# *
+# * Every (stack, position in stack, suit, rank, face up) tuple has a
+# * fixed pseudo random 63-bit key; the hash of a position is the XOR
+# * of the keys of all cards. The atomic moves (see move.py) update it
+# * when cards are added, removed or flipped, so Game.getSnapshot()
+# * doesn't have to look at every card after each move.
+# *
+# * The keys don't depend on the session, so snapshots can be saved.
+# * A stack whose length doesn't match what was hashed (cards moved
+# * without an atomic move) is hashed again from scratch.
+# ************************************************************************
+
+__all__ = ['ZobristHash']
+
+MASK64 = 0xFFFFFFFFFFFFFFFFL
+
+def _mix(x):
+    # splitmix64 finalizer
+    x = (x + 0x9E3779B97F4A7C15L) & MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9L) & MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EBL) & MASK64
+    return int((x ^ (x >> 31)) & 0x7FFFFFFFFFFFFFFFL)
+
+
+class ZobristHash:
+    def __init__(self, nstacks):
+        self.keys = {}
+        self.hashes = [0] * nstacks     # hash of each stack
+        self.lengths = [0] * nstacks    # number of cards hashed
+        self.value = 0                  # XOR of all hashes
+
+    def _key(self, stack_id, pos, card, face_up):
+        k = ((((stack_id << 12 | pos) << 8 | card.suit) << 8 | card.rank)
+             << 1 | (face_up and 1 or 0))
+        v = self.keys.get(k)
+        if v is None:
+            v = self.keys[k] = _mix(k)
+        return v
+
+    def _hashStack(self, stack):
+        id, h = stack.id, 0
+        key = self._key
+        for pos, card in enumerate(stack.cards):
+            h ^= key(id, pos, card, card.face_up)
+        return h
+
+    def update(self, stack):
+        # hash a stack from scratch
+        h = self._hashStack(stack)
+        self.value ^= self.hashes[stack.id] ^ h
+        self.hashes[stack.id] = h
+        self.lengths[stack.id] = len(stack.cards)
+
+    def reset(self, stacks):
+        for stack in stacks:
+            self.update(stack)
+
+    def add(self, stack, ncards=1):
+        # call after ncards were put on top of the stack
+        id, cards = stack.id, stack.cards
+        n = len(cards)
+        if self.lengths[id] != n - ncards:
+            self.update(stack)
+            return
+        h = 0
+        for pos in range(n - ncards, n):
+            card = cards[pos]
+            h ^= self._key(id, pos, card, card.face_up)
+        self.hashes[id] ^= h
+        self.value ^= h
+        self.lengths[id] = n
+
+    def remove(self, stack, ncards=1):
+        # call before ncards are removed from the top of the stack
+        id, cards = stack.id, stack.cards
+        n = len(cards)
+        if self.lengths[id] != n:
+            self.update(stack)
+        h = 0
+        if n == ncards:
+            h = self.hashes[id]         # an empty stack hashes to 0
+        else:
+            for pos in range(n - ncards, n):
+                card = cards[pos]
+                h ^= self._key(id, pos, card, card.face_up)
+        self.hashes[id] ^= h
+        self.value ^= h
+        self.lengths[id] = n - ncards
+
+    def flip(self, stack):
+        # call after the top card of the stack was flipped
+        id, cards = stack.id, stack.cards
+        n = len(cards)
+        if self.lengths[id] != n:
+            self.update(stack)
+            return
+        card = cards[-1]
+        h = (self._key(id, n-1, card, card.face_up) ^
+             self._key(id, n-1, card, not card.face_up))
+        self.hashes[id] ^= h
+        self.value ^= h
+
+    def getValue(self, stacks):
+        lengths = self.lengths
+        for stack in stacks:
+            if len(stack.cards) != lengths[stack.id]:
+                self.update(stack)
+        return self.value
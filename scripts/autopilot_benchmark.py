@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+#
+# Autopilot benchmark: plays the same deals of every registered game
+# with the built-in hint classes and writes a JSON report (win rate,
+# average demo moves, hint time per move and wall time per game).
+# Reports of two revisions can be compared with --compare:
+#
+#   scripts/autopilot_benchmark.py -o old.json
+#   (change something)
+#   scripts/autopilot_benchmark.py -o new.json --compare old.json
+#
+
+import sys, os, time
+import getopt
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
+pysollib_path = os.path.join(sys.path[0], '..')
+sys.path[0] = os.path.normpath(pysollib_path)
+
+from pysollib.autoplay import parseSeeds, benchmarkGames, compareReports
+from pysollib.gamedb import GAME_DB
+from pysollib.headless import HeadlessApplication
+
+# game numbers >= 32000 use the PySol random generator for all games
+DEFAULT_SEEDS = '100001-100005'
+
+USAGE = '''Usage: %s [OPTIONS]
+  -g    --games=IDS            game ids to play (default: all games)
+  -s    --seeds=SEEDS          game numbers to play (default: %s)
+  -j    --jobs=N               number of worker processes
+  -l    --level=LEVEL          hint level: 2 (default) or 3 (use solver)
+  -o    --output=FILE          write the report to FILE (default: stdout)
+  -c    --compare=FILE         compare with an older report
+        --french-only
+  -h    --help                 display this help and exit
+
+  IDS, SEEDS - e.g. 1-1000 or 1,5,10-20
+'''
+
+
+def main(argv):
+    try:
+        optlist, args = getopt.getopt(argv[1:], "g:s:j:l:o:c:h",
+                                      ["games=", "seeds=", "jobs=",
+                                       "level=", "output=", "compare=",
+                                       "french-only", "help"])
+    except getopt.GetoptError, err:
+        print >> sys.stderr, err
+        return 2
+    import multiprocessing
+    games, seeds = None, DEFAULT_SEEDS
+    jobs, level = multiprocessing.cpu_count(), 2
+    output, compare, french_only = None, None, False
+    for o, a in optlist:
+        if o in ("-h", "--help"):
+            print USAGE % (argv[0], DEFAULT_SEEDS)
+            return 0
+        elif o in ("-g", "--games"):
+            games = a
+        elif o in ("-s", "--seeds"):
+            seeds = a
+        elif o in ("-j", "--jobs"):
+            jobs = int(a)
+        elif o in ("-l", "--level"):
+            level = int(a)
+        elif o in ("-o", "--output"):
+            output = a
+        elif o in ("-c", "--compare"):
+            compare = a
+        elif o == "--french-only":
+            french_only = True
+    seeds = parseSeeds(seeds)
+
+    # register the games
+    HeadlessApplication(french_only=french_only)
+    gameids = GAME_DB.getGamesIdSortedById()
+    if games is not None:
+        wanted = parseSeeds(games)
+        gameids = [id for id in gameids if id in wanted]
+
+    t0 = time.time()
+    report = {
+        'level': level,
+        'seeds': seeds,
+        'games': [],
+        }
+    for r in benchmarkGames(gameids, seeds, jobs, level, french_only):
+        report['games'].append(r)
+        print >> sys.stderr, '%5d %-40s %3d/%d won %8.2f ms/move' % (
+            r['gameid'], r['name'][:40].encode('utf-8'), r['won'],
+            r['deals'], r['hint_time_per_move'] * 1000)
+    report['wall_time'] = round(time.time() - t0, 3)
+    text = json.dumps(report, sort_keys=True, indent=1,
+                      separators=(',', ': '))
+    if output:
+        f = open(output, 'w')
+        f.write(text + '\n')
+        f.close()
+    else:
+        print text
+
+    if compare:
+        old = json.load(open(compare))
+        res = compareReports(old, report)
+        for line in res:
+            print >> sys.stderr, line.encode('utf-8')
+        if res:
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -4,6 +4,7 @@ for module_name in [
 'pysollib.acard',
 'pysollib.actions',
 'pysollib.app',
+'pysollib.autoplay',
 'pysollib.configobj.configobj',
 'pysollib.configobj.validate',
 'pysollib.customgame',
@@ -91,10 +92,12 @@ for module_name in [
 'pysollib.games.windmill',
 'pysollib.games.yukon',
 'pysollib.games.zodiac',
+'pysollib.headless',
 'pysollib.help',
 'pysollib.hint',
 'pysollib.images',
 'pysollib.init',
+'pysollib.journal',
 'pysollib.layout',
 'pysollib.macosx.appSupport',
 'pysollib.main',
@@ -127,12 +130,28 @@ for module_name in [
 'pysollib.pysolgtk.tkwidget',
 'pysollib.pysolgtk.tkwrap',
 'pysollib.pysolgtk.toolbar',
+'pysollib.pysolnull.card',
+'pysollib.pysolnull.findcarddialog',
+'pysollib.pysolnull.solverdialog',
+'pysollib.pysolnull.tkcanvas',
+'pysollib.pysolnull.tkconst',
+'pysollib.pysolnull.tkhtml',
+'pysollib.pysolnull.tkutil',
+'pysollib.pysolnull.tkwidget',
+'pysollib.pysolnull.tkwrap',
 'pysollib.pysolrandom',
 'pysollib.pysoltk',
 'pysollib.resource',
+'pysollib.savefile',
+'pysollib.savelibrary',
 'pysollib.settings',
+'pysollib.solvercache',
+'pysollib.solverpool',
+'pysollib.solverworker',
 'pysollib.stack',
+'pysollib.startupprofile',
 'pysollib.stats',
+'pysollib.statslog',
 'pysollib.tile.basetilemfxdialog',
 'pysollib.tile.colorsdialog',
 'pysollib.tile.edittextdialog',
@@ -196,6 +215,7 @@ for module_name in [
 'pysollib.winsystems.x11',
 'pysollib.wizardpresets',
 'pysollib.wizardutil',
+'pysollib.zobrist',
 ]:
     open(os.path.join(".", "tests", "individually-importing", "import_" + module_name + ".py"), 'w').write('''#!/usr/bin/env python
 import sys
@@ -70,7 +70,7 @@ kw = {
     'description'  : 'a Python solitaire game collection',
     'long_description' : long_description,
     'license'      : 'GPL',
-    'scripts'      : ['pysol.py'],
+    'scripts'      : ['pysol.py', 'pysol_autoplay.py'],
     'packages'     : ['pysollib',
                       'pysollib.configobj',
                       'pysollib.macosx',
@@ -78,6 +78,7 @@ kw = {
                       'pysollib.tk',
                       'pysollib.tile',
                       'pysollib.pysolgtk',
+                      'pysollib.pysolnull',
                       'pysollib.ui',
                       'pysollib.ui.tktile',
                       'pysollib.games',
@@ -0,0 +1,38 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+
+# Batch autoplay: seeds, game lookup and the worker pool.
+
+import sys
+
+sys.path.append("./tests/lib")
+from TAP.Simple import plan, ok
+
+sys.path.insert(0, ".")
+
+from pysollib.autoplay import parseSeeds, findGame, playDeals
+from pysollib.gamedb import GAME_DB
+
+plan(7)
+
+ok(parseSeeds('1-3,7') == [1, 2, 3, 7], 'parseSeeds: ranges and lists')
+try:
+    parseSeeds('5-1')
+except ValueError:
+    ok(1, 'parseSeeds: reversed range is an error')
+else:
+    ok(0, 'parseSeeds: reversed range is an error')
+
+def strip(records):
+    for r in records:
+        del r['elapsed'], r['hint_time']
+    return records
+
+serial = strip(list(playDeals(5, [1, 2, 3, 4], jobs=1, french_only=True)))
+ok(findGame(GAME_DB, 'relaxed freecell') == 5, 'findGame: case insensitive name')
+ok(findGame(GAME_DB, 'No Such Game') is None, 'findGame: unknown game')
+ok([r['seed'] for r in serial] == [1, 2, 3, 4], 'playDeals: one record per deal')
+ok(serial[0]['won'] and serial[0]['stuck'] is None, 'playDeals: deal #1 won')
+
+pooled = strip(list(playDeals(5, [1, 2, 3, 4], jobs=2, french_only=True)))
+ok(pooled == serial, 'playDeals: worker pool gives the same results')
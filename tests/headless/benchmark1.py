@@ -0,0 +1,31 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+
+# Autopilot benchmark: per game summaries and report comparison.
+
+import sys
+
+sys.path.append("./tests/lib")
+from TAP.Simple import plan, ok
+
+sys.path.insert(0, ".")
+
+from pysollib.autoplay import benchmarkGames, compareReports
+
+plan(5)
+
+games = list(benchmarkGames([5], [1, 2, 3], jobs=1, french_only=True))
+r = games[0]
+ok(r['gameid'] == 5 and r['deals'] == 3, 'benchmark: one summary per game')
+ok(r['won'] >= 1 and r['win_rate'] == round(r['won'] / 3.0, 4),
+   'benchmark: win rate')
+ok(r['avg_moves'] > 0 and r['hint_time_per_move'] > 0,
+   'benchmark: moves and hint time')
+
+old = {'games': [dict(r)]}
+ok(compareReports(old, {'games': [dict(r)]}) == [],
+   'compare: no changes')
+slow = dict(r, won=r['won'] - 1,
+            hint_time_per_move=r['hint_time_per_move'] * 10 + 0.001)
+ok(len(compareReports(old, {'games': [slow]})) == 2,
+   'compare: win rate change and slowdown are reported')
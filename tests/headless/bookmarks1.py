@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+
+# Bookmarks: a bookmark is a move index, going to it seeks in the move
+# history, and it survives changes of the history.
+
+import sys
+
+sys.path.append("./tests/lib")
+from TAP.Simple import plan, ok
+
+sys.path.insert(0, ".")
+
+from cStringIO import StringIO
+from pysollib.mfxutil import Pickler, Unpickler
+from pysollib.headless import HeadlessApplication
+from pysollib.pysolrandom import constructRandom
+from pysollib.autoplay import playDemo
+
+plan(12)
+
+app = HeadlessApplication()
+
+def getPosition(game):
+    return ([[(c.id, c.face_up) for c in s.cards] for s in game.allstacks],
+            game.s.talon.round)
+
+# Klondike
+game = app.runGame(2, random=constructRandom('100001'))
+playDemo(game, 2)
+n = len(game.moves.history)
+game.gotoMove(40)
+pos40 = getPosition(game)
+history40 = game.moves.history[:40]
+random40 = game.random.getstate()
+ok(game.setBookmark(0, confirm=0), 'set bookmark')
+def pickledSize(obj):
+    file = StringIO()
+    Pickler(file, -1).dump(obj)
+    return len(file.getvalue())
+# no copy of the game, only the index and the random state
+size = pickledSize(game.gsaveinfo.bookmarks[0]) - pickledSize(random40)
+ok(size < 100, 'bookmark size %d' % size)
+
+game.gotoMove(n)
+game.gotoBookmark(0, confirm=0)
+ok(game.moves.index == 40 and getPosition(game) == pos40
+   and len(game.moves.history) == n, 'goto bookmark')
+game.random.random()                    # not recorded by a move
+game.gotoBookmark(0, confirm=0)
+ok(game.random.getstate() == random40, 'goto bookmark: random state')
+
+# replace the history after move 10
+game.gotoMove(10)
+game.updateStackMove(game.s.talon, 0)   # not a redo of move 11
+game.finishMove()
+ok(len(game.moves.history) == 11 and game.gsaveinfo.bookmarks[0].base == 10,
+   'bookmark detached from the history')
+pos11 = getPosition(game)
+game.gotoBookmark(0, confirm=0)
+ok(game.moves.index == 40 and getPosition(game) == pos40 and
+   game.moves.history[:40] == history40, 'goto detached bookmark')
+game.undoGotoBookmark()
+ok(game.moves.index == 11 and getPosition(game) == pos11,
+   'undo goto bookmark')
+
+# save and load
+file = StringIO()
+game._dumpGame(Pickler(file, -1))
+loaded = game._undumpGame(Unpickler(StringIO(file.getvalue())), app)
+game = app.runGame(2, random=constructRandom('1'))
+game.restoreGame(loaded)
+game.gotoBookmark(0, confirm=0)
+ok(game.moves.index == 40 and getPosition(game) == pos40,
+   'goto bookmark of a loaded game')
+ok(game.random.getstate() == random40,
+   'goto bookmark of a loaded game: random state')
+
+# restart
+game.restartGame()
+ok(game.moves.index == 0 and 0 in game.gsaveinfo.bookmarks,
+   'bookmarks survive a restart')
+game.gotoBookmark(0, confirm=0)
+ok(game.moves.index == 40 and getPosition(game) == pos40,
+   'goto bookmark after a restart')
+
+# games without undo keep a pickle of the whole game
+game = app.runGame(22216, random=constructRandom('100001'))
+game.s.talon.dealCards()
+game.finishMove()
+pos = getPosition(game)
+game.setBookmark(1, confirm=0)
+game.s.talon.dealCards()
+game.finishMove()
+game.gotoBookmark(1, confirm=0)
+ok(isinstance(game.gsaveinfo.bookmarks[1], tuple) and
+   getPosition(game) == pos, 'Three Peaks: pickled bookmark')
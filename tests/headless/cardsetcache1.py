@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+
+# The cardsets cache: the second start reads no config.txt, and changed,
+# added or removed cardsets are found again.
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+sys.path.append("./tests/lib")
+from TAP.Simple import plan, ok
+
+sys.path.insert(0, ".")
+
+from pysollib.mfxutil import Struct
+from pysollib.app import Application
+from pysollib.resource import CardsetManager
+
+plan(7)
+
+top = tempfile.mkdtemp()
+cardsets = os.path.join(top, 'cardsets')
+os.mkdir(cardsets)
+os.environ['PYSOL_CARDSETS'] = cardsets
+
+CONFIG = '''PySol solitaire cardset;5;.gif;1;52;1;2000
+%s;%s
+71 96 8
+18 18 7 7
+back01.gif
+back01.gif;back02.gif
+'''
+
+def makeCardset(name, files=('back01.gif', 'shade.gif'), config=None):
+    d = os.path.join(cardsets, 'cardset-' + name)
+    os.mkdir(d)
+    for f in ('COPYRIGHT',) + files:
+        open(os.path.join(d, f), 'w').close()
+    if config is None:
+        config = CONFIG % (name, name.title())
+    open(os.path.join(d, 'config.txt'), 'w').write(config)
+    return d
+
+class App(Application):
+    def __init__(self):
+        self.fn = Struct(resources_cache=os.path.join(top, 'resources.idx'))
+        self.resource_cache = None
+        self.resource_dirs = {}
+        self.dn = Struct(maint=None, config=None)
+        self.dataloader = Struct(dir=None)
+        self.top = Struct(winfo_screendepth=lambda: 24)
+        self.opt = Struct(offsets={'alpha;Alpha': (10, 20)})
+        self.cardset_manager = CardsetManager()
+        self.nread = 0
+    def _readCardsetConfig(self, dir, filename):
+        self.nread += 1
+        return Application._readCardsetConfig(self, dir, filename)
+
+def start():
+    app = App()
+    app.initCardsets()
+    return app, [(cs.name, cs.CARD_XOFFSET)
+                 for cs in app.cardset_manager.getAll()]
+
+makeCardset('alpha')
+d = makeCardset('beta')
+makeCardset('noshade', files=('back01.gif',))
+makeCardset('invalid', config='PySol\n')
+
+app, first = start()
+ok(first == [('Alpha', 10), ('Beta', 18)] and app.nread == 4,
+   'first start: %s' % first)
+app, names = start()
+ok(names == first and app.nread == 0, 'second start reads no config')
+
+# a changed config.txt (with a newer mtime)
+open(os.path.join(d, 'config.txt'), 'w').write(CONFIG % ('beta', 'Gamma'))
+t = time.time() + 10
+os.utime(os.path.join(d, 'config.txt'), (t, t))
+app, names = start()
+ok(names == [('Alpha', 10), ('Gamma', 18)] and app.nread == 1,
+   'changed config')
+
+# an added and a removed cardset
+shutil.rmtree(d)
+makeCardset('delta')
+os.utime(cardsets, (t + 10, t + 10))
+app, names = start()
+ok(names == [('Alpha', 10), ('Delta', 18)] and app.nread == 1,
+   'added and removed cardsets')
+
+# a cardset gets its missing shade
+open(os.path.join(cardsets, 'cardset-noshade', 'shade.gif'), 'w').close()
+os.utime(os.path.join(cardsets, 'cardset-noshade'), (t + 20, t + 20))
+app, names = start()
+ok(('Noshade', 18) in names and app.nread == 1, 'added shade')
+
+# a damaged cache
+open(app.fn.resources_cache, 'w').write('garbage')
+app, names = start()
+ok(len(names) == 3 and app.nread == 4, 'damaged cache')
+app, names = start()
+ok(len(names) == 3 and app.nread == 0, 'cache rewritten')
+
+shutil.rmtree(top)
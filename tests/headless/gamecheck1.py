@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+
+# Registering games with CHECK_GAMES: duplicate ids, names, altnames and
+# classes are rejected, and the registration time is kept per module.
+
+import sys
+
+sys.path.append("./tests/lib")
+from TAP.Simple import plan, ok
+
+sys.path.insert(0, ".")
+
+import pysollib.settings
+pysollib.settings.CHECK_GAMES = True
+
+from pysollib.headless import HeadlessApplication
+from pysollib.gamedb import GAME_DB, GI, GameInfo, GameInfoException
+from pysollib.gamedb import registerGame
+
+plan(6)
+
+app = HeadlessApplication()
+ok(len(GAME_DB.getAllGames()) > 1000, 'all games checked')
+
+class NewGame:
+    pass
+
+def fails(*args, **kw):
+    try:
+        registerGame(GameInfo(*args, **kw))
+    except GameInfoException:
+        return True
+    return False
+
+klondike = GAME_DB.get(2)
+ok(fails(2, NewGame, 'New Game', GI.GT_KLONDIKE, 1, -1),
+   'duplicate id')
+ok(fails(99999, NewGame, klondike.name, GI.GT_KLONDIKE, 1, -1),
+   'duplicate name')
+ok(fails(99999, NewGame, 'New Game', GI.GT_KLONDIKE, 1, -1,
+         altnames=(klondike.name,)), 'duplicate altname')
+ok(fails(99999, klondike.gameclass, 'New Game', GI.GT_KLONDIKE, 1, -1),
+   'duplicate class')
+
+times = dict([(m, (t, n)) for t, n, m in GAME_DB.getRegistrationTimes()])
+ok(sum([n for t, n in times.values()]) == len(GAME_DB.getAllGames()) and
+   times['pysollib.games.klondike'][0] > 0 and
+   times['pysollib.games.klondike'][1] > 1,
+   'import times per module')
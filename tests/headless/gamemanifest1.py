@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+
+# The games manifest: the games are registered from the manifest without
+# importing the game modules, a game module is imported when its game is
+# played, and an out of date manifest is rebuilt.
+
+import os
+import sys
+import tempfile
+import subprocess
+
+sys.path.append("./tests/lib")
+from TAP.Simple import plan, ok
+
+sys.path.insert(0, ".")
+
+from pysollib.headless import HeadlessApplication
+from pysollib.gamedb import GAME_DB, GAME_PACKAGES, loadGamePackages
+
+plan(7)
+
+fd, manifest = tempfile.mkstemp()
+os.close(fd)
+os.remove(manifest)
+
+loadGamePackages(GAME_PACKAGES, manifest)
+ok(os.path.exists(manifest), 'manifest written')
+games = [(gi.id, gi.name, gi.si.game_type, gi.altnames)
+         for gi in GAME_DB.getAllGames()]
+
+script = r'''
+import sys
+sys.path.insert(0, ".")
+from pysollib.headless import HeadlessApplication
+from pysollib.gamedb import GAME_DB, GAME_PACKAGES, loadGamePackages
+from pysollib.gamedb import GI, ManifestGameInfo
+def modules():
+    return len([m for m in sys.modules
+                if m.startswith("pysollib.games.") and sys.modules[m]])
+loadGamePackages(GAME_PACKAGES, sys.argv[1])
+print repr(sorted([(gi.id, gi.name, gi.si.game_type, gi.altnames)
+                   for gi in GAME_DB.getAllGames()]))
+print isinstance(GAME_DB.get(11), ManifestGameInfo), modules()
+print 2 in GI._POPULAR_GAMES, GAME_DB.getGamesForSolver() == %r
+from pysollib.pysolrandom import constructRandom
+from pysollib.autoplay import playDemo
+app = HeadlessApplication()
+game = app.runGame(11, random=constructRandom("100001"))
+playDemo(game, 2)
+print game.__class__.__name__, len(game.moves.history) > 0
+''' % GAME_DB.getGamesForSolver()
+
+def run():
+    p = subprocess.Popen([sys.executable, '-c', script, manifest],
+                         stdout=subprocess.PIPE)
+    return p.communicate()[0].splitlines()
+
+out = run()
+ok(eval(out[0]) == sorted(games), 'same games from the manifest')
+lazy, nmodules = out[1].split()
+ok(lazy == 'True' and int(nmodules) < 10,
+   'game modules not imported (%s)' % nmodules)
+ok(out[2] == 'True True', 'popular games and solver')
+ok(out[3] == 'Spider True', 'play a game from the manifest')
+
+# a damaged manifest is rebuilt
+open(manifest, 'wb').write('garbage')
+out = run()
+ok(out[3] == 'Spider True', 'damaged manifest')
+ok(open(manifest, 'rb').read() != 'garbage', 'manifest rebuilt')
+os.remove(manifest)
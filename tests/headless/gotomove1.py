@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+
+# Game.gotoMove(): seeking in the move history must give the same
+# positions as undo/redo one move at a time, with or without checkpoints.
+
+import sys
+
+sys.path.append("./tests/lib")
+from TAP.Simple import plan, ok
+
+sys.path.insert(0, ".")
+
+from pysollib.headless import HeadlessApplication
+from pysollib.pysolrandom import constructRandom
+from pysollib.autoplay import playDemo
+
+plan(12)
+
+app = HeadlessApplication(french_only=True)
+flip_animation = app.opt.flip_animation
+
+def getPosition(game):
+    return ([[(c.id, c.face_up) for c in s.cards] for s in game.allstacks],
+            game.s.talon.round, game.getSnapshot())
+
+# Klondike, with a checkpoint every 10 moves
+game = app.runGame(2, random=constructRandom('100001'))
+game.CHECKPOINT_INTERVAL = 10
+playDemo(game, 2)
+n = len(game.moves.history)
+ok(n > 40, 'Klondike: %d moves' % n)
+ok(sorted(game.checkpoints) == range(0, n + 1, 10), 'checkpoints')
+
+positions = {}
+for i in range(n, -1, -1):
+    while game.moves.index > i:
+        game.undo()
+    positions[i] = getPosition(game)
+
+game.gotoMove(n)
+ok(game.moves.index == n and getPosition(game) == positions[n],
+   'seek to the end')
+game.gotoMove(3)
+ok(game.moves.index == 3 and getPosition(game) == positions[3],
+   'seek back using a checkpoint')
+errors = [i for i in (n - 1, 27, 35, 0, n, 12, n - 15)
+          if game.gotoMove(i) or getPosition(game) != positions[i]]
+ok(not errors, 'random seeks')
+game.gotoMove(n + 100)
+ok(game.moves.index == n, 'seek beyond the end')
+
+# without any checkpoints (a loaded game)
+game.checkpoints = {}
+game.gotoMove(20)
+ok(getPosition(game) == positions[20], 'seek without checkpoints')
+ok(20 in game.checkpoints and 150 in game.checkpoints,
+   'seeking adds checkpoints')
+
+# a new move after a seek replaces the rest of the history
+game.gotoMove(0)
+game.updateStackMove(game.s.talon, 0)  # not a redo of the first move
+game.finishMove()
+ok(len(game.moves.history) == 1 and sorted(game.checkpoints) == [0],
+   'new move drops later checkpoints')
+ok(app.opt.animations == 0 and app.opt.flip_animation == flip_animation,
+   'animation options restored')
+
+# Three Shuffles and a Draw: the draw is kept by a checkpoint hook
+game = app.runGame(128, random=constructRandom('100001'))
+game.CHECKPOINT_INTERVAL = 5
+playDemo(game, 2)
+n = len(game.moves.history)
+positions = {}
+for i in range(n, -1, -1):
+    while game.moves.index > i:
+        game.undo()
+    positions[i] = (getPosition(game), game.draw_done)
+errors = [i for i in (n, 3, n - 2, 0, n - 7, n)
+          if game.gotoMove(i) or
+          (getPosition(game), game.draw_done) != positions[i]]
+ok(not errors and positions[n][1] and n > 10,
+   'Three Shuffles and a Draw: seeks')
+
+# La Belle Lucie: the shuffles of the redeals depend on the random state
+game = app.runGame(901, random=constructRandom('100001'))
+game.CHECKPOINT_INTERVAL = 10
+playDemo(game, 2)
+n = len(game.moves.history)
+redeals = game.s.talon.round - 1
+positions = {}
+for i in range(n, -1, -1):
+    while game.moves.index > i:
+        game.undo()
+    positions[i] = (getPosition(game), game.random.getstate())
+errors = [i for i in (n, 0, n - 3, 15, n, 30, 0)
+          if game.gotoMove(i) or
+          (getPosition(game), game.random.getstate()) != positions[i]]
+ok(not errors and redeals > 0,
+   'La Belle Lucie: random state')
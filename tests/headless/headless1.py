@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+
+# Play games with the null toolkit: no Tk and no images.
+
+import sys
+
+sys.path.append("./tests/lib")
+from TAP.Simple import plan, ok
+
+sys.path.insert(0, ".")
+
+from pysollib.headless import HeadlessApplication
+from pysollib.pysolrandom import constructRandom
+from pysollib.mfxutil import Struct
+
+plan(9)
+
+app = HeadlessApplication(french_only=True)
+ok('Tkinter' not in sys.modules, 'Tkinter was not imported')
+
+def getPosition(game):
+    return [[(c.id, c.face_up) for c in s.cards] for s in game.allstacks]
+
+def playDemo(game):
+    demo = Struct(level=2, mixed=0, sleep=0, last_deal=[], snapshots=set(),
+                  hint=None, keypress=None, start_demo_moves=0,
+                  info_text=None, stuck=None)
+    game.demo = demo
+    while True:
+        finished = game.playOneDemoMove(demo)
+        game.finishMove()
+        game.hints.list = None
+        if finished or game.isGameWon():
+            break
+    game.demo = None
+
+# Relaxed FreeCell
+game = app.runGame(5, random=constructRandom('1'), autoplay=0)
+ok(sum([len(s.cards) for s in game.s.rows]) == 52, 'Relaxed FreeCell: 52 cards dealt')
+ok(game.s.rows[0].cards[0].face_up, 'Relaxed FreeCell: cards face up')
+
+start = getPosition(game)
+playDemo(game)
+ok(game.moves.index > 0, 'Relaxed FreeCell: autopilot made moves')
+ok(game.isGameWon(), 'Relaxed FreeCell: deal #1 solved by the autopilot')
+while game.moves.index > 0:
+    game.undo()
+ok(getPosition(game) == start, 'Relaxed FreeCell: undo restores the deal')
+
+# same seed - same deal
+game = app.runGame(5, random=constructRandom('1'), autoplay=0)
+ok(getPosition(game) == start, 'Relaxed FreeCell: deals are deterministic')
+
+# Klondike
+game = app.runGame(2, random=constructRandom('1'))
+playDemo(game)
+ok(game.moves.index > 0, 'Klondike: autopilot made moves')
+
+# games that use the gettext functions without importing them
+errors = []
+for id in (94, 134, 256, 527, 550):
+    try:
+        app.runGame(id, random=constructRandom('100001'))
+    except NameError:
+        errors.append(id)
+ok(not errors, 'games using the gettext builtins: %s' % errors)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+
+# The autosave journal: after a crash the game is resumed from the
+# journal at the same position, with the same move history.
+
+import os
+import sys
+import tempfile
+
+sys.path.append("./tests/lib")
+from TAP.Simple import plan, ok
+
+sys.path.insert(0, ".")
+
+from pysollib.headless import HeadlessApplication
+from pysollib.pysolrandom import constructRandom
+from pysollib.autoplay import playDemo
+from pysollib.journal import GameJournal, readJournal
+
+plan(9)
+
+app = HeadlessApplication()
+fd, filename = tempfile.mkstemp()
+os.close(fd)
+app.journal = GameJournal(filename, max_records=1000, sync=False)
+
+def getPosition(game):
+    return ([[(c.id, c.face_up) for c in s.cards] for s in game.allstacks],
+            game.s.talon.round, game.moves.index, len(game.moves.history),
+            game.getSnapshot())
+
+def resume(id):
+    # what the application does on start-up after a crash: load the
+    # journal, then start the game
+    loaded = app.game._loadJournal(filename, app)
+    game = app.runGame(id, random=constructRandom('1'))
+    game.restoreGame(loaded)
+    return game
+
+# Klondike
+game = app.runGame(2, random=constructRandom('100001'))
+playDemo(game, 2)
+n = len(game.moves.history)
+game.gotoMove(20)
+game.updateStackMove(game.s.talon, 0)   # replaces the history after 20
+game.finishMove()
+game.undo()
+game.undo()
+game.redo()
+position = getPosition(game)
+base, records = readJournal(filename)
+ok(len(records) == n + 5, 'a record per move: %d' % len(records))
+
+game = resume(2)
+ok(getPosition(game) == position, 'resume the game')
+ok(readJournal(filename)[1] == [], 'the journal is compacted')
+
+# a torn write at the end
+game.undo()
+position = getPosition(game)
+f = open(filename, 'ab')
+f.write('\x40\x00\x00\x00\x01\x02')
+f.close()
+game = resume(2)
+ok(getPosition(game) == position, 'incomplete record is ignored')
+
+# compaction
+app.journal.max_records = 10
+game = app.runGame(11, random=constructRandom('100001'))
+playDemo(game, 2)
+position = getPosition(game)
+ok(len(readJournal(filename)[1]) < 10, 'compaction')
+game = resume(11)
+ok(getPosition(game) == position, 'resume after compaction')
+
+# games without undo save the whole game after each move
+game = app.runGame(22216, random=constructRandom('100001'))
+game.s.talon.dealCards()
+game.finishMove()
+position = getPosition(game)
+ok(readJournal(filename)[1] == [], 'Three Peaks: no records')
+game = resume(22216)
+ok(getPosition(game) == position, 'Three Peaks: resume the game')
+
+# games with their own move history are not journaled
+game = app.runGame(13001, random=constructRandom('100001'))
+ok(game.journal is None and not os.path.exists(filename),
+   "Lara's Game: no journal")
+app.journal.remove()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+
+# LazyImages: the images of a cardset are loaded on first use, and with
+# a cache size only the most recently used are kept.
+
+import sys, os
+import shutil
+import tempfile
+
+sys.path.append("./tests/lib")
+from TAP.Simple import plan, ok
+
+sys.path.insert(0, ".")
+
+import pysollib.images
+from pysollib.images import Images, LazyImages
+from pysollib.resource import Cardset
+
+plan(10)
+
+loaded = []
+def load(index):
+    loaded.append(index)
+    return 'image%d' % index
+
+images = LazyImages(load, 10)
+ok(len(images) == 10 and not loaded, 'nothing loaded')
+ok(images[3] == 'image3' and images[-1] == 'image9' and loaded == [3, 9],
+   'load on first use')
+images[3]
+ok(loaded == [3, 9] and images.getLoaded() == [(3, 'image3'), (9, 'image9')],
+   'loaded images are kept')
+
+# LRU
+loaded = []
+images = LazyImages(load, 10, cache_size=3)
+for i in (0, 1, 2, 0, 3):
+    images[i]
+ok([i for i, im in images.getLoaded()] == [0, 2, 3],
+   'least recently used image dropped')
+images[1]
+ok(loaded == [0, 1, 2, 3, 1], 'dropped image loaded again')
+
+# appended images
+images.append('extra')
+for i in range(10):
+    images[i]
+ok(len(images) == 11 and images[10] == 'extra', 'appended image')
+ok(len(images.getLoaded()) == 4, 'appended images are never dropped')
+
+# a damaged face image gives a blank card
+class FakeImage:
+    # "images" are files with the size in them
+    def __init__(self, file=None, width=0, height=0):
+        if file:
+            width, height = map(int, open(file).read().split('x'))
+        self.w, self.h = width, height
+        self.blank = file is None
+    def width(self):
+        return self.w
+    def height(self):
+        return self.h
+
+pysollib.images.loadImage = FakeImage
+pysollib.images.createImage = lambda w, h, fill, outline=None: \
+                              FakeImage(width=w, height=h)
+pysollib.images.USE_PIL = False
+
+cs = Cardset()
+cs.CARDW, cs.CARDH, cs.ncards = 71, 96, 52
+cs.suits, cs.ranks, cs.ext = 'cshd', range(13), '.gif'
+cs.dir = tempfile.mkdtemp()
+for name in cs.getFaceCardNames():
+    open(os.path.join(cs.dir, name + cs.ext), 'w').write('71x96')
+open(os.path.join(cs.dir, '02c.gif'), 'w').write('damaged')
+open(os.path.join(cs.dir, '03c.gif'), 'w').write('80x96')
+images = Images(None, cs)
+images._card_names = cs.getFaceCardNames()
+images._createLazyImages(1, 1)
+im = images.getFace(0, 0, 3)
+ok(not im.blank and im.w == 71 and not cs.error, 'face loaded')
+ok(images.getFace(0, 0, 1).blank and cs.error, 'damaged face: blank card')
+im = images.getFace(0, 0, 2)
+ok(im.blank and im.w == 71, 'wrong size: blank card')
+shutil.rmtree(cs.dir)
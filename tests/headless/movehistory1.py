@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+
+# The move history: atomic moves are slotted, survive a save/load round
+# trip, and moves pickled by older versions still load.
+
+import sys
+
+sys.path.append("./tests/lib")
+from TAP.Simple import plan, ok
+
+sys.path.insert(0, ".")
+
+from cStringIO import StringIO
+from pysollib.mfxutil import Pickler, Unpickler
+from pysollib.headless import HeadlessApplication
+from pysollib.pysolrandom import constructRandom
+from pysollib.autoplay import playDemo
+from pysollib.move import AMoveMove, AFlipMove, ASingleFlipMove
+
+plan(9)
+
+app = HeadlessApplication(french_only=True)
+
+# Klondike
+game = app.runGame(2, random=constructRandom('100001'))
+playDemo(game, 2)
+history = game.moves.history
+am = history[0][0]
+ok(not hasattr(am, '__dict__'), 'atomic moves have no __dict__')
+ok(isinstance(history[0], tuple), 'history entries are tuples')
+
+end = game.getSnapshot()
+file = StringIO()
+game._dumpGame(Pickler(file, -1), bookmark=2)
+loaded = game._undumpGame(Unpickler(StringIO(file.getvalue())), app)
+ok([[a.__getstate__() for a in m] for m in loaded.moves.history] ==
+   [[a.__getstate__() for a in m] for m in history],
+   'save/load keeps the move history')
+
+while game.moves.index > 0:
+    game.undo()
+while game.moves.index < len(game.moves.history):
+    game.redo()
+ok(game.getSnapshot() == end, 'undo all + redo all restores the position')
+
+# moves pickled as classic instances (protocol 0 and 2)
+old = "(ipysollib.move\nAFlipMove\n(dp0\nS'stack_id'\np1\nI3\nsb."
+am = Unpickler(StringIO(old)).load()
+ok(isinstance(am, AFlipMove) and am.stack_id == 3, 'old protocol 0 move')
+old = ("\x80\x02(cpysollib.move\nAMoveMove\nq\x01oq\x02}q\x03(U\x06framesq"
+       "\x04J\xff\xff\xff\xffU\rfrom_stack_idq\x05K\x04U\x06shadowq\x06J"
+       "\xff\xff\xff\xffU\x06ncardsq\x07K\x02U\x0bto_stack_idq\x08K\x07ub.")
+am = Unpickler(StringIO(old)).load()
+ok(isinstance(am, AMoveMove) and
+   (am.ncards, am.from_stack_id, am.to_stack_id) == (2, 4, 7),
+   'old protocol 2 move')
+
+# subclasses inherit the slots of their base
+ok(ASingleFlipMove._fields == ('stack_id',), 'inherited slots')
+am = ASingleFlipMove(game.allstacks[1])
+file = StringIO()
+Pickler(file, 1).dump(am)
+am = Unpickler(StringIO(file.getvalue())).load()
+ok(isinstance(am, ASingleFlipMove) and am.stack_id == 1,
+   'pickle with protocol 1')
+ok(str(am) == "{'stack_id': 1}", 'repr')
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+
+# The resources cache: the listings of the tile, sound and music dirs
+# are kept in one index, a warm start lists no dir, and a rescan finds
+# files the mtimes did not tell about.
+
+import os
+import sys
+import shutil
+import tempfile
+
+sys.path.append("./tests/lib")
+from TAP.Simple import plan, ok
+
+sys.path.insert(0, ".")
+
+from pysollib.mfxutil import Struct
+from pysollib.app import Application
+from pysollib.resource import TileManager, SampleManager, MusicManager
+
+plan(6)
+
+top = tempfile.mkdtemp()
+data = os.path.join(top, 'data')
+for d, files in (('tiles-1', ('Green_Felt.gif', 'readme.txt')),
+                 ('sound', ('deal.wav', 'drop.wav')),
+                 ('music-1', ('Bye_For_Now.ogg',))):
+    os.makedirs(os.path.join(data, d))
+    for f in files:
+        open(os.path.join(data, d, f), 'w').close()
+    os.utime(os.path.join(data, d), (1000000000, 1000000000))
+
+listed = []
+def listdir(dir, listdir=os.listdir):
+    if dir != data:                 # glob in getSearchDirs()
+        listed.append(dir)
+    return listdir(dir)
+os.listdir = listdir
+
+class App(Application):
+    def __init__(self):
+        self.fn = Struct(resources_cache=os.path.join(top, 'resources.idx'))
+        self.dn = Struct(maint=None, config=None)
+        self.dataloader = Struct(dir=data)
+        self.audio = Struct(EXTENSIONS=r'\.((ogg)|(mp3))$')
+        self.tabletile_manager = TileManager()
+        self.sample_manager = SampleManager()
+        self.music_manager = MusicManager()
+        self.resource_cache = None
+        self.resource_dirs = {}
+
+def start():
+    del listed[:]
+    app = App()
+    app.initTiles()
+    app.initSamples()
+    app.initMusic()
+    return app, [[r.name for r in m.getAll()] for m in
+                 (app.tabletile_manager, app.sample_manager,
+                  app.music_manager)]
+
+app, first = start()
+ok(first == [['Green Felt'], ['deal', 'drop'], ['Bye_For_Now']],
+   'first start: %s' % first)
+ok(os.path.exists(app.fn.resources_cache), 'one index')
+app, names = start()
+ok(names == first and not listed, 'warm start lists no dir')
+
+# a new tile
+tiles = os.path.join(data, 'tiles-1')
+open(os.path.join(tiles, 'Blue.gif'), 'w').close()
+app, names = start()
+ok(names[0] == ['Blue', 'Green Felt'] and listed == [tiles], 'new tile')
+
+# a new sound, but the dir mtime does not tell
+sound = os.path.join(data, 'sound')
+open(os.path.join(sound, 'flip.wav'), 'w').close()
+os.utime(sound, (1000000000, 1000000000))
+app, names = start()
+ok(names[1] == ['deal', 'drop'], 'cached listing')
+app._updateResources([(k, app.getResourceCache().getStamp(v[0]),
+                       app._scanResourceDir(*v))
+                      for k, v in app.resource_dirs.items()])
+app, names = start()
+ok(names[1] == ['deal', 'drop', 'flip'] and not listed,
+   'rescan: %s' % names[1])
+
+shutil.rmtree(top)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+
+# Save files: the compact format round trip, the header, damaged files
+# and the older pickle format.
+
+import os
+import sys
+import tempfile
+
+sys.path.append("./tests/lib")
+from TAP.Simple import plan, ok
+
+sys.path.insert(0, ".")
+
+from cStringIO import StringIO
+from pysollib.mfxutil import Pickler, UnpicklingError
+from pysollib.headless import HeadlessApplication
+from pysollib.pysolrandom import constructRandom
+from pysollib.autoplay import playDemo
+from pysollib.savefile import isSaveFile, readSaveHeader
+from pysollib.savefile import packSaveFile, unpackSaveFile
+
+plan(11)
+
+app = HeadlessApplication()
+
+def getPosition(game):
+    return ([[(c.id, c.face_up) for c in s.cards] for s in game.allstacks],
+            game.s.talon.round, game.moves.index, len(game.moves.history),
+            game.getSnapshot())
+
+def restore(game, loaded):
+    game = app.runGame(game.id, random=constructRandom('100001'))
+    game.restoreGame(loaded)
+    return game
+
+def loadFails(data):
+    try:
+        game._undumpGameString(data, app)
+    except UnpicklingError:
+        return True
+    return False
+
+# Spider, with a bookmark
+game = app.runGame(11, random=constructRandom('100001'))
+playDemo(game, 2)
+game.gotoMove(30)
+game.setBookmark(0, confirm=0)
+game.gotoMove(40)
+position = getPosition(game)
+
+fd, filename = tempfile.mkstemp()
+os.close(fd)
+game._saveGame(filename)
+data = open(filename, 'rb').read()
+ok(isSaveFile(data), 'compact format')
+header = readSaveHeader(open(filename, 'rb'))
+ok(header['id'] == 11 and header['bookmark'] == 0, 'header')
+
+loaded = game._loadGame(filename, app)
+os.remove(filename)
+ok(loaded.gstats.loaded == 1 and loaded.gstats.saved == 1, 'gstats')
+game = restore(game, loaded)
+ok(getPosition(game) == position, 'load restores the game')
+game.gotoBookmark(0, confirm=0)
+ok(game.moves.index == 30, 'bookmark')
+
+# the pickle format of older versions
+file = StringIO()
+game._dumpGame(Pickler(file, -1))
+old = file.getvalue()
+ok(not isSaveFile(old), 'pickle format')
+position = getPosition(game)
+game = restore(game, game._undumpGameString(old, app))
+ok(getPosition(game) == position, 'load a pickled game')
+
+# damaged files
+data = game._dumpGameString()
+ok(loadFails(data[:-10]), 'truncated file')
+header, body = unpackSaveFile(data)
+body['stacks'] = body['stacks'][1:]
+ok(loadFails(packSaveFile(header, body)), 'missing cards')
+header, body = unpackSaveFile(data)
+body['gsaveinfo']['bookmarks'][0] = (old, 0)
+ok(loadFails(packSaveFile(header, body)), 'pickled bookmark')
+
+# games with pickled bookmarks (from an older version) are pickled
+game.gsaveinfo.bookmarks[1] = (old, 0)
+ok(not isSaveFile(game._dumpGameString()), 'fall back to pickle')
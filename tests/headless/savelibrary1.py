@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+
+# The saved games library: list saved games from their headers and keep
+# the headers in an index file.
+
+import os
+import sys
+import shutil
+import tempfile
+
+sys.path.append("./tests/lib")
+from TAP.Simple import plan, ok
+
+sys.path.insert(0, ".")
+
+from cStringIO import StringIO
+from pysollib.mfxutil import Pickler
+from pysollib.headless import HeadlessApplication
+from pysollib.pysolrandom import constructRandom
+from pysollib.autoplay import playDemo
+from pysollib.savelibrary import SavedGamesLibrary
+
+plan(8)
+
+app = HeadlessApplication()
+dir = tempfile.mkdtemp()
+index_file = os.path.join(dir, 'index')
+library = SavedGamesLibrary(dir, index_file, app.gdb)
+
+# a Klondike game in progress and a finished Relaxed FreeCell game
+game = app.runGame(2, random=constructRandom('100001'))
+game.s.talon.dealCards()
+game.finishMove()
+game._saveGame(os.path.join(dir, 'klondike.pso'))
+klondike_seed = game.getGameNumber(format=0)
+game = app.runGame(5, random=constructRandom('1'))
+playDemo(game, 2)
+game.finished = True
+game._saveGame(os.path.join(dir, 'freecell.pso'))
+seed, moves = game.getGameNumber(format=0), game.moves.index
+open(os.path.join(dir, 'notes.txt'), 'w').write('not a saved game')
+open(os.path.join(dir, 'damaged.pso'), 'w').write('not a saved game')
+
+games = library.getGames()
+ok(len(games) == 2, 'saved games')
+games = dict([(g.id, g) for g in games])
+g = games[2]
+ok((g.name, g.seed, g.moves, g.finished) == ('Klondike', klondike_seed, 1, False),
+   'Klondike')
+g = games[5]
+ok((g.name, g.seed, g.moves, g.finished) ==
+   ('Relaxed FreeCell', seed, moves, True), 'Relaxed FreeCell')
+
+# the index file
+library = SavedGamesLibrary(dir, index_file, app.gdb)
+ok(library.refresh() == 0, 'headers are read from the index')
+os.remove(os.path.join(dir, 'klondike.pso'))
+game._saveGame(os.path.join(dir, 'freecell.pso'))
+os.utime(os.path.join(dir, 'freecell.pso'), (0, 0))
+ok(library.refresh() == 1 and len(library.getGames()) == 1,
+   'changed and removed files')
+
+# games saved by older versions
+file = StringIO()
+game._dumpGame(Pickler(file, -1))
+open(os.path.join(dir, 'old.pso'), 'wb').write(file.getvalue())
+ok(library.refresh() == 1, 'pickled game')
+g = [g for g in library.getGames() if g.filename.endswith('old.pso')][0]
+ok((g.id, g.name, g.seed) == (5, 'Relaxed FreeCell', None),
+   'pickled game: the name from the games database')
+
+# the header of a pickled game holds no objects; nothing is called
+touched = []
+def touch():
+    touched.append(1)
+    return 'PySol'
+class Package(object):
+    def __reduce__(self):
+        return (touch, ())
+file = StringIO()
+Pickler(file, -1).dump(Package())
+open(os.path.join(dir, 'evil.pso'), 'wb').write(file.getvalue())
+ok(library.refresh() == 1 and not touched and
+   len(library.getGames()) == 2, 'pickled globals are not loaded')
+
+shutil.rmtree(dir)
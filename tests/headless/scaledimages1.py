@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+
+# Images: the scale factors are rounded, the images of the last used
+# scales are kept (up to a memory limit) and the unscaled images are
+# never dropped.
+
+import sys, os
+
+sys.path.append("./tests/lib")
+from TAP.Simple import plan, ok
+
+sys.path.insert(0, ".")
+
+from pysollib.resource import Cardset
+from pysollib.images import Images, ImagesCardback, LazyImages
+
+plan(9)
+
+class FakeImage:
+    def __init__(self, w, h):
+        self.w, self.h = w, h
+    def width(self):
+        return self.w
+    def height(self):
+        return self.h
+
+cs = Cardset()
+cs.CARDW, cs.CARDH, cs.ncards = 71, 96, 52
+cs.dir = '/cardsets/cardset-test'
+images = Images(None, cs)
+
+ok(images.quantizeScale(1.013, 0.5) == (1.02, 0.5) and
+   images.quantizeScale(0.999, 1.0) == (1.0, 1.0), 'rounded scale factors')
+ok(images.quantizeScale(0.001, 2) == (0.02, 2.0), 'smallest scale factor')
+
+def setImages(xf, yf):
+    # what Images.load or Images.resize would make
+    w, h = int(71 * xf), int(96 * yf)
+    images._xfactor, images._yfactor = xf, yf
+    images._card = LazyImages(lambda i: FakeImage(w, h), 52)
+    for i in range(4):
+        images._card[i]
+    images._back = [ImagesCardback(0, 'back01.gif', FakeImage(w, h))]
+    for name in ('bottom_positive', 'bottom_negative',
+                 'letter_positive', 'letter_negative'):
+        setattr(images, '_' + name, LazyImages(None, 0))
+    images._highlight = [FakeImage(w, h)]
+
+setImages(1.0, 1.0)
+images._Images__saveScaledImages()
+setImages(1.5, 1.5)
+back = images._back[0].image
+images._Images__saveScaledImages()
+ok(sorted(images._scaled) == [(1.0, 1.0), (1.5, 1.5)], 'scaled images kept')
+size = images._Images__getScaledImagesSize(images._scaled[(1.5, 1.5)])
+ok(size == 106 * 144 * 4 * 6, 'memory used %d' % size)
+
+# the least recently used scale is dropped
+images.SCALE_CACHE_MEMORY = 3 * size
+setImages(2.0, 2.0)
+images._Images__saveScaledImages()
+ok(sorted(images._scaled) == [(1.0, 1.0), (2.0, 2.0)],
+   'least recently used scale dropped')
+images.SCALE_CACHE_MEMORY = 0
+setImages(0.5, 0.5)
+images._Images__saveScaledImages()
+ok(sorted(images._scaled) == [(1.0, 1.0)], 'unscaled images kept')
+
+# set the images of a scale
+images._Images__setScaledImages(images._scaled[(1.0, 1.0)])
+ok(images._back[0].image.width() == 71 and images._card[0].width() == 71,
+   'images of a scale restored')
+
+# the on-disk cache
+images.cache_dir = '/cache'
+fn = images._Images__getScaledFilename('back01.gif', 1.5, 1.5)
+dir, name = os.path.split(fn)
+ok(name == 'back01.png' and os.path.basename(dir) == '106x144' and
+   os.path.basename(os.path.dirname(dir)).startswith('cardset-test-'),
+   'file ' + fn)
+cs.dir = '/home/user/.PySolFC/cardsets/cardset-test'
+ok(images._Images__getScaledFilename('back01.gif', 1.5, 1.5) != fn,
+   'cardsets with the same dir name')
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+
+# Solver result cache: LRU eviction and FreeCellSolver_Hint results
+# taken from the cache.
+
+import sys, os
+import time
+import shutil
+import tempfile
+
+sys.path.append("./tests/lib")
+from TAP.Simple import plan, ok
+
+sys.path.insert(0, ".")
+
+from pysollib.headless import HeadlessApplication
+from pysollib.pysolrandom import constructRandom
+from pysollib.solvercache import SolverCache
+import pysollib.hint
+
+plan(8)
+
+tmpdir = tempfile.mkdtemp()
+STUB = os.path.abspath('tests/lib/stub-fc-solve')
+LOG = os.path.join(tmpdir, 'solver.log')
+os.environ['STUB_SOLVER_LOG'] = LOG
+
+cache = SolverCache(os.path.join(tmpdir, 'lru'), max_entries=10)
+for i in range(10):
+    cache.put(('board', i), [i])
+    # the oldest entries are evicted first
+    fn = cache._filename(('board', i))
+    os.utime(fn, (time.time() - 100 + i, time.time() - 100 + i))
+ok(cache.get(('board', 3)) == [3], 'cache: get')
+cache.put(('board', 10), [10])
+ok(len(cache._entries()) == 9, 'cache: evicted down to 90%')
+ok(cache.get(('board', 0)) is None and cache.get(('board', 1)) is None,
+   'cache: least recently used entries evicted')
+ok(cache.get(('board', 3)) == [3], 'cache: recently used entry kept')
+
+class Dialog:
+    def setText(self, **kw):
+        pass
+
+def solve(game):
+    solver = game.Solver_Class(game, Dialog())
+    solver.computeHints()
+    return solver
+
+def nsolved():
+    if not os.path.exists(LOG):
+        return 0
+    return len(open(LOG).readlines())
+
+app = HeadlessApplication(french_only=True,
+                          solver_cache=os.path.join(tmpdir, 'solver'))
+game = app.runGame(8, random=constructRandom('1'), autoplay=0)
+pysollib.hint.FCS_COMMAND = STUB
+solver1 = solve(game)
+ok(nsolved() == 1 and solver1.solver_state == 'solved', 'FreeCell: solved')
+solver2 = solve(game)
+ok(nsolved() == 1 and solver2.hints == solver1.hints,
+   'FreeCell: solution from the cache')
+board = solver1.calcBoardString()
+game.moveMove(1, game.s.rows[0], game.s.reserves[0], frames=0)
+game.finishMove()
+solver3 = game.Solver_Class(game, Dialog())
+solver3.computeHints(board)
+ok(nsolved() == 1 and solver3.hints == solver1.hints,
+   'FreeCell: the board is passed to the solver')
+game.undo()
+solver1.config(max_iters=500)
+solver1.computeHints()
+ok(nsolved() == 2, 'FreeCell: max_iters is part of the key')
+
+shutil.rmtree(tmpdir)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+
+# Solver pool: persistent workers, timeouts, cancel and the
+# FreeCellSolver_Hint output parser, using a stub solver.
+
+import sys, os
+import time
+import tempfile
+import threading
+
+sys.path.append("./tests/lib")
+from TAP.Simple import plan, ok
+
+sys.path.insert(0, ".")
+
+from pysollib.headless import HeadlessApplication
+from pysollib.pysolrandom import constructRandom
+from pysollib.solverpool import SolverPool
+from pysollib.solverpool import SolverTimeout, SolverCancelled
+from pysollib.solverpool import workerCommand, closeSolverPools
+import pysollib.hint
+
+plan(10)
+
+STUB = os.path.abspath('tests/lib/stub-fc-solve')
+BOARD = 'FC: - - - -\nAS 2S\n3S\n'
+
+def moves(lines):
+    return [l for l in lines if l.startswith('Move ')]
+
+def isRunning(pid):
+    # zombies don't count: they are only waiting to be reaped
+    for i in range(20):
+        try:
+            os.kill(pid, 0)
+            if open('/proc/%d/stat' % pid).read().split()[2] == 'Z':
+                return False
+        except (IOError, OSError):
+            return False
+        time.sleep(0.1)
+    return True
+
+pool = SolverPool(workerCommand(STUB))
+worker = pool.free[0]
+ok(len(moves(pool.solve(['-m'], BOARD))) == 2, 'pool: moves streamed back')
+pid = worker.proc.pid
+ok(len(moves(pool.solve(['-m'], BOARD + '4S\n'))) == 3
+   and worker.proc.pid == pid, 'pool: the worker is reused')
+
+try:
+    list(pool.solve(['--sleep'], BOARD, timeout=0.5))
+except SolverTimeout:
+    ok(not worker.isRunning(), 'pool: timeout kills the worker')
+else:
+    ok(0, 'pool: timeout kills the worker')
+ok(len(moves(pool.solve(['-m'], BOARD))) == 2, 'pool: restart after timeout')
+
+cancel = threading.Event()
+threading.Timer(0.3, cancel.set).start()
+try:
+    list(pool.solve(['--sleep'], BOARD, cancel=cancel))
+except SolverCancelled:
+    ok(1, 'pool: cancel')
+else:
+    ok(0, 'pool: cancel')
+
+# the solver started by the worker is killed with it
+fd, pidfile = tempfile.mkstemp()
+os.close(fd)
+os.environ['STUB_SOLVER_PID'] = pidfile
+try:
+    list(pool.solve(['--sleep'], BOARD, timeout=0.5))
+except SolverTimeout:
+    pass
+del os.environ['STUB_SOLVER_PID']
+pid = int(open(pidfile).read())
+os.remove(pidfile)
+ok(not isRunning(pid), 'pool: timeout kills the solver')
+pool.close()
+
+oneshot = SolverPool([STUB], persistent=False)
+ok(len(moves(oneshot.solve(['-m'], BOARD))) == 2, 'one-shot solver')
+
+# FreeCellSolver_Hint
+class Dialog:
+    def setText(self, **kw):
+        pass
+
+app = HeadlessApplication(french_only=True)
+game = app.runGame(8, random=constructRandom('1'), autoplay=0)
+pysollib.hint.FCS_COMMAND = STUB
+solver = game.Solver_Class(game, Dialog())
+solver.computeHints()
+ok(solver.solver_state == 'solved' and len(solver.hints) == 8 + 1,
+   'FreeCell: one hint per stack')
+ok(solver.hints[0][1] is game.s.rows[0] and solver.hints[0][2] is None,
+   'FreeCell: move to the foundations')
+
+closeSolverPools()
+os.environ['STUB_SOLVER_SLEEP'] = '1'
+solver = game.Solver_Class(game, Dialog())
+solver.config(timeout=0.5)
+solver.computeHints()
+ok(solver.solver_state == 'intractable' and solver.hints == [None],
+   'FreeCell: timeout')
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+
+# The start-up profile: phases add up, a phase entered again is summed,
+# and the report is written when the profile is finished.
+
+import os
+import sys
+import json
+import tempfile
+
+sys.path.append("./tests/lib")
+from TAP.Simple import plan, ok
+
+sys.path.insert(0, ".")
+
+from pysollib.startupprofile import StartupProfile
+
+plan(6)
+
+profile = StartupProfile()
+dir = tempfile.mkdtemp()
+filename = os.path.join(dir, 'profile.json')
+profile.enable(filename)
+
+profile.phase('games')
+objects = [[] for i in range(1000)]
+profile.phase('cardsets')
+sum(range(100000))
+profile.phase('games')
+profile.phase('first draw')
+
+stderr = sys.stderr
+sys.stderr = open(os.devnull, 'w')
+profile.finish()
+sys.stderr = stderr
+
+ok([p[0] for p in profile.phases] == ['games', 'cardsets', 'first draw'],
+   'phases')
+ok(profile.phases[0][3] > 500, 'new objects: %s' % profile.phases[0][3])
+report = profile.getReport().splitlines()
+ok(len(report) == 6 and report[-1].startswith('total'), 'report')
+data = json.load(open(filename))
+ok([p['phase'] for p in data['phases']] == ['games', 'cardsets',
+                                            'first draw'] and
+   abs(data['wall'] - sum([p['wall'] for p in data['phases']])) < 1e-6,
+   'JSON report')
+
+profile.phase('later')
+ok(not profile.running and len(profile.phases) == 3,
+   'no phases after the start-up')
+
+# not enabled: the times only
+profile = StartupProfile()
+profile.phase('games')
+profile.finish()
+ok(profile.phases[0][3] is None and profile.phases[0][1] >= 0,
+   'times only')
+
+os.remove(filename)
+os.rmdir(dir)
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+
+# Sorting the games by their statistics and the progression charts use
+# per-player tables that are kept up to date as games finish; so do the
+# session counts.
+
+import sys
+import time
+
+sys.path.append("./tests/lib")
+from TAP.Simple import plan, ok
+
+sys.path.insert(0, ".")
+
+from pysollib.mfxutil import Struct
+from pysollib.app import Application, Statistics
+from pysollib.stats import ProgressionFormatter
+from pysollib.gamedb import GAME_DB
+import pysollib.games
+
+plan(11)
+
+class Game:
+    # what Statistics.updateStats() needs of a game
+    GAME_VERSION = 1
+    def __init__(self, id, moves, start_time=0):
+        self.id = id
+        self.gstats = Struct(start_time=start_time, total_elapsed_time=60)
+        self.stats = Struct(elapsed_time=60, total_moves=moves)
+        self.moves = Struct(index=moves)
+    def getGameNumber(self, format):
+        return '1'
+    def getGameScore(self):
+        return None
+    getGameScoreCasino = getGameScore
+    def updateTime(self):
+        pass
+
+class App(Application):
+    def __init__(self):
+        self.gdb = GAME_DB
+        self.opt = Struct(player='player')
+        self.stats = Statistics()
+
+app = App()
+stats = app.stats
+for id, status, moves in ((2, 1, 100), (2, 0, 100), (5, 1, 80), (5, 1, 60),
+                          (11, 0, 0), (11, 0, 0), (11, 1, 300)):
+    stats.updateStats('player', Game(id, moves), status)
+ok(stats.getAggregates('player') ==
+   {2: (1, 1, 60, 100), 5: (2, 0, 60, 70), 11: (1, 2, 60, 300)},
+   'aggregates')
+
+stats.updateStats('player', Game(2, 50), 1)
+ok(stats.getAggregates('player')[2] == (2, 1, 60, 75), 'updated by a game')
+
+ok(app.getGamesIdSortedByPlayed()[:3] == [2, 11, 5], 'sort by played')
+ok(app.getGamesIdSortedByPercent()[:3] == [5, 2, 11], 'sort by percent')
+ok(app.getGamesIdSortedByMoves()[:3] == [11, 2, 5], 'sort by moves')
+
+stats.resetStats('player', 11)
+ok(11 not in stats.getAggregates('player') and
+   app.getGamesIdSortedByLost()[0] == 2, 'reset')
+
+# daily results
+DAY = 24 * 60 * 60
+t = time.mktime((2020, 1, 1, 12, 0, 0, 0, 0, -1))
+for id, status, start_time in ((2, 1, t), (2, 0, t), (5, 1, t + DAY)):
+    stats.updateStats('other', Game(id, 100, start_time), status)
+ok(stats.getDailyResults('other') ==
+   {2: {(2020, 1, 1): [2, 1]}, 5: {(2020, 1, 2): [1, 1]}}, 'daily results')
+stats.updateStats('other', Game(5, 100, t), 0)
+ok(stats.getDailyResults('other')[5] ==
+   {(2020, 1, 1): [1, 0], (2020, 1, 2): [1, 1]}, 'updated by a game')
+formatter = ProgressionFormatter(app, 'other', 5)
+ok(formatter.all_results == {(2020, 1, 1): [3, 1], (2020, 1, 2): [1, 1]} and
+   formatter.game_results == stats.getDailyResults('other')[5],
+   'progression')
+
+# session
+stats.updateStats('other', Game(5, 100), -1)     # not played
+ok(stats.getSessionStats('other', 5) == (1, 1) and
+   stats.getSessionStats('player', 2) == (2, 1), 'session')
+stats.resetStats('other', 5)
+ok(stats.getSessionStats('other', 5) == (0, 0) and
+   stats.getSessionStats('other', 2) == (1, 1), 'session reset')
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+
+# Export the statistics and the game logs in CSV and JSON Lines, and
+# merge the exported logs into other statistics.
+
+import sys
+
+sys.path.append("./tests/lib")
+from TAP.Simple import plan, ok
+
+sys.path.insert(0, ".")
+
+from cStringIO import StringIO
+from pysollib.mfxutil import Struct
+from pysollib.app import Application, Statistics
+from pysollib.gamedb import GAME_DB
+from pysollib.stats import ExportStatsFormatter, readLogs
+import pysollib.games
+
+plan(8)
+
+class Game:
+    # what Statistics.updateStats() needs of a game
+    GAME_VERSION = 1
+    def __init__(self, id, seed, start_time):
+        self.id, self.seed = id, seed
+        self.gstats = Struct(start_time=start_time, total_elapsed_time=61.5)
+        self.stats = Struct(elapsed_time=61.5, total_moves=100)
+        self.moves = Struct(index=90)
+    def getGameNumber(self, format):
+        return self.seed
+    def getGameScore(self):
+        return None
+    def getGameScoreCasino(self):
+        return -52
+    def updateTime(self):
+        pass
+
+class App(Application):
+    def __init__(self):
+        self.gdb = GAME_DB
+        self.opt = Struct(player='player')
+        self.stats = Statistics()
+
+app = App()
+stats = app.stats
+for i, (id, status) in enumerate(((2, 1), (2, 0), (5, 2), (11, 0))):
+    stats.updateStats(u'pl\xe4yer', Game(id, str(i), 1234567890.123 + i),
+                      status)
+stats.prev_games[u'pl\xe4yer'].insert(0, (5, '7', 1, 1000000000.5, 30))
+logs = stats.prev_games[u'pl\xe4yer']
+
+def export(format, method='writeFullLog', **kw):
+    file = StringIO()
+    formatter = ExportStatsFormatter(app, file, format)
+    getattr(formatter, method)(u'pl\xe4yer', **kw)
+    return file.getvalue()
+
+for format in ('csv', 'jsonl'):
+    data = export(format)
+    logs2 = list(readLogs(StringIO(data)))
+    ok(logs2[1:] == [(u'pl\xe4yer', log) for log in logs[1:]] and
+       logs2[0][1] == (5, '7', 1, 1000000000.5, 30, "", None, None, 1),
+       '%s: lossless' % format)
+
+data = export('csv', 'writeStats')
+ok(data.splitlines()[1] == 'pl\xc3\xa4yer,2,Klondike,2,1,1,61.5,90.0',
+   'csv: statistics')
+def ids(data):
+    return [int(line.split(',')[1]) for line in data.splitlines()[1:]]
+ok(ids(data) == [2, 5, 11] and
+   ids(export('csv', 'writeStats', sort_by='lost'))[-1] == 5,
+   'csv: statistics sorted')
+
+# merge
+other = App()
+n = other.stats.mergeGames('player', [log for p, log in
+                                      readLogs(StringIO(export('csv')))])
+ok(n == 5, 'merge')
+ok(other.stats.getFullStats('player', 2)[:3] == (1, 1, 61.5),
+   'merged statistics')
+ok(other.getGamesIdSortedByPlayed()[0] == 2, 'merged aggregates')
+n = other.stats.mergeGames('player', [log for p, log in
+                                      readLogs(StringIO(export('jsonl')))])
+ok(n == 0 and len(other.stats.prev_games['player']) == 5,
+   'known games are skipped')
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+
+# The statistics log: finished games are appended to a log instead of
+# being pickled with the statistics.
+
+import os
+import sys
+import shutil
+import tempfile
+
+sys.path.append("./tests/lib")
+from TAP.Simple import plan, ok
+
+sys.path.insert(0, ".")
+
+from pysollib.mfxutil import Struct, pickle, unpickle
+from pysollib.app import Statistics
+from pysollib.statslog import StatisticsLog
+
+plan(13)
+
+class Game:
+    # what Statistics.updateStats() needs of a game
+    GAME_VERSION = 1
+    def __init__(self, id, seed):
+        self.id, self.seed = id, seed
+        self.gstats = Struct(start_time=0, total_elapsed_time=60)
+        self.stats = Struct(elapsed_time=60, total_moves=100)
+        self.moves = Struct(index=90)
+    def getGameNumber(self, format):
+        return self.seed
+    def getGameScore(self):
+        return None
+    getGameScoreCasino = getGameScore
+    def updateTime(self):
+        pass
+
+dir = tempfile.mkdtemp()
+stats_file = os.path.join(dir, 'statistics.dat')
+log_file = os.path.join(dir, 'statistics.log')
+
+def load():
+    stats = Statistics()
+    stats.__dict__.update(unpickle(stats_file).__dict__)
+    stats.openLog(log_file)
+    return stats
+
+# statistics of an older version
+stats = Statistics()
+for i in range(3):
+    game = Game(2, str(i + 1))
+    stats.updateStats('player', game, i % 2)
+game = Game(5, '1')
+stats.updateStats('player', game, 1)
+stats.updateStats('other', game, 0)
+stats.resetStats('player', 5)
+prev_games, all_prev_games = stats.prev_games, stats.all_prev_games
+pickle(stats, stats_file, protocol=-1)
+
+stats = load()
+ok(stats.prev_games == prev_games and stats.all_prev_games == all_prev_games,
+   'migrate the games of an older version')
+pickle(stats, stats_file, protocol=-1)
+ok(unpickle(stats_file).prev_games == {}, 'the games are not pickled')
+
+stats = load()
+ok(stats.prev_games == prev_games and stats.all_prev_games == all_prev_games,
+   'load the games from the log')
+ok(stats.getFullStats('player', 2)[:2] == (1, 2), 'game statistics')
+
+# new games and resets are appended
+stats.updateStats('player', game, 1)
+stats.resetStats('other', 0)
+prev_games, all_prev_games = stats.prev_games, stats.all_prev_games
+stats = load()
+ok(stats.prev_games == prev_games and stats.all_prev_games == all_prev_games,
+   'new games and resets')
+ok(len(stats.prev_games['player']) == 4 and 'other' not in stats.prev_games
+   and len(stats.all_prev_games['other']) == 1, 'log contents')
+
+# the log is read on first use, and compacted
+stats = load()
+ok('prev_games' not in stats.__dict__, 'the log is read on first use')
+stats.updateStats('player', game, 0)
+ok('prev_games' not in stats.__dict__, 'a new game does not read the log')
+ok(len(stats.prev_games['player']) == 5, 'the new game is in the log')
+log = StatisticsLog(log_file)
+ok(log.read() == (stats.prev_games, stats.all_prev_games) and
+   not log.compact, 'resets compacted')
+
+# a log that can't be written
+stats.log = StatisticsLog(dir)
+try:
+    stats.updateStats('player', game, 1)
+    stats.resetStats('player', 2)
+except EnvironmentError:
+    ok(0, 'write errors ignored')
+else:
+    ok([g[0] for g in stats.prev_games['player']] == [5, 5, 5],
+       'write errors ignored')
+
+# the daily results are pickled, and kept up to date without the log
+stats = load()
+stats.getDailyResults('player')
+pickle(stats, stats_file, protocol=-1)
+stats = load()
+stats.updateStats('player', Game(2, '4'), 1)
+stats.updateStats('player', game, 0)
+stats.resetStats('player', 2)
+daily = stats.getDailyResults('player')
+ok('prev_games' not in stats.__dict__ and daily[5] and 2 not in daily,
+   'daily results without the log')
+stats.daily_results.clear()
+ok(stats.getDailyResults('player') == daily and
+   stats.daily_results['player'][0] == len(stats.prev_games['player']),
+   'daily results of the log')
+
+shutil.rmtree(dir)
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+
+# Position hashing: the incrementally updated hash must match a hash
+# computed from scratch after every move, and undo must restore it.
+
+import sys
+
+sys.path.append("./tests/lib")
+from TAP.Simple import plan, ok
+
+sys.path.insert(0, ".")
+
+from pysollib.headless import HeadlessApplication
+from pysollib.pysolrandom import constructRandom
+from pysollib.zobrist import ZobristHash
+from pysollib.autoplay import playDemo
+
+GAMES = (
+    (2, 'Klondike'),
+    (5, 'Relaxed FreeCell'),
+    (11, 'Spider'),
+    (5001, 'Mahjongg Altar'),
+    )
+
+plan(3 * len(GAMES))
+
+app = HeadlessApplication()
+
+def hashFromScratch(game):
+    z = ZobristHash(len(game.allstacks))
+    z.reset(game.allstacks)
+    return z.value
+
+for id, name in GAMES:
+    game = app.runGame(id, random=constructRandom('100001'), autoplay=0)
+    start = game.getSnapshot()
+    mismatches = []
+    finishMove = game.finishMove
+    def checkedFinishMove():
+        r = finishMove()
+        if game.getSnapshot() != hashFromScratch(game):
+            mismatches.append(game.moves.index)
+        return r
+    game.finishMove = checkedFinishMove
+    playDemo(game)
+    ok(game.moves.index > 0 and not mismatches,
+       '%s: incremental hash after every move' % name)
+    ok(len(game.snapshots) > 1 and game.getSnapshot() in game.snapshots,
+       '%s: snapshots recorded' % name)
+    while game.moves.index > 0:
+        game.undo()
+    ok(game.getSnapshot() == start, '%s: undo restores the hash' % name)